@@ -0,0 +1,124 @@
+"""
+Micro-benchmarks for utils/dates.py against the previous implementation
+(strptime format probing + day-by-day range walk).
+
+Run from the backend directory:
+    python benchmarks/bench_dates.py
+"""
+import random
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils import dates  # noqa: E402
+
+
+# ---- Previous implementation (as it was in server.py), kept for comparison ----
+
+LEGACY_FORMATS = ["%Y-%m-%d", "%Y/%m/%d", "%d-%m-%Y", "%d/%m/%Y", "%m-%d-%Y", "%m/%d/%Y"]
+
+
+def legacy_normalize_date_string(date_string):
+    if not date_string:
+        return date_string
+    date_string = date_string.strip()
+    if len(date_string) == 10 and date_string[4] == '-' and date_string[7] == '-':
+        try:
+            datetime.strptime(date_string, "%Y-%m-%d")
+            return date_string
+        except ValueError:
+            pass
+    for fmt in LEGACY_FORMATS:
+        try:
+            return datetime.strptime(date_string, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return date_string
+
+
+def legacy_is_sunday(date_string):
+    try:
+        return datetime.strptime(legacy_normalize_date_string(date_string), "%Y-%m-%d").weekday() == 6
+    except (ValueError, TypeError):
+        return False
+
+
+def legacy_validate_date_range_no_sunday(fecha_inicio, fecha_fin=None):
+    if not fecha_inicio:
+        return (True, None)
+    inicio = legacy_normalize_date_string(fecha_inicio)
+    if legacy_is_sunday(inicio):
+        return (False, "No se permiten actividades en Domingo")
+    if fecha_fin:
+        fin = legacy_normalize_date_string(fecha_fin)
+        if legacy_is_sunday(fin):
+            return (False, "No se permiten actividades en Domingo (fecha de término)")
+        start_date = datetime.strptime(inicio, "%Y-%m-%d")
+        end_date = datetime.strptime(fin, "%Y-%m-%d")
+        if end_date < start_date:
+            return (False, "La fecha de término debe ser posterior o igual a la fecha de inicio")
+        current_date = start_date
+        while current_date <= end_date:
+            if current_date.weekday() == 6:
+                return (False, f"No se permiten actividades en Domingo. El rango de fechas incluye el domingo {current_date.strftime('%Y-%m-%d')}")
+            current_date += timedelta(days=1)
+    return (True, None)
+
+
+# ---- Workloads ----
+
+def make_ranges(count: int, max_span: int, seed: int = 7) -> tuple[list, list]:
+    rng = random.Random(seed)
+    base = date(2025, 3, 1)
+    starts, ends = [], []
+    for _ in range(count):
+        start = base + timedelta(days=rng.randint(0, 280))
+        # Mostly Monday-Saturday spans, like real activities
+        if start.weekday() == 6:
+            start += timedelta(days=1)
+        starts.append(start.isoformat())
+        ends.append((start + timedelta(days=rng.randint(0, max_span))).isoformat() if rng.random() < 0.5 else None)
+    return starts, ends
+
+
+def bench(label: str, legacy, new, number: int):
+    legacy_time = min(timeit.repeat(legacy, number=number, repeat=5))
+    new_time = min(timeit.repeat(new, number=number, repeat=5))
+    print(f"{label:<48} legacy {legacy_time * 1e3:9.2f} ms   new {new_time * 1e3:9.2f} ms   x{legacy_time / new_time:6.1f}")
+
+
+def main():
+    starts, ends = make_ranges(2000, max_span=5)
+    long_starts, long_ends = make_ranges(2000, max_span=400)
+    mixed = ["2025-03-10", "10/03/2025", "2025/03/10", "03-10-2025", " 2025-03-11 "] * 400
+
+    # Results must agree before timings mean anything
+    for start, end in zip(starts + long_starts, ends + long_ends):
+        assert legacy_validate_date_range_no_sunday(start, end) == dates.validate_date_range_no_sunday(start, end)
+    assert [legacy_validate_date_range_no_sunday(s, e)[1] for s, e in zip(starts, ends)] == \
+        dates.validate_ranges_no_sunday(starts, ends)
+    assert [legacy_normalize_date_string(v) for v in mixed] == [dates.normalize_date_string(v) for v in mixed]
+
+    print(f"Python {sys.version.split()[0]}; times are the best of 5 runs\n")
+    bench("normalize_date_string x2000 (mixed formats)",
+          lambda: [legacy_normalize_date_string(v) for v in mixed],
+          lambda: [dates.normalize_date_string(v) for v in mixed], 10)
+    bench("is_sunday x2000",
+          lambda: [legacy_is_sunday(v) for v in starts],
+          lambda: [dates.is_sunday(v) for v in starts], 10)
+    bench("validate_date_range_no_sunday x2000 (<=5 days)",
+          lambda: [legacy_validate_date_range_no_sunday(s, e) for s, e in zip(starts, ends)],
+          lambda: [dates.validate_date_range_no_sunday(s, e) for s, e in zip(starts, ends)], 10)
+    bench("validate_date_range_no_sunday x2000 (<=400 d)",
+          lambda: [legacy_validate_date_range_no_sunday(s, e) for s, e in zip(long_starts, long_ends)],
+          lambda: [dates.validate_date_range_no_sunday(s, e) for s, e in zip(long_starts, long_ends)], 10)
+    bench("batch of 2000 ranges (validate_ranges_no_sunday)",
+          lambda: [legacy_validate_date_range_no_sunday(s, e) for s, e in zip(starts, ends)],
+          lambda: dates.validate_ranges_no_sunday(starts, ends), 10)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,191 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form, Body
+from fastapi import FastAPI, HTTPException, UploadFile, File, Depends, Form, Body, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, ValidationError
 from typing import Optional, List
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 from pathlib import Path
+import asyncio
+import hmac
 import os
+import numpy as np
 import pandas as pd
-import io
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from email.mime.application import MIMEApplication
-from email.mime.image import MIMEImage
 from datetime import datetime, timedelta
-from pymongo import MongoClient
 from bson import ObjectId
+from bson.errors import InvalidId
 from jose import JWTError, jwt
 
+from utils.database import Database
+from utils.indexes import ensure_indexes, audit_indexes
+from utils.cache import TTLCache
+from utils.user_import import VALID_ROLES, upsert_users, validate_user_rows
+from utils.user_directory import (
+    USER_SORT,
+    after_email,
+    decode_email_cursor,
+    encode_email_cursor,
+    stream_users_csv,
+    user_directory_query,
+)
+from utils.csv_upload import CSVUploadError, UploadSizeLimitMiddleware, iter_csv_chunks
+from utils.audit import AuditLogWriter
+from utils.log_archive import LogArchiver, find_logs, log_sources
+from utils.log_export import EXPORT_FORMATS, stream_logs_csv, stream_logs_ndjson_gzip
+from utils.activity_logs import (
+    LOG_SORT,
+    LOG_SORT_ASCENDING,
+    backfill_log_secciones,
+    compact_log_entry,
+    compact_update_logs,
+    log_cursor,
+    log_secciones,
+    reconstruct_states,
+    serialize_log,
+)
+from utils.bulk_edit import (
+    MAX_SHIFT_DAYS,
+    affected_groups,
+    bulk_filter_query,
+    shift_dates_pipeline,
+    shift_date_string,
+    shift_sunday_errors,
+    shiftable_query,
+)
+from utils.dates import (
+    is_sunday,
+    parse_date,
+    normalize_date_string,
+    sunday_mask,
+    validate_date_range_no_sunday,
+    validate_ranges_no_sunday,
+)
+from utils.mail_queue import MailQueue, MailQueueFull
+from utils.smtp_session import SMTPSettings
+from utils.report_email import ReportEmailAssets, split_recipients
+from utils.report_renderer import ReportCache, ReportParams, RenderedReport, fetch_report_rows, render_report_pdf
+from utils.versioning import etag_matches, make_etag
+from utils.slow_queries import SLOW_QUERIES_COLLECTION, SlowQueryProfiler
+from utils.metrics import PROMETHEUS_CONTENT_TYPE, MetricsMiddleware, MongoCommandMetrics, RequestMetrics, render_metrics
+from utils.response_cache import CachedResponse, CalendarResponseCache
+from utils.calendar_data import (
+    ACTIVITY_PROJECTION,
+    ACTIVITY_SORT,
+    EVALUATION_PROJECTION,
+    EVALUATION_SORT,
+    MAX_PAGE_SIZE,
+    activity_sort_fields,
+    backfill_sort_fields,
+    decode_cursor,
+    evaluation_sort_fields,
+    fetch_grouped,
+    nivel_index,
+    stream_grouped_json,
+)
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+# MongoDB connection
+# Use MONGO_URI environment variable from MongoDB Atlas
+# For production (Render), ensure MONGO_URI is set in environment variables
+MONGO_URI = os.getenv("MONGO_URI")
+if not MONGO_URI:
+    raise ValueError("MONGO_URI environment variable is required. Please set it in .env file or environment variables.")
+
+DB_NAME = os.getenv("DB_NAME", "registro_escolar_db")
+
+# Async data layer (Motor). The client is created in the lifespan hook so it
+# binds to the running event loop; every endpoint goes through these repositories.
+# Every command is also timed by mongo_metrics (exposed at /api/metrics); commands
+# slower than SLOW_QUERY_THRESHOLD_MS (0 disables) are explained and kept in slow_queries
+mongo_metrics = MongoCommandMetrics()
+slow_query_profiler = SlowQueryProfiler(
+    threshold_ms=float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "500")),
+    explain_interval=float(os.environ.get("SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS", "60")),
+    capped_size_mb=int(os.environ.get("SLOW_QUERY_COLLECTION_MB", "16")),
+)
+database = Database(MONGO_URI, DB_NAME, event_listeners=[mongo_metrics, slow_query_profiler])
+
+# Audit entries are written in batches by a background task, off the request path
+audit_writer = AuditLogWriter(
+    max_queue_size=int(os.environ.get("AUDIT_QUEUE_MAX_SIZE", "10000")),
+    batch_size=int(os.environ.get("AUDIT_BATCH_SIZE", "200")),
+    flush_interval=float(os.environ.get("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0")),
+)
+
+# Retention: entries older than LOG_RETENTION_MONTHS whole months are moved to
+# monthly archive collections (0 disables it); the log endpoint reads them as needed
+log_archiver = LogArchiver(
+    retention_months=int(os.environ.get("LOG_RETENTION_MONTHS", "12")),
+    interval_seconds=float(os.environ.get("LOG_ARCHIVE_INTERVAL_HOURS", "24")) * 3600,
+)
+
+# Report emails are delivered by background workers that keep an authenticated
+# SMTP session open and retry transient failures; the endpoint returns a job id
+mail_queue = MailQueue(
+    max_retries=int(os.environ.get("MAIL_MAX_RETRIES", "3")),
+    backoff_seconds=float(os.environ.get("MAIL_RETRY_BACKOFF_SECONDS", "2.0")),
+    concurrency=int(os.environ.get("MAIL_QUEUE_WORKERS", "2")),
+    max_queue_size=int(os.environ.get("MAIL_QUEUE_MAX_SIZE", "1000")),
+    stale_after_seconds=float(os.environ.get("MAIL_JOB_STALE_MINUTES", "60")) * 60,
+)
+
+# Logo, footer image and HTML body of report emails, encoded once and reused
+report_assets = ReportEmailAssets(ROOT_DIR.parent / "frontend" / "public" / "img")
+
+
+# Opt-in migration: replaces the full snapshots of old update log entries with
+# field changes. Irreversible, and the rebuilt states of entries near a bulk
+# operation may be incomplete, so it only runs when explicitly enabled
+LOG_COMPACT_UPDATES = os.environ.get("LOG_COMPACT_UPDATES", "false").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    database.connect()
+    await ensure_indexes(database.db)
+    await slow_query_profiler.start(database)
+    # One-off backfills for documents written before these fields existed
+    await database.versions.run_once(
+        "activities_sort_fields", lambda: backfill_sort_fields(database.activities, activity_sort_fields)
+    )
+    await database.versions.run_once(
+        "evaluations_sort_fields", lambda: backfill_sort_fields(database.evaluations, evaluation_sort_fields)
+    )
+    await database.versions.run_once("activity_logs_secciones", lambda: backfill_log_secciones(database.activity_logs))
+    if LOG_COMPACT_UPDATES:
+        await database.versions.run_once("activity_logs_compact_updates", lambda: compact_update_logs(database.activity_logs))
+    audit_writer.start(database.activity_logs)
+    log_archiver.start(database)
+    mail_queue.start(database.mail_jobs)
+    await mail_queue.fail_interrupted_jobs()
+    report_assets.load()
+    try:
+        yield
+    finally:
+        # Cleanup on shutdown
+        await mail_queue.stop()
+        await log_archiver.stop()
+        await audit_writer.stop()
+        await slow_query_profiler.stop()
+        database.close()
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
+
+# Reject oversized CSV uploads while they are received, not after spooling them
+app.add_middleware(UploadSizeLimitMiddleware, paths={"/api/users/upload-csv", "/api/users/delete-csv"})
+
+# Per-route latency, status codes and in-flight requests (exposed at /api/metrics)
+request_metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
 
 # Configure CORS
 # NOTE: In production, consider specifying exact origins instead of ["*"]
@@ -47,23 +209,6 @@ async def root():
         "message": "Backend FastAPI funcionando correctamente"
     }
 
-# MongoDB connection
-# Use MONGO_URI environment variable from MongoDB Atlas
-# For production (Render), ensure MONGO_URI is set in environment variables
-MONGO_URI = os.getenv("MONGO_URI")
-if not MONGO_URI:
-    raise ValueError("MONGO_URI environment variable is required. Please set it in .env file or environment variables.")
-
-DB_NAME = os.getenv("DB_NAME", "registro_escolar_db")
-client = MongoClient(MONGO_URI)
-db = client[DB_NAME]
-
-# Collections
-users_collection = db['users']
-registro_activities_collection = db['registro_activities']
-registro_evaluations_collection = db['registro_evaluations']
-activity_logs_collection = db['activity_logs']
-
 # Authentication configuration
 SECRET_KEY = os.environ.get("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
@@ -71,6 +216,12 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 365 * 24 * 60  # 1 year (permanent)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+# Authenticated user lookups, keyed by email. Invalidated by the user management
+# endpoints; the TTL bounds staleness for changes made by other workers.
+USER_CACHE_TTL_SECONDS = float(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.environ.get("USER_CACHE_MAX_SIZE", "1024"))
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
 # Helper functions for authentication
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -102,9 +253,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     except JWTError:
         raise credentials_exception
     
-    user = users_collection.find_one({"email": email})
+    user = user_cache.get(email)
     if user is None:
-        raise credentials_exception
+        user = await database.users.find_by_email(email)
+        if user is None:
+            raise credentials_exception
+        user_cache.set(email, user)
     return user
 
 async def get_current_admin_user(current_user: dict = Depends(get_current_user)):
@@ -112,127 +266,20 @@ async def get_current_admin_user(current_user: dict = Depends(get_current_user))
         raise HTTPException(status_code=403, detail="Not enough permissions. Editor role required.")
     return current_user
 
-def normalize_date_string(date_string: str) -> str:
-    """
-    Normalize date string to YYYY-MM-DD format
-    Handles various input formats and ensures consistent output
-    """
-    if not date_string:
-        return date_string
-    
-    # Remove any whitespace
-    date_string = date_string.strip()
-    
-    # If already in YYYY-MM-DD format, return as is
-    if len(date_string) == 10 and date_string[4] == '-' and date_string[7] == '-':
-        try:
-            # Validate it's a valid date
-            datetime.strptime(date_string, "%Y-%m-%d")
-            return date_string
-        except ValueError:
-            pass
-    
-    # Try to parse common formats
-    formats_to_try = [
-        "%Y-%m-%d",           # YYYY-MM-DD (standard)
-        "%Y/%m/%d",           # YYYY/MM/DD
-        "%d-%m-%Y",           # DD-MM-YYYY
-        "%d/%m/%Y",           # DD/MM/YYYY
-        "%m-%d-%Y",           # MM-DD-YYYY
-        "%m/%d/%Y",           # MM/DD/YYYY
-    ]
-    
-    for fmt in formats_to_try:
-        try:
-            date_obj = datetime.strptime(date_string, fmt)
-            # Return in YYYY-MM-DD format
-            return date_obj.strftime("%Y-%m-%d")
-        except ValueError:
-            continue
-    
-    # If no format matches, return original (will cause error in caller)
-    return date_string
-
-def is_sunday(date_string: str) -> bool:
-    """
-    Check if a date string (YYYY-MM-DD) is a Sunday
-    Returns True if the date is Sunday (weekday 6), False otherwise
-    Uses local date parsing to avoid timezone issues
-    """
-    try:
-        # Normalize date string first
-        normalized_date = normalize_date_string(date_string)
-        
-        # Parse date as local date (no time component, no timezone)
-        # This ensures the date is interpreted correctly regardless of server timezone
-        date_obj = datetime.strptime(normalized_date, "%Y-%m-%d")
-        # weekday() returns 0=Monday, 6=Sunday
-        return date_obj.weekday() == 6  # 6 = Sunday
-    except (ValueError, TypeError):
-        return False
-
-def validate_date_range_no_sunday(fecha_inicio: str, fecha_fin: str | None = None) -> tuple[bool, str | None]:
-    """
-    Validate that a date range (fecha_inicio to fecha_fin) does not contain any Sunday
-    If fecha_fin is None, only validates fecha_inicio
-    
-    Returns: (is_valid, error_message)
-    - is_valid: True if no Sunday found, False otherwise
-    - error_message: Error message if invalid, None if valid
-    """
-    try:
-        # Validate fecha_inicio
-        if not fecha_inicio:
-            return (True, None)
-        
-        # Normalize date strings to YYYY-MM-DD format
-        normalized_fecha_inicio = normalize_date_string(fecha_inicio)
-        
-        if is_sunday(normalized_fecha_inicio):
-            return (False, "No se permiten actividades en Domingo")
-        
-        # If fecha_fin is provided, validate the entire range
-        if fecha_fin:
-            normalized_fecha_fin = normalize_date_string(fecha_fin)
-            
-            if is_sunday(normalized_fecha_fin):
-                return (False, "No se permiten actividades en Domingo (fecha de término)")
-            
-            # Parse both dates (already normalized to YYYY-MM-DD)
-            try:
-                start_date = datetime.strptime(normalized_fecha_inicio, "%Y-%m-%d")
-                end_date = datetime.strptime(normalized_fecha_fin, "%Y-%m-%d")
-            except ValueError as e:
-                return (False, f"Formato de fecha inválido: {str(e)}")
-            
-            # Validate that end_date is after or equal to start_date
-            if end_date < start_date:
-                return (False, "La fecha de término debe ser posterior o igual a la fecha de inicio")
-            
-            # Check each date in the range for Sunday
-            current_date = start_date
-            while current_date <= end_date:
-                if current_date.weekday() == 6:  # Sunday
-                    # Format the Sunday date for the error message
-                    sunday_str = current_date.strftime("%Y-%m-%d")
-                    return (False, f"No se permiten actividades en Domingo. El rango de fechas incluye el domingo {sunday_str}")
-                # Move to next day
-                current_date += timedelta(days=1)
-        
-        return (True, None)
-    except (ValueError, TypeError) as e:
-        return (False, f"Error al validar fechas: {str(e)}")
-
 def log_activity_action(
     user_email: str,
     action: str,  # "create", "update", "delete"
     entity: str,  # "activity" or "evaluation"
     entity_id: str,
     before: dict | None = None,
-    after: dict | None = None
+    after: dict | None = None,
+    bulk: dict | None = None
 ):
     """
     Log an activity/evaluation action to activity_logs collection
+    The entry is queued and written in the background by audit_writer
+    Updates are stored as field-level changes (see reconstruct_states)
+    Bulk operations pass their filter and summary as `bulk`, kept apart from the states
     """
     try:
         log_entry = {
@@ -241,21 +288,29 @@ def log_activity_action(
             "action": action,
             "entity": entity,
             "entity_id": str(entity_id),
-            "before": before,
-            "after": after
+            "secciones": log_secciones(before, after),
+            # Updates keep only the changed fields, create/delete the full snapshot
+            **compact_log_entry(action, entity_id, before, after)
         }
-        activity_logs_collection.insert_one(log_entry)
+        if bulk is not None:
+            log_entry["bulk"] = bulk
+        audit_writer.submit(log_entry)
     except Exception as e:
         # Logging errors should not break the main flow
         print(f"Error logging activity action: {e}")
 
-def validate_redland_email(email: str) -> bool:
-    """Validate that email is from @redland.cl domain (only in production)"""
+def required_email_domain() -> str | None:
+    """Email domain required for users: @redland.cl in production, None (any) in development"""
     env = os.environ.get('ENV', 'development').lower()
     if env == 'production':
-        return email.lower().endswith("@redland.cl")
+        return "@redland.cl"
+    return None
+
+def validate_redland_email(email: str) -> bool:
+    """Validate that email is from @redland.cl domain (only in production)"""
+    domain = required_email_domain()
     # In development, allow any email domain
-    return True
+    return domain is None or email.lower().endswith(domain)
 
 
 class EmailLoginPayload(BaseModel):
@@ -280,7 +335,7 @@ async def login(payload: EmailLoginPayload):
         )
 
     # Find user
-    user = users_collection.find_one({"email": email})
+    user = await database.users.find_by_email(email)
     if not user:
         raise HTTPException(
             status_code=401,
@@ -328,104 +383,25 @@ async def upload_users_csv(
     Roles: editor or viewer
     """
     try:
-        # Read CSV file with encoding handling
-        contents = await file.read()
-        
-        # Try different encodings
-        csv_content = None
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
-            try:
-                csv_content = contents.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if csv_content is None:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not decode CSV file. Please ensure the file is in UTF-8, Latin-1, or Windows-1252 encoding."
-            )
-        
-        # Read CSV using pandas
-        df = pd.read_csv(io.StringIO(csv_content))
-        
-        # Normalize column names (strip whitespace, lowercase)
-        df.columns = df.columns.str.strip().str.lower()
+        added_users = []
+        errors = []
         
-        # Validate CSV format - must have email and role columns
-        if 'email' not in df.columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"CSV must have an 'email' column. Found columns: {', '.join(df.columns)}"
-            )
-        if 'role' not in df.columns:
+        # Parse the upload in chunks straight from the spooled file; each chunk is
+        # validated column-wise and written with batched bulk upserts
+        try:
+            async for chunk in iter_csv_chunks(file, required_columns=['email', 'role']):
+                valid, chunk_errors = validate_user_rows(chunk, required_domain=required_email_domain())
+                added, write_errors, updated_emails = await upsert_users(database.users, valid, update_existing=True)
+                user_cache.invalidate_many(updated_emails)
+                added_users.extend(added)
+                errors.extend(message for _, message in sorted(chunk_errors + write_errors))
+        except pd.errors.ParserError as e:
+            # Malformed rows are only found when their chunk is parsed; earlier chunks are already saved
             raise HTTPException(
                 status_code=400,
-                detail=f"CSV must have a 'role' column. Found columns: {', '.join(df.columns)}"
+                detail=f"Malformed CSV: {str(e).strip()}. {len(added_users)} user(s) from earlier rows were already saved."
             )
         
-        added_users = []
-        errors = []
-        
-        # Process each row
-        for index, row in df.iterrows():
-            try:
-                # Get email and role, handle NaN values
-                email_raw = row.get('email')
-                role_raw = row.get('role')
-                
-                if pd.isna(email_raw) or pd.isna(role_raw):
-                    errors.append(f"Row {index + 2}: Missing email or role")
-                    continue
-                
-                email = str(email_raw).strip().lower()
-                role = str(role_raw).strip().lower()
-                
-                # Validate email is not empty
-                if not email:
-                    errors.append(f"Row {index + 2}: Empty email")
-                    continue
-                
-                # Validate email format (basic check)
-                if '@' not in email:
-                    errors.append(f"Row {index + 2}: {email} - Invalid email format")
-                    continue
-                
-                # Validate email domain (only in production)
-                if not validate_redland_email(email):
-                    errors.append(f"Row {index + 2}: {email} - Not a @redland.cl email")
-                    continue
-                
-                # Validate role
-                if role not in ['editor', 'viewer']:
-                    errors.append(f"Row {index + 2}: {email} - Invalid role '{role}'. Must be 'editor' or 'viewer'")
-                    continue
-                
-                # Check if user already exists
-                existing_user = users_collection.find_one({"email": email})
-                
-                if existing_user:
-                    # Update existing user's role
-                    users_collection.update_one(
-                        {"email": email},
-                        {"$set": {"role": role, "updated_at": datetime.utcnow().isoformat()}}
-                    )
-                    added_users.append(f"Updated: {email} → {role}")
-                else:
-                    # Create new user
-                    new_user = {
-                        "email": email,
-                        "role": role,
-                        "created_at": datetime.utcnow().isoformat(),
-                        "is_active": True
-                    }
-                    users_collection.insert_one(new_user)
-                    added_users.append(f"Added: {email} → {role}")
-                    
-            except Exception as row_error:
-                errors.append(f"Row {index + 2}: Error processing row - {str(row_error)}")
-                continue
-        
         # Ensure collection exists (MongoDB creates it automatically, but we verify)
         if not added_users and not errors:
             raise HTTPException(
@@ -442,6 +418,8 @@ async def upload_users_csv(
         
     except HTTPException:
         raise
+    except CSVUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
     except UnicodeDecodeError as e:
@@ -450,13 +428,38 @@ async def upload_users_csv(
         raise HTTPException(status_code=500, detail=f"Error processing CSV: {str(e)}")
 
 
+def users_filter(role: str | None, active: bool | None, q: str | None) -> dict:
+    if role and role not in VALID_ROLES:
+        raise HTTPException(status_code=400, detail=f"Invalid role. Must be one of: {', '.join(VALID_ROLES)}")
+    return user_directory_query(role, active, q)
+
 @app.get("/api/users")
-async def list_users(current_user: dict = Depends(get_current_admin_user)):
+async def list_users(
+    role: str | None = None,
+    active: bool | None = None,
+    q: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    current_user: dict = Depends(get_current_admin_user)
+):
     """
-    List all users (Editor only)
+    List users (Editor only), ordered by email
+    Filters: role, active, q (email prefix)
+    Pagination: at most `limit` users per page; `next_cursor` (null on the
+    last page) is sent back as `cursor` for the following page
     """
     try:
-        users = list(users_collection.find({}).limit(100))
+        query = users_filter(role, active, q)
+        if cursor:
+            try:
+                query = after_email(query, decode_email_cursor(cursor))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # One extra user tells whether there is a next page
+        users = await database.users.find(query, sort=USER_SORT, limit=limit + 1)
+        has_more = len(users) > limit
+        users = users[:limit]
         
         return {
             "users": [
@@ -465,8 +468,11 @@ async def list_users(current_user: dict = Depends(get_current_admin_user)):
                     "created_at": user.get("created_at", "")
                 }
                 for user in users
-            ]
+            ],
+            "next_cursor": encode_email_cursor(users[-1]["email"]) if has_more else None
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -485,7 +491,7 @@ async def delete_user(
             raise HTTPException(status_code=400, detail="Cannot delete your own account")
         
         # Get user data BEFORE deletion for logging
-        user_to_delete = users_collection.find_one({"email": email})
+        user_to_delete = await database.users.find_by_email(email)
         if not user_to_delete:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -498,9 +504,10 @@ async def delete_user(
         }
         
         # Delete user
-        result = users_collection.delete_one({"email": email})
+        deleted_count = await database.users.delete_one({"email": email})
+        user_cache.invalidate(email)
         
-        if result.deleted_count == 0:
+        if deleted_count == 0:
             raise HTTPException(status_code=404, detail="User not found")
         
         # Log the deletion
@@ -533,84 +540,62 @@ async def delete_users_csv(
     CSV format: email (only email column required)
     """
     try:
-        # Read CSV file with encoding handling
-        contents = await file.read()
-        
-        # Try different encodings
-        csv_content = None
-        for encoding in ['utf-8', 'utf-8-sig', 'latin-1', 'cp1252']:
-            try:
-                csv_content = contents.decode(encoding)
-                break
-            except UnicodeDecodeError:
-                continue
-        
-        if csv_content is None:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not decode CSV file. Please ensure the file is in UTF-8, Latin-1, or Windows-1252 encoding."
-            )
-        
-        # Read CSV using pandas
-        df = pd.read_csv(io.StringIO(csv_content))
-        
-        # Normalize column names
-        df.columns = df.columns.str.strip().str.lower()
-        
-        # Validate CSV format - must have email column
-        if 'email' not in df.columns:
-            raise HTTPException(
-                status_code=400,
-                detail=f"CSV must have an 'email' column. Found columns: {', '.join(df.columns)}"
-            )
-        
+        current_email = current_user["email"].lower()
+        found_emails = False
+        found_other_emails = False
+        deleted_count = 0
         deleted_emails = []
-        errors = []
         
-        # Extract emails from CSV
-        emails = []
-        for index, row in df.iterrows():
-            try:
-                email_raw = row.get('email')
-                if pd.isna(email_raw):
+        # Parse the upload in chunks and delete each chunk's users with one delete_many
+        try:
+            async for chunk in iter_csv_chunks(file, required_columns=['email']):
+                emails = chunk['email'].dropna().astype(str).str.strip().str.lower()
+                emails = emails[emails.str.contains('@', regex=False)].unique().tolist()
+                if not emails:
                     continue
+                found_emails = True
                 
-                email = str(email_raw).strip().lower()
-                if email and '@' in email:
-                    emails.append(email)
-            except Exception:
-                continue
+                # Prevent deleting yourself
+                emails = [e for e in emails if e != current_email]
+                if not emails:
+                    continue
+                found_other_emails = True
+                
+                chunk_deleted = await database.users.delete_many({"email": {"$in": emails}})
+                user_cache.invalidate_many(emails)
+                deleted_count += chunk_deleted
+                
+                # Get list of deleted emails
+                deleted_emails.extend(emails[:chunk_deleted])
+        except pd.errors.ParserError as e:
+            # Malformed rows are only found when their chunk is parsed; earlier chunks are already applied
+            raise HTTPException(
+                status_code=400,
+                detail=f"Malformed CSV: {str(e).strip()}. {deleted_count} user(s) from earlier rows were already deleted."
+            )
         
-        if not emails:
+        if not found_emails:
             raise HTTPException(
                 status_code=400,
                 detail="No valid emails found in CSV file"
             )
         
-        # Prevent deleting yourself
-        current_email = current_user["email"].lower()
-        emails = [e for e in emails if e != current_email]
-        
-        if not emails:
+        if not found_other_emails:
             raise HTTPException(
                 status_code=400,
                 detail="Cannot delete your own account"
             )
         
-        # Delete users
-        result = users_collection.delete_many({"email": {"$in": emails}})
-        
-        # Get list of deleted emails
-        deleted_emails = emails[:result.deleted_count]
-        
         return {
             "success": True,
-            "count": result.deleted_count,
+            "count": deleted_count,
             "details": [f"Eliminado: {email}" for email in deleted_emails]
         }
         
     except HTTPException:
         raise
+    except CSVUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except pd.errors.EmptyDataError:
         raise HTTPException(status_code=400, detail="CSV file is empty")
     except Exception as e:
@@ -637,7 +622,7 @@ async def update_user_role(
             )
         
         # Check if user exists
-        user = users_collection.find_one({"email": email})
+        user = await database.users.find_by_email(email)
         if not user:
             raise HTTPException(status_code=404, detail="User not found")
         
@@ -651,13 +636,14 @@ async def update_user_role(
         }
         
         # Update role
-        users_collection.update_one(
+        await database.users.update_one(
             {"email": email},
             {"$set": {"role": role, "updated_at": datetime.utcnow().isoformat()}}
         )
+        user_cache.invalidate(email)
         
         # Get updated user state for logging
-        updated_user = users_collection.find_one({"email": email})
+        updated_user = await database.users.find_by_email(email)
         after_state = {
             "email": updated_user.get("email"),
             "role": updated_user.get("role"),
@@ -717,12 +703,13 @@ async def bulk_delete_users(
             )
         
         # Delete users
-        result = users_collection.delete_many({"email": {"$in": emails}})
+        deleted_count = await database.users.delete_many({"email": {"$in": emails}})
+        user_cache.invalidate_many(emails)
         
         return {
             "success": True,
-            "count": result.deleted_count,
-            "message": f"Se han eliminado {result.deleted_count} usuario(s) seleccionados"
+            "count": deleted_count,
+            "message": f"Se han eliminado {deleted_count} usuario(s) seleccionados"
         }
     except HTTPException:
         raise
@@ -732,29 +719,24 @@ async def bulk_delete_users(
 
 @app.get("/api/users/export-csv")
 async def export_users_csv(
+    role: str | None = None,
+    active: bool | None = None,
+    q: str | None = None,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
-    Export all users as CSV (Editor only)
+    Export users as CSV (Editor only), streamed from a cursor
+    Accepts the same filters as GET /api/users
     """
     try:
-        users = list(users_collection.find({}).limit(1000))
-        
-        # Create CSV content
-        csv_lines = ["email,role"]
-        for user in users:
-            email = user.get("email", "")
-            role = user.get("role", "viewer")
-            csv_lines.append(f"{email},{role}")
-        
-        csv_content = "\n".join(csv_lines)
-        
-        from fastapi.responses import Response
-        return Response(
-            content=csv_content,
+        query = users_filter(role, active, q)
+        return StreamingResponse(
+            stream_users_csv(database.users, query),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=usuarios_export.csv"}
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -767,7 +749,7 @@ async def add_first_admin(email: str = Form(...)):
     """
     try:
         # Check if any users exist
-        user_count = users_collection.count_documents({})
+        user_count = await database.users.count()
         if user_count > 0:
             raise HTTPException(
                 status_code=403,
@@ -787,7 +769,7 @@ async def add_first_admin(email: str = Form(...)):
             "created_at": datetime.utcnow().isoformat(),
             "is_active": True
         }
-        users_collection.insert_one(first_admin)
+        await database.users.insert_one(first_admin)
         
         return {
             "success": True,
@@ -808,7 +790,7 @@ async def load_initial_users():
     """
     try:
         # Check if any users exist
-        user_count = users_collection.count_documents({})
+        user_count = await database.users.count()
         if user_count > 0:
             return {
                 "success": False,
@@ -852,57 +834,10 @@ async def load_initial_users():
                 detail=f"CSV must have a 'role' column. Found columns: {', '.join(df.columns)}"
             )
         
-        added_users = []
-        errors = []
-        
-        # Process each row
-        for index, row in df.iterrows():
-            try:
-                email_raw = row.get('email')
-                role_raw = row.get('role')
-                
-                if pd.isna(email_raw) or pd.isna(role_raw):
-                    errors.append(f"Row {index + 2}: Missing email or role")
-                    continue
-                
-                email = str(email_raw).strip().lower()
-                role = str(role_raw).strip().lower()
-                
-                # Validate email is not empty
-                if not email:
-                    errors.append(f"Row {index + 2}: Empty email")
-                    continue
-                
-                # Validate email format (basic check)
-                if '@' not in email:
-                    errors.append(f"Row {index + 2}: {email} - Invalid email format")
-                    continue
-                
-                # Validate role
-                if role not in ['editor', 'viewer']:
-                    errors.append(f"Row {index + 2}: {email} - Invalid role '{role}'. Must be 'editor' or 'viewer'")
-                    continue
-                
-                # Check if user already exists (shouldn't happen, but just in case)
-                existing_user = users_collection.find_one({"email": email})
-                
-                if existing_user:
-                    errors.append(f"Row {index + 2}: {email} - User already exists")
-                    continue
-                
-                # Create new user
-                new_user = {
-                    "email": email,
-                    "role": role,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "is_active": True
-                }
-                users_collection.insert_one(new_user)
-                added_users.append(f"Added: {email} → {role}")
-                
-            except Exception as row_error:
-                errors.append(f"Row {index + 2}: Error processing row - {str(row_error)}")
-                continue
+        # Validate all rows at once, then insert missing users with batched bulk upserts
+        valid, errors = validate_user_rows(df)
+        added_users, write_errors, _ = await upsert_users(database.users, valid, update_existing=False)
+        errors = [message for _, message in sorted(errors + write_errors)]
         
         return {
             "success": True,
@@ -967,6 +902,74 @@ class EvaluationUpdate(BaseModel):
         # Permitir campos extra para compatibilidad (ignorar "curso" si viene)
         extra = "ignore"
 
+# Browsers must revalidate calendar reads every time; the ETag makes that a cheap 304
+CALENDAR_CACHE_CONTROL = "private, no-cache"
+
+# Serialized responses of full (unpaginated) calendar reads
+calendar_cache = CalendarResponseCache(
+    maxsize=int(os.environ.get("CALENDAR_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.environ.get("CALENDAR_CACHE_TTL_SECONDS", "300")),
+    gzip_enabled=os.environ.get("CALENDAR_CACHE_GZIP", "true").lower() == "true",
+)
+
+# Server-rendered report PDFs, valid while the data they were built from is unchanged
+report_cache = ReportCache(
+    maxsize=int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", "32")),
+    ttl=float(os.environ.get("REPORT_CACHE_TTL_SECONDS", "3600")),
+)
+
+def build_calendar_query(date_from: str | None, date_to: str | None, seccion: str | None) -> dict:
+    """Mongo filter for calendar reads (date range and/or seccion)"""
+    query = {}
+    
+    # Date range filter
+    if date_from or date_to:
+        date_query = {}
+        if date_from:
+            date_query["$gte"] = date_from
+        if date_to:
+            date_query["$lte"] = date_to
+        query["fecha"] = date_query
+    
+    # Seccion filter
+    if seccion:
+        if seccion not in ["Junior", "Middle", "Senior"]:
+            raise HTTPException(status_code=400, detail="Invalid seccion")
+        query["seccion"] = seccion
+    
+    return query
+
+async def calendar_cache_headers(repository, **params) -> tuple[int, dict]:
+    """
+    ETag for a calendar read: the collection's version counter (bumped by every
+    create/update/delete) plus the query parameters
+    Returns (version, headers)
+    """
+    version = await database.versions.get(repository.name)
+    return version, {
+        "ETag": make_etag(repository.name, version, params),
+        "Cache-Control": CALENDAR_CACHE_CONTROL,
+    }
+
+async def record_calendar_change(repository, changes: list):
+    """
+    Bump the collection version (new ETag) and drop cached responses and reports
+    whose range contains one of the changed (fecha, seccion) pairs
+    """
+    version = await database.versions.bump(repository.name)
+    calendar_cache.invalidate(repository.name, changes, version)
+    report_cache.invalidate(repository.name, changes, version)
+
+def cached_json_response(entry: CachedResponse, request: Request, headers: dict) -> Response:
+    """Serve a cached calendar body, pre-gzipped when the client accepts it"""
+    if entry.gzipped is not None and "gzip" in request.headers.get("accept-encoding", ""):
+        return Response(
+            content=entry.gzipped,
+            media_type="application/json",
+            headers={**headers, "Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 def serialize_activity(activity: dict) -> dict:
     """Convert MongoDB activity to frontend format"""
     result = {
@@ -1029,6 +1032,117 @@ def serialize_evaluation(evaluation: dict) -> dict:
         result["hora"] = evaluation["hour"]
     return result
 
+ACTIVITY_SECTIONS = ["Junior", "Middle", "Senior", "ALL"]
+ACTIVITY_ALL_SECTIONS = ["Junior", "Middle", "Senior"]
+EVALUATION_SECTIONS = ["Junior", "Middle", "Senior"]
+EVALUATION_SUNDAY_MESSAGE = "No se permiten evaluaciones en Domingo"
+# Upper bound on items per batch create request
+CALENDAR_BATCH_MAX_ITEMS = int(os.environ.get("CALENDAR_BATCH_MAX_ITEMS", "1000"))
+
+def activity_base_document(activity: ActivityCreate, fecha: str, fecha_fin: str | None,
+                           created_by: str, created_at: str) -> dict:
+    """Activity document without seccion (dates already normalized)"""
+    # Store normalized dates to ensure consistency
+    document = {
+        "actividad": activity.actividad,
+        "fecha": fecha,
+        "fechaFin": fecha_fin,
+        "hora": activity.hora,
+        "lugar": activity.lugar,
+        "responsable": activity.responsable,
+        "importante": activity.importante,
+        "created_by": created_by,
+        "created_at": created_at,
+    }
+    # Add cursos if provided
+    if activity.cursos is not None:
+        document["cursos"] = activity.cursos
+    # Derived sort keys (nivel_index, hora_minutes) used by the calendar pipeline
+    document.update(activity_sort_fields(document))
+    return document
+
+def activity_cursos_error(cursos) -> str | None:
+    """Validation message for an activity's cursos array, None if valid"""
+    if not isinstance(cursos, list) or len(cursos) == 0:
+        return "cursos must be a non-empty array"
+    if not all(isinstance(c, str) and c.strip() for c in cursos):
+        return "All items in cursos array must be non-blank strings"
+    return None
+
+def evaluation_cursos_error(cursos) -> str | None:
+    """Validation message for an evaluation's cursos array, None if valid"""
+    if not isinstance(cursos, list):
+        return "cursos must be an array"
+    if len(cursos) == 0:
+        return "At least one course must be specified in cursos array"
+    if len(cursos) > 3:
+        return "Maximum 3 courses allowed per evaluation"
+    # Validar que todos los elementos sean strings
+    if not all(isinstance(c, str) for c in cursos):
+        return "All items in cursos array must be strings"
+    return None
+
+def evaluation_document(evaluation: EvaluationCreate, created_by: str, created_at: str) -> dict:
+    # Create evaluation document - guardar cursos como array
+    document = {
+        "seccion": evaluation.seccion,
+        "asignatura": evaluation.asignatura,
+        "tema": evaluation.tema,
+        "cursos": evaluation.cursos,  # Array de cursos - guardar tal cual
+        "fecha": evaluation.fecha,
+        "created_by": created_by,
+        "created_at": created_at,
+    }
+    # Add hora if provided
+    if evaluation.hora is not None:
+        document["hora"] = evaluation.hora
+    document.update(evaluation_sort_fields(document))
+    return document
+
+class CalendarBatchCreate(BaseModel):
+    # Raw items, validated one by one so a bad item is reported instead of rejecting the batch
+    items: List[dict]
+
+def validate_batch_size(items: list):
+    if not items:
+        raise HTTPException(status_code=400, detail="items must contain at least one item")
+    if len(items) > CALENDAR_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many items ({len(items)}). Maximum allowed is {CALENDAR_BATCH_MAX_ITEMS} per request."
+        )
+
+def pydantic_error_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+
+async def insert_batch(repository, documents: list, owners: list, results: list) -> list:
+    """
+    Insert the documents of a batch with one unordered insert_many and record
+    the outcome in results[owner] (owners[i] is the item index of documents[i]).
+    Returns the documents that were inserted.
+    """
+    failed = await repository.insert_many_partial(documents) if documents else {}
+    inserted = []
+    for position, (document, owner) in enumerate(zip(documents, owners)):
+        result = results[owner]
+        if position in failed:
+            result["success"] = False
+            result["error"] = failed[position]
+        else:
+            inserted.append(document)
+            result.setdefault("ids", []).append(str(document["_id"]))
+    return inserted
+
+def batch_response(entity_key: str, results: list, inserted: list) -> dict:
+    failed = sum(1 for result in results if not result.get("success"))
+    return {
+        "success": failed == 0,
+        "created": len(inserted),
+        "failed": failed,
+        "results": results,
+        "message": f"Created {len(inserted)} {entity_key}; {failed} item(s) failed"
+    }
+
 @app.post("/api/activities")
 async def create_activity(
     activity: ActivityCreate,
@@ -1043,7 +1157,7 @@ async def create_activity(
             raise HTTPException(status_code=403, detail="Editor role required")
         
         # Validate seccion
-        if activity.seccion not in ["Junior", "Middle", "Senior", "ALL"]:
+        if activity.seccion not in ACTIVITY_SECTIONS:
             raise HTTPException(status_code=400, detail="Invalid seccion. Must be Junior, Middle, Senior, or ALL")
         
         # Normalize date strings to YYYY-MM-DD format before validation
@@ -1056,25 +1170,13 @@ async def create_activity(
             raise HTTPException(status_code=400, detail=error_message)
         
         # Base activity data (common to all activities)
-        # Store normalized dates to ensure consistency
-        base_activity_data = {
-            "actividad": activity.actividad,
-            "fecha": normalized_fecha,  # Use normalized date
-            "fechaFin": normalized_fechaFin,  # Use normalized date
-            "hora": activity.hora,
-            "lugar": activity.lugar,
-            "responsable": activity.responsable,
-            "importante": activity.importante,
-            "created_by": current_user["email"],
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        # Add cursos if provided
-        if activity.cursos is not None:
-            base_activity_data["cursos"] = activity.cursos
+        base_activity_data = activity_base_document(
+            activity, normalized_fecha, normalized_fechaFin, current_user["email"], datetime.utcnow().isoformat()
+        )
         
         # If seccion is "ALL", create 3 activities (one for each section)
         if activity.seccion == "ALL":
-            secciones_destino = ["Junior", "Middle", "Senior"]
+            secciones_destino = ACTIVITY_ALL_SECTIONS
             inserted_ids = []
             
             for seccion_destino in secciones_destino:
@@ -1082,19 +1184,24 @@ async def create_activity(
                     **base_activity_data,
                     "seccion": seccion_destino,
                 }
-                result = registro_activities_collection.insert_one(activity_doc)
-                inserted_ids.append(str(result.inserted_id))
+                inserted_id = await database.activities.insert_one(activity_doc)
+                inserted_ids.append(str(inserted_id))
                 
                 # Log each creation
                 log_activity_action(
                     user_email=current_user["email"],
                     action="create",
                     entity="activity",
-                    entity_id=str(result.inserted_id),
+                    entity_id=str(inserted_id),
                     before=None,
                     after=serialize_activity(activity_doc)
                 )
             
+            await record_calendar_change(
+                database.activities,
+                [(normalized_fecha, seccion_destino) for seccion_destino in secciones_destino]
+            )
+            
             return {
                 "success": True,
                 "created": 3,
@@ -1107,15 +1214,16 @@ async def create_activity(
                 "seccion": activity.seccion,
             }
             
-            result = registro_activities_collection.insert_one(activity_doc)
-            activity_doc["_id"] = result.inserted_id
+            inserted_id = await database.activities.insert_one(activity_doc)
+            activity_doc["_id"] = inserted_id
+            await record_calendar_change(database.activities, [(normalized_fecha, activity.seccion)])
             
             # Log the creation
             log_activity_action(
                 user_email=current_user["email"],
                 action="create",
                 entity="activity",
-                entity_id=str(result.inserted_id),
+                entity_id=str(inserted_id),
                 before=None,
                 after=serialize_activity(activity_doc)
             )
@@ -1129,121 +1237,140 @@ async def create_activity(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/activities")
-async def get_activities(
-    date_from: str | None = None,
-    date_to: str | None = None,
-    seccion: str | None = None,
+@app.post("/api/activities/batch")
+async def create_activities_batch(
+    payload: CalendarBatchCreate,
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get activities filtered by date range and/or seccion
-    Returns activities grouped by date and seccion (frontend format)
+    Create many activities in one request (Editor only)
+    Items have the same fields as POST /api/activities (seccion "ALL" creates one
+    per section). All items are validated first, valid ones are inserted with a
+    single unordered insert_many, and the response has one result per item:
+    {"index", "success", "ids"} or {"index", "success": false, "error"}
     """
     try:
-        query = {}
+        if current_user.get("role") != "editor":
+            raise HTTPException(status_code=403, detail="Editor role required")
+        validate_batch_size(payload.items)
         
-        # Date range filter
-        if date_from or date_to:
-            date_query = {}
-            if date_from:
-                date_query["$gte"] = date_from
-            if date_to:
-                date_query["$lte"] = date_to
-            query["fecha"] = date_query
-        
-        # Seccion filter
-        if seccion:
-            if seccion not in ["Junior", "Middle", "Senior"]:
-                raise HTTPException(status_code=400, detail="Invalid seccion")
-            query["seccion"] = seccion
-        
-        # Fetch activities
-        activities = list(registro_activities_collection.find(query).sort("fecha", 1))
-        
-        # Custom order for niveles (same as evaluations)
-        nivel_order = ["5", "6", "7", "8", "I", "II", "III", "IV"]
-        
-        def extract_nivel_activity(activity):
-            """Extract nivel from activity cursos array"""
-            cursos = activity.get("cursos", [])
-            if not cursos:
-                # Fallback to legacy curso field
-                curso = activity.get("curso", "")
-                if curso:
-                    cursos = [curso] if isinstance(curso, str) else curso
-            
-            if not cursos:
-                return None
-            
-            # Get first curso to determine nivel
-            first_curso = cursos[0] if isinstance(cursos, list) else cursos
-            if not isinstance(first_curso, str):
-                return None
-            
-            # Extract nivel from curso string (e.g., "5° A" -> "5", "I EM A" -> "I")
-            first_curso = first_curso.strip()
-            
-            # Check for Middle levels (5, 6, 7, 8)
-            for nivel in ["5", "6", "7", "8"]:
-                if first_curso.startswith(nivel + "°") or first_curso.startswith(nivel + " "):
-                    return nivel
-            
-            # Check for Senior levels (I, II, III, IV)
-            for nivel in ["I", "II", "III", "IV"]:
-                if first_curso.startswith(nivel + " EM") or first_curso.startswith(nivel + " "):
-                    return nivel
-            
-            return None
+        results = [{"index": index, "success": True} for index in range(len(payload.items))]
+        activities = [None] * len(payload.items)
+        for index, item in enumerate(payload.items):
+            try:
+                activity = ActivityCreate.model_validate(item)
+            except ValidationError as e:
+                results[index] = {"index": index, "success": False, "error": pydantic_error_message(e)}
+                continue
+            if activity.seccion not in ACTIVITY_SECTIONS:
+                results[index] = {"index": index, "success": False, "error": "Invalid seccion. Must be Junior, Middle, Senior, or ALL"}
+                continue
+            activities[index] = activity
+        
+        # Sunday validation for every range in one vectorized pass
+        fechas = [normalize_date_string(a.fecha) if a else None for a in activities]
+        fechas_fin = [normalize_date_string(a.fechaFin) if a and a.fechaFin else None for a in activities]
+        for index, error_message in enumerate(validate_ranges_no_sunday(fechas, fechas_fin)):
+            if activities[index] is not None and error_message:
+                results[index] = {"index": index, "success": False, "error": error_message}
+                activities[index] = None
+        
+        created_at = datetime.utcnow().isoformat()
+        documents, owners = [], []
+        for index, activity in enumerate(activities):
+            if activity is None:
+                continue
+            base = activity_base_document(activity, fechas[index], fechas_fin[index], current_user["email"], created_at)
+            secciones = ACTIVITY_ALL_SECTIONS if activity.seccion == "ALL" else [activity.seccion]
+            for seccion in secciones:
+                documents.append({**base, "seccion": seccion})
+                owners.append(index)
+        
+        inserted = await insert_batch(database.activities, documents, owners, results)
+        if inserted:
+            await record_calendar_change(database.activities, [(doc["fecha"], doc["seccion"]) for doc in inserted])
+        # Audit entries are queued and written in batches by audit_writer
+        for document in inserted:
+            log_activity_action(
+                user_email=current_user["email"],
+                action="create",
+                entity="activity",
+                entity_id=str(document["_id"]),
+                before=None,
+                after=serialize_activity(document)
+            )
         
-        def sort_key_activity(activity):
-            """Sort key function for activities"""
-            nivel = extract_nivel_activity(activity)
-            if nivel is None:
-                nivel_index = 999  # Unknown niveles go to end
-            else:
-                try:
-                    nivel_index = nivel_order.index(nivel)
-                except ValueError:
-                    nivel_index = 999  # Unknown nivel
-            
-            # Get fecha for secondary sort
-            fecha = activity.get("fecha", "")
-            
-            # Get hora for tertiary sort (convert to minutes for comparison)
-            hora = activity.get("hora", "")
-            hora_minutes = 9999  # Default for activities without hora or "TODO EL DIA"
-            if hora and hora != "TODO EL DIA":
-                try:
-                    time_parts = hora.split(':')
-                    if len(time_parts) >= 2:
-                        hora_minutes = int(time_parts[0]) * 60 + int(time_parts[1])
-                except (ValueError, IndexError):
-                    pass
-            
-            # Primary sort: nivel order, Secondary sort: fecha, Tertiary sort: hora
-            return (nivel_index, fecha, hora_minutes)
+        return batch_response("activities", results, inserted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/activities")
+async def get_activities(
+    request: Request,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    seccion: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get activities filtered by date range and/or seccion
+    Returns activities grouped by date and seccion (frontend format)
+    Pagination: pass `limit` to get at most that many items in (fecha, id) order
+    plus a `next_cursor` to send back as `cursor` for the following page
+    stream=true emits the response one date group at a time
+    """
+    try:
+        query = build_calendar_query(date_from, date_to, seccion)
         
-        # Sort activities by nivel (and fecha/hora as secondary/tertiary)
-        activities.sort(key=sort_key_activity)
+        # Validate pagination cursor up front (a malformed cursor is a client error)
+        if cursor:
+            try:
+                decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
         
-        # Group by date and seccion (frontend format)
-        grouped = {}
-        for activity in activities:
-            fecha = activity["fecha"]
-            seccion_key = activity["seccion"]
-            
-            if fecha not in grouped:
-                grouped[fecha] = {}
-            if seccion_key not in grouped[fecha]:
-                grouped[fecha][seccion_key] = []
-            
-            grouped[fecha][seccion_key].append(serialize_activity(activity))
+        # Unchanged data is answered with 304 before any document is read
+        version, headers = await calendar_cache_headers(
+            database.activities, date_from=date_from, date_to=date_to, seccion=seccion,
+            limit=limit, cursor=cursor, stream=stream
+        )
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        if stream:
+            return StreamingResponse(
+                stream_grouped_json("activities", database.activities, query, ACTIVITY_SORT, ACTIVITY_PROJECTION, limit=limit, cursor=cursor),
+                media_type="application/json",
+                headers=headers
+            )
         
-        return {
+        # Full (unpaginated) reads are served from the in-process response cache
+        cacheable = not limit and not cursor
+        if cacheable:
+            cached = calendar_cache.get(database.activities.name, version, date_from, date_to, seccion)
+            if cached is not None:
+                return cached_json_response(cached, request, headers)
+        
+        # Sort (nivel, hora) and group by date and seccion in MongoDB (frontend format)
+        grouped, next_cursor = await fetch_grouped(
+            database.activities, query, ACTIVITY_SORT, ACTIVITY_PROJECTION, limit=limit, cursor=cursor
+        )
+        
+        response = {
             "success": True,
             "activities": grouped
         }
+        if cacheable:
+            entry = calendar_cache.set(database.activities.name, version, date_from, date_to, seccion, response)
+            return cached_json_response(entry, request, headers)
+        if limit:
+            response["next_cursor"] = next_cursor
+        return JSONResponse(content=response, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1268,10 +1395,15 @@ async def update_activity(
             raise HTTPException(status_code=400, detail="Invalid activity ID")
         
         # Check if activity exists
-        existing = registro_activities_collection.find_one({"_id": obj_id})
+        existing = await database.activities.find_one({"_id": obj_id})
         if not existing:
             raise HTTPException(status_code=404, detail="Activity not found")
         
+        if activity.cursos is not None:
+            cursos_error = activity_cursos_error(activity.cursos)
+            if cursos_error:
+                raise HTTPException(status_code=400, detail=cursos_error)
+        
         # Normalize date strings to YYYY-MM-DD format before validation
         normalized_fecha = normalize_date_string(activity.fecha)
         normalized_fechaFin = normalize_date_string(activity.fechaFin) if activity.fechaFin else None
@@ -1303,13 +1435,18 @@ async def update_activity(
             update_data["cursos"] = activity.cursos
         # Note: If cursos is None and we want to remove it, we'd need to use $unset
         # For now, we'll only update if cursos is provided
+        update_data.update(activity_sort_fields({**existing, **update_data}))
         
-        registro_activities_collection.update_one(
+        await database.activities.update_one(
             {"_id": obj_id},
             {"$set": update_data}
         )
+        await record_calendar_change(
+            database.activities,
+            [(existing.get("fecha"), existing.get("seccion")), (normalized_fecha, activity.seccion)]
+        )
         
-        updated = registro_activities_collection.find_one({"_id": obj_id})
+        updated = await database.activities.find_one({"_id": obj_id})
         after_state = serialize_activity(updated)
         
         # Log the update
@@ -1349,15 +1486,16 @@ async def delete_activity(
             raise HTTPException(status_code=400, detail="Invalid activity ID")
         
         # Store before state for logging (before deletion)
-        existing = registro_activities_collection.find_one({"_id": obj_id})
+        existing = await database.activities.find_one({"_id": obj_id})
         if not existing:
             raise HTTPException(status_code=404, detail="Activity not found")
         
         before_state = serialize_activity(existing)
         
-        result = registro_activities_collection.delete_one({"_id": obj_id})
+        deleted_count = await database.activities.delete_one({"_id": obj_id})
+        await record_calendar_change(database.activities, [(existing.get("fecha"), existing.get("seccion"))])
         
-        if result.deleted_count == 0:
+        if deleted_count == 0:
             raise HTTPException(status_code=404, detail="Activity not found")
         
         # Log the deletion
@@ -1392,41 +1530,23 @@ async def create_evaluation(
             raise HTTPException(status_code=403, detail="Editor role required")
         
         # Validate seccion
-        if evaluation.seccion not in ["Junior", "Middle", "Senior"]:
+        if evaluation.seccion not in EVALUATION_SECTIONS:
             raise HTTPException(status_code=400, detail="Invalid seccion. Must be Junior, Middle, or Senior")
         
         # Validate that fecha is not Sunday
         if evaluation.fecha and is_sunday(evaluation.fecha):
-            raise HTTPException(status_code=400, detail="No se permiten evaluaciones en Domingo")
+            raise HTTPException(status_code=400, detail=EVALUATION_SUNDAY_MESSAGE)
         
         # Validate cursos array - debe ser una lista no vacía
-        if not isinstance(evaluation.cursos, list):
-            raise HTTPException(status_code=400, detail="cursos must be an array")
-        if len(evaluation.cursos) == 0:
-            raise HTTPException(status_code=400, detail="At least one course must be specified in cursos array")
-        if len(evaluation.cursos) > 3:
-            raise HTTPException(status_code=400, detail="Maximum 3 courses allowed per evaluation")
+        cursos_error = evaluation_cursos_error(evaluation.cursos)
+        if cursos_error:
+            raise HTTPException(status_code=400, detail=cursos_error)
         
-        # Validar que todos los elementos sean strings
-        if not all(isinstance(c, str) for c in evaluation.cursos):
-            raise HTTPException(status_code=400, detail="All items in cursos array must be strings")
+        evaluation_doc = evaluation_document(evaluation, current_user["email"], datetime.utcnow().isoformat())
         
-        # Create evaluation document - guardar cursos como array
-        evaluation_doc = {
-            "seccion": evaluation.seccion,
-            "asignatura": evaluation.asignatura,
-            "tema": evaluation.tema,
-            "cursos": evaluation.cursos,  # Array de cursos - guardar tal cual
-            "fecha": evaluation.fecha,
-            "created_by": current_user["email"],
-            "created_at": datetime.utcnow().isoformat(),
-        }
-        # Add hora if provided
-        if evaluation.hora is not None:
-            evaluation_doc["hora"] = evaluation.hora
-        
-        result = registro_evaluations_collection.insert_one(evaluation_doc)
-        evaluation_doc["_id"] = result.inserted_id
+        inserted_id = await database.evaluations.insert_one(evaluation_doc)
+        evaluation_doc["_id"] = inserted_id
+        await record_calendar_change(database.evaluations, [(evaluation.fecha, evaluation.seccion)])
         serialized_eval = serialize_evaluation(evaluation_doc)
         
         # Log the creation
@@ -1434,7 +1554,7 @@ async def create_evaluation(
             user_email=current_user["email"],
             action="create",
             entity="evaluation",
-            entity_id=str(result.inserted_id),
+            entity_id=str(inserted_id),
             before=None,
             after=serialized_eval
         )
@@ -1450,107 +1570,138 @@ async def create_evaluation(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error creating evaluation: {str(e)}")
 
+@app.post("/api/evaluations/batch")
+async def create_evaluations_batch(
+    payload: CalendarBatchCreate,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Create many evaluations in one request (Editor only)
+    Items have the same fields as POST /api/evaluations. All items are validated
+    first, valid ones are inserted with a single unordered insert_many, and the
+    response has one result per item (see /api/activities/batch)
+    """
+    try:
+        if current_user.get("role") != "editor":
+            raise HTTPException(status_code=403, detail="Editor role required")
+        validate_batch_size(payload.items)
+        
+        results = [{"index": index, "success": True} for index in range(len(payload.items))]
+        evaluations = [None] * len(payload.items)
+        for index, item in enumerate(payload.items):
+            try:
+                evaluation = EvaluationCreate.model_validate(item)
+            except ValidationError as e:
+                results[index] = {"index": index, "success": False, "error": pydantic_error_message(e)}
+                continue
+            error_message = None
+            if evaluation.seccion not in EVALUATION_SECTIONS:
+                error_message = "Invalid seccion. Must be Junior, Middle, or Senior"
+            else:
+                error_message = evaluation_cursos_error(evaluation.cursos)
+            if error_message:
+                results[index] = {"index": index, "success": False, "error": error_message}
+                continue
+            evaluations[index] = evaluation
+        
+        # Sunday check for every fecha in one vectorized pass
+        sundays = sunday_mask([e.fecha if e else None for e in evaluations])
+        for index in np.flatnonzero(sundays):
+            results[index] = {"index": int(index), "success": False, "error": EVALUATION_SUNDAY_MESSAGE}
+            evaluations[index] = None
+        
+        created_at = datetime.utcnow().isoformat()
+        documents, owners = [], []
+        for index, evaluation in enumerate(evaluations):
+            if evaluation is not None:
+                documents.append(evaluation_document(evaluation, current_user["email"], created_at))
+                owners.append(index)
+        
+        inserted = await insert_batch(database.evaluations, documents, owners, results)
+        if inserted:
+            await record_calendar_change(database.evaluations, [(doc["fecha"], doc["seccion"]) for doc in inserted])
+        # Audit entries are queued and written in batches by audit_writer
+        for document in inserted:
+            log_activity_action(
+                user_email=current_user["email"],
+                action="create",
+                entity="evaluation",
+                entity_id=str(document["_id"]),
+                before=None,
+                after=serialize_evaluation(document)
+            )
+        
+        return batch_response("evaluations", results, inserted)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/api/evaluations")
 async def get_evaluations(
+    request: Request,
     date_from: str | None = None,
     date_to: str | None = None,
     seccion: str | None = None,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    stream: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """
     Get evaluations filtered by date range and/or seccion
     Returns evaluations grouped by date and seccion (frontend format)
+    Pagination: pass `limit` to get at most that many items in (fecha, id) order
+    plus a `next_cursor` to send back as `cursor` for the following page
+    stream=true emits the response one date group at a time
     """
     try:
-        query = {}
-        
-        # Date range filter
-        if date_from or date_to:
-            date_query = {}
-            if date_from:
-                date_query["$gte"] = date_from
-            if date_to:
-                date_query["$lte"] = date_to
-            query["fecha"] = date_query
-        
-        # Seccion filter
-        if seccion:
-            if seccion not in ["Junior", "Middle", "Senior"]:
-                raise HTTPException(status_code=400, detail="Invalid seccion")
-            query["seccion"] = seccion
-        
-        # Fetch evaluations
-        evaluations = list(registro_evaluations_collection.find(query).sort("fecha", 1))
-        
-        # Custom order for niveles
-        nivel_order = ["5", "6", "7", "8", "I", "II", "III", "IV"]
-        
-        def extract_nivel(evaluation):
-            """Extract nivel from evaluation cursos array"""
-            cursos = evaluation.get("cursos", [])
-            if not cursos:
-                # Fallback to legacy curso field
-                curso = evaluation.get("curso", "")
-                if curso:
-                    cursos = [curso] if isinstance(curso, str) else curso
-            
-            if not cursos:
-                return None
-            
-            # Get first curso to determine nivel
-            first_curso = cursos[0] if isinstance(cursos, list) else cursos
-            if not isinstance(first_curso, str):
-                return None
-            
-            # Extract nivel from curso string (e.g., "5° A" -> "5", "I EM A" -> "I")
-            first_curso = first_curso.strip()
-            
-            # Check for Middle levels (5, 6, 7, 8)
-            for nivel in ["5", "6", "7", "8"]:
-                if first_curso.startswith(nivel + "°") or first_curso.startswith(nivel + " "):
-                    return nivel
-            
-            # Check for Senior levels (I, II, III, IV)
-            for nivel in ["I", "II", "III", "IV"]:
-                if first_curso.startswith(nivel + " EM") or first_curso.startswith(nivel + " "):
-                    return nivel
-            
-            return None
+        query = build_calendar_query(date_from, date_to, seccion)
         
-        def sort_key(evaluation):
-            """Sort key function for evaluations"""
-            nivel = extract_nivel(evaluation)
-            if nivel is None:
-                return (999, evaluation.get("fecha", ""))  # Unknown niveles go to end
-            
+        # Validate pagination cursor up front (a malformed cursor is a client error)
+        if cursor:
             try:
-                nivel_index = nivel_order.index(nivel)
-            except ValueError:
-                nivel_index = 999  # Unknown nivel
-            
-            # Primary sort: nivel order, Secondary sort: fecha
-            return (nivel_index, evaluation.get("fecha", ""))
+                decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        # Unchanged data is answered with 304 before any document is read
+        version, headers = await calendar_cache_headers(
+            database.evaluations, date_from=date_from, date_to=date_to, seccion=seccion,
+            limit=limit, cursor=cursor, stream=stream
+        )
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        if stream:
+            return StreamingResponse(
+                stream_grouped_json("evaluations", database.evaluations, query, EVALUATION_SORT, EVALUATION_PROJECTION, limit=limit, cursor=cursor),
+                media_type="application/json",
+                headers=headers
+            )
         
-        # Sort evaluations by nivel (and fecha as secondary)
-        evaluations.sort(key=sort_key)
+        # Full (unpaginated) reads are served from the in-process response cache
+        cacheable = not limit and not cursor
+        if cacheable:
+            cached = calendar_cache.get(database.evaluations.name, version, date_from, date_to, seccion)
+            if cached is not None:
+                return cached_json_response(cached, request, headers)
         
-        # Group by date and seccion (frontend format)
-        grouped = {}
-        for evaluation in evaluations:
-            fecha = evaluation["fecha"]
-            seccion_key = evaluation["seccion"]
-            
-            if fecha not in grouped:
-                grouped[fecha] = {}
-            if seccion_key not in grouped[fecha]:
-                grouped[fecha][seccion_key] = []
-            
-            grouped[fecha][seccion_key].append(serialize_evaluation(evaluation))
+        # Sort (nivel) and group by date and seccion in MongoDB (frontend format)
+        grouped, next_cursor = await fetch_grouped(
+            database.evaluations, query, EVALUATION_SORT, EVALUATION_PROJECTION, limit=limit, cursor=cursor
+        )
         
-        return {
+        response = {
             "success": True,
             "evaluations": grouped
         }
+        if cacheable:
+            entry = calendar_cache.set(database.evaluations.name, version, date_from, date_to, seccion, response)
+            return cached_json_response(entry, request, headers)
+        if limit:
+            response["next_cursor"] = next_cursor
+        return JSONResponse(content=response, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1575,7 +1726,7 @@ async def update_evaluation(
             raise HTTPException(status_code=400, detail="Invalid evaluation ID")
         
         # Check if evaluation exists
-        existing = registro_evaluations_collection.find_one({"_id": obj_id})
+        existing = await database.evaluations.find_one({"_id": obj_id})
         if not existing:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
@@ -1608,17 +1759,22 @@ async def update_evaluation(
         # Add hora if provided
         if evaluation.hora is not None:
             update_data["hora"] = evaluation.hora
+        update_data.update(evaluation_sort_fields(update_data))
         
         # Store before state for logging
         before_state = serialize_evaluation(existing)
         
         # Eliminar campo "curso" si existe (migración)
-        registro_evaluations_collection.update_one(
+        await database.evaluations.update_one(
             {"_id": obj_id},
             {"$set": update_data, "$unset": {"curso": ""}}
         )
+        await record_calendar_change(
+            database.evaluations,
+            [(existing.get("fecha"), existing.get("seccion")), (evaluation.fecha, evaluation.seccion)]
+        )
         
-        updated = registro_evaluations_collection.find_one({"_id": obj_id})
+        updated = await database.evaluations.find_one({"_id": obj_id})
         after_state = serialize_evaluation(updated)
         
         # Log the update
@@ -1660,15 +1816,16 @@ async def delete_evaluation(
             raise HTTPException(status_code=400, detail="Invalid evaluation ID")
         
         # Store before state for logging (before deletion)
-        existing = registro_evaluations_collection.find_one({"_id": obj_id})
+        existing = await database.evaluations.find_one({"_id": obj_id})
         if not existing:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
         before_state = serialize_evaluation(existing)
         
-        result = registro_evaluations_collection.delete_one({"_id": obj_id})
+        deleted_count = await database.evaluations.delete_one({"_id": obj_id})
+        await record_calendar_change(database.evaluations, [(existing.get("fecha"), existing.get("seccion"))])
         
-        if result.deleted_count == 0:
+        if deleted_count == 0:
             raise HTTPException(status_code=404, detail="Evaluation not found")
         
         # Log the deletion
@@ -1690,35 +1847,363 @@ async def delete_evaluation(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/calendar")
+async def get_calendar(
+    request: Request,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    seccion: str | None = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get activities and evaluations for the same filters in one request
+    Both queries run concurrently; returns both grouped structures (same format as
+    /api/activities and /api/evaluations)
+    """
+    try:
+        query = build_calendar_query(date_from, date_to, seccion)
+        
+        # Combined ETag from both collection versions
+        versions = await database.versions.get_many([database.activities.name, database.evaluations.name])
+        version = f"{versions[database.activities.name]}.{versions[database.evaluations.name]}"
+        headers = {
+            "ETag": make_etag("calendar", version, {"date_from": date_from, "date_to": date_to, "seccion": seccion}),
+            "Cache-Control": CALENDAR_CACHE_CONTROL,
+        }
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        (activities, _), (evaluations, _) = await asyncio.gather(
+            fetch_grouped(database.activities, query, ACTIVITY_SORT, ACTIVITY_PROJECTION),
+            fetch_grouped(database.evaluations, query, EVALUATION_SORT, EVALUATION_PROJECTION),
+        )
+        
+        return JSONResponse(
+            content={
+                "success": True,
+                "activities": activities,
+                "evaluations": evaluations
+            },
+            headers=headers
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+# ============================================
+# BULK EDIT (filter-based)
+# ============================================
+
+class CalendarBulkFilter(BaseModel):
+    date_from: str  # YYYY-MM-DD
+    date_to: str  # YYYY-MM-DD
+    seccion: Optional[str] = None
+    cursos: Optional[List[str]] = None  # Items with any of these cursos
+
+class CalendarBulkShift(CalendarBulkFilter):
+    days: int  # Negative moves items earlier
+
+class CalendarBulkReassign(CalendarBulkFilter):
+    new_seccion: Optional[str] = None
+    new_cursos: Optional[List[str]] = None
+
+# collection path segment -> (repository attribute, audit entity, date fields moved by a shift)
+BULK_TARGETS = {
+    "activities": ("activities", "activity", ["fecha", "fechaFin"]),
+    "evaluations": ("evaluations", "evaluation", ["fecha"]),
+}
+
+def bulk_target(collection: str) -> tuple:
+    if collection not in BULK_TARGETS:
+        raise HTTPException(status_code=404, detail="Unknown collection. Must be activities or evaluations")
+    attribute, entity, date_fields = BULK_TARGETS[collection]
+    return getattr(database, attribute), entity, date_fields
+
+def bulk_query(payload: CalendarBulkFilter) -> dict:
+    date_from = normalize_date_string(payload.date_from)
+    date_to = normalize_date_string(payload.date_to)
+    if parse_date(date_from) is None or parse_date(date_to) is None:
+        raise HTTPException(status_code=400, detail="date_from and date_to must be valid dates (YYYY-MM-DD)")
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must be before or equal to date_to")
+    if payload.seccion and payload.seccion not in EVALUATION_SECTIONS:
+        raise HTTPException(status_code=400, detail="Invalid seccion. Must be Junior, Middle, or Senior")
+    return bulk_filter_query(date_from, date_to, payload.seccion, payload.cursos)
+
+def log_bulk_action(current_user: dict, action: str, entity: str, payload: CalendarBulkFilter,
+                    matched: int, summary: dict, changed: dict | None = None):
+    """
+    One compact audit entry for a whole bulk operation (instead of one per document)
+    before/after hold item fields like any other entry: the seccion the filter
+    pins and the fields the operation set (`changed`); the filter, match count
+    and operation summary are stored under `bulk`
+    """
+    before = {"seccion": payload.seccion} if payload.seccion else {}
+    log_activity_action(
+        user_email=current_user["email"],
+        action=action,
+        entity=entity,
+        entity_id="bulk",
+        before=before,
+        after=None if action == "delete" else {**before, **(changed or {})},
+        bulk={"filter": payload.model_dump(include=set(CalendarBulkFilter.model_fields)), "matched": matched, **summary}
+    )
+
+@app.post("/api/{collection}/bulk/shift")
+async def bulk_shift(
+    collection: str,
+    payload: CalendarBulkShift,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Move every activity/evaluation matching the filter by `days` days (Editor only)
+    Runs as a single update_many; rejected without changes if any shifted date
+    (or activity range) would include a Sunday. Items whose fecha is not
+    YYYY-MM-DD are not moved
+    """
+    try:
+        if current_user.get("role") != "editor":
+            raise HTTPException(status_code=403, detail="Editor role required")
+        repository, entity, date_fields = bulk_target(collection)
+        if payload.days == 0 or abs(payload.days) > MAX_SHIFT_DAYS:
+            raise HTTPException(status_code=400, detail=f"days must be between -{MAX_SHIFT_DAYS} and {MAX_SHIFT_DAYS}, and not 0")
+        # Items with a fecha the pipeline cannot parse are left out of every step
+        query = shiftable_query(bulk_query(payload))
+        
+        groups = await affected_groups(repository, query)
+        matched = sum(group["count"] for group in groups)
+        if not matched:
+            return {"success": True, "matched": 0, "modified": 0, "message": "No items match the filter"}
+        
+        sunday_message = EVALUATION_SUNDAY_MESSAGE if entity == "evaluation" else None
+        sunday_errors = shift_sunday_errors(groups, payload.days, sunday_message)
+        if sunday_errors:
+            shown = "; ".join(sunday_errors[:10])
+            more = f" (and {len(sunday_errors) - 10} more)" if len(sunday_errors) > 10 else ""
+            raise HTTPException(status_code=400, detail=f"Shift would place items on Sunday: {shown}{more}")
+        
+        result = await repository.update_many(
+            query,
+            shift_dates_pipeline(payload.days, date_fields, current_user["email"], datetime.utcnow().isoformat())
+        )
+        changes = [(group["fecha"], group["seccion"]) for group in groups]
+        changes += [(shift_date_string(group["fecha"], payload.days), group["seccion"]) for group in groups]
+        await record_calendar_change(repository, changes)
+        
+        log_bulk_action(current_user, "update", entity, payload, matched, {
+            "operation": "shift", "days": payload.days, "modified": result.modified_count
+        })
+        return {
+            "success": True,
+            "matched": result.matched_count,
+            "modified": result.modified_count,
+            "message": f"Moved {result.modified_count} item(s) by {payload.days} day(s)"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/{collection}/bulk/reassign")
+async def bulk_reassign(
+    collection: str,
+    payload: CalendarBulkReassign,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Change seccion and/or cursos of every activity/evaluation matching the filter
+    (Editor only), as a single update_many
+    """
+    try:
+        if current_user.get("role") != "editor":
+            raise HTTPException(status_code=403, detail="Editor role required")
+        repository, entity, _ = bulk_target(collection)
+        if payload.new_seccion is None and payload.new_cursos is None:
+            raise HTTPException(status_code=400, detail="new_seccion or new_cursos is required")
+        if payload.new_seccion is not None and payload.new_seccion not in EVALUATION_SECTIONS:
+            raise HTTPException(status_code=400, detail="Invalid new_seccion. Must be Junior, Middle, or Senior")
+        if payload.new_cursos is not None:
+            cursos_error = (evaluation_cursos_error if entity == "evaluation" else activity_cursos_error)(payload.new_cursos)
+            if cursos_error:
+                raise HTTPException(status_code=400, detail=cursos_error)
+        query = bulk_query(payload)
+        
+        groups = await affected_groups(repository, query)
+        matched = sum(group["count"] for group in groups)
+        if not matched:
+            return {"success": True, "matched": 0, "modified": 0, "message": "No items match the filter"}
+        
+        update_data = {"updated_at": datetime.utcnow().isoformat(), "updated_by": current_user["email"]}
+        if payload.new_seccion is not None:
+            update_data["seccion"] = payload.new_seccion
+        if payload.new_cursos is not None:
+            update_data["cursos"] = payload.new_cursos
+            # Same cursos for every document, so the derived nivel sort key is too
+            update_data["nivel_index"] = nivel_index({"cursos": payload.new_cursos})
+        result = await repository.update_many(query, {"$set": update_data})
+        
+        changes = [(group["fecha"], group["seccion"]) for group in groups]
+        if payload.new_seccion is not None:
+            changes += [(group["fecha"], payload.new_seccion) for group in groups]
+        await record_calendar_change(repository, changes)
+        
+        changed = {field: update_data[field] for field in ("seccion", "cursos") if field in update_data}
+        log_bulk_action(current_user, "update", entity, payload, matched, {
+            "operation": "reassign", "modified": result.modified_count
+        }, changed)
+        return {
+            "success": True,
+            "matched": result.matched_count,
+            "modified": result.modified_count,
+            "message": f"Updated {result.modified_count} item(s)"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/{collection}/bulk/delete")
+async def bulk_delete(
+    collection: str,
+    payload: CalendarBulkFilter,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Delete every activity/evaluation matching the filter (Editor only), as a single delete_many
+    """
+    try:
+        if current_user.get("role") != "editor":
+            raise HTTPException(status_code=403, detail="Editor role required")
+        repository, entity, _ = bulk_target(collection)
+        query = bulk_query(payload)
+        
+        groups = await affected_groups(repository, query)
+        if not groups:
+            return {"success": True, "deleted": 0, "message": "No items match the filter"}
+        
+        deleted = await repository.delete_many(query)
+        await record_calendar_change(repository, [(group["fecha"], group["seccion"]) for group in groups])
+        
+        log_bulk_action(current_user, "delete", entity, payload, sum(group["count"] for group in groups), {
+            "operation": "delete", "deleted": deleted
+        })
+        return {
+            "success": True,
+            "deleted": deleted,
+            "message": f"Deleted {deleted} item(s)"
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # ============================================
 # EMAIL REPORTING
 # ============================================
 
+# Upper bound on recipients of a single report email request
+REPORT_MAX_RECIPIENTS = int(os.environ.get("REPORT_MAX_RECIPIENTS", "200"))
+
+
+async def resolve_role_recipients(roles: Optional[str]) -> list:
+    """Emails of active users whose role is in the comma-separated `roles`"""
+    wanted = [role.strip().lower() for role in (roles or "").split(",") if role.strip()]
+    if not wanted:
+        return []
+    unknown = [role for role in wanted if role not in VALID_ROLES]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid role(s): {', '.join(unknown)}. Must be one of: {', '.join(sorted(VALID_ROLES))}"
+        )
+    users = await database.users.find(
+        {"role": {"$in": wanted}, "is_active": {"$ne": False}},
+        projection={"email": 1, "_id": 0},
+        sort=[("email", 1)],
+    )
+    return [user["email"] for user in users if user.get("email")]
+
+
+async def queue_report_email(settings: SMTPSettings, pdf_bytes: bytes, pdf_filename: Optional[str],
+                             subject: str, to: Optional[str], recipient_roles: Optional[str],
+                             current_user: dict) -> JSONResponse:
+    """
+    Resolve recipients, build one message per recipient around a shared PDF part
+    and queue them as a single mail job. Responds 202 with the job id.
+    Sending to whole roles (every active user with the role) is Editor only.
+    """
+    if recipient_roles and recipient_roles.strip() and current_user.get("role") != "editor":
+        raise HTTPException(status_code=403, detail="Not enough permissions. Editor role required to send to roles.")
+    role_emails = await resolve_role_recipients(recipient_roles)
+    recipients, invalid = split_recipients(to, ",".join(role_emails))
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid email address(es): {', '.join(invalid)}")
+    if not recipients:
+        raise HTTPException(status_code=400, detail="At least one recipient is required (to or recipientRoles)")
+    if len(recipients) > REPORT_MAX_RECIPIENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many recipients ({len(recipients)}). Maximum allowed is {REPORT_MAX_RECIPIENTS}."
+        )
+
+    # The PDF is encoded once; inline images and the HTML body are prebuilt
+    pdf_part = report_assets.pdf_attachment(pdf_bytes, pdf_filename)
+    deliveries = [
+        (recipient, report_assets.build_message(subject, settings.from_addr, recipient, pdf_part))
+        for recipient in recipients
+    ]
+    print(f"[EMAIL] PDF attachment added successfully: {pdf_filename} ({len(recipients)} recipient(s))")
+
+    # Queue for delivery; the SMTP exchange happens off the request path
+    try:
+        job_id = await mail_queue.submit(deliveries, subject=subject, requested_by=current_user["email"])
+    except MailQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Only the count: role recipients are resolved server-side and are not echoed back
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": True,
+            "job_id": job_id,
+            "status": "queued",
+            "recipient_count": len(recipients),
+            "message": f"Email queued for delivery to {len(recipients)} recipient(s)"
+        }
+    )
+
+
 @app.post("/api/send-report-email")
 async def send_report_email(
     pdf: UploadFile = File(...),
-    to: str = Form(...),
+    to: Optional[str] = Form(None),
+    recipientRoles: Optional[str] = Form(None),
     subject: str = Form(...),
     reportType: str = Form(...),
     section: str = Form(...),
     nivel: str = Form(...),
     dateFrom: str = Form(...),
-    dateTo: str = Form(...)
+    dateTo: str = Form(...),
+    current_user: dict = Depends(get_current_user)
 ):
     """
     Send report email with PDF attachment
     Receives PDF file generated by frontend (Chrome's rendering engine)
     This ensures the PDF is EXACTLY the same as the browser-generated PDF
+
+    Recipients: `to` may hold several addresses (comma, semicolon or newline
+    separated) and `recipientRoles` selects every active user with one of the
+    given roles (e.g. "editor,viewer"; Editor only). The PDF is uploaded once
+    and each recipient gets their own copy of the message.
+
+    The messages are queued and sent in the background: responds 202 with a
+    job_id whose per-recipient status can be polled at /api/send-report-email/{job_id}
     """
     try:
-        # Get SMTP settings from environment
-        SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
-        SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
-        SMTP_USER = os.environ.get("SMTP_USER", "")
-        SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
-        SMTP_FROM = os.environ.get("SMTP_FROM", SMTP_USER)
+        settings = mail_queue.settings or SMTPSettings.from_env()
 
-        if not SMTP_USER or not SMTP_PASSWORD:
+        if not settings.configured:
             # For demo purposes, just return success without sending
             # In production, you'd configure real SMTP credentials
             return {
@@ -1733,153 +2218,10 @@ async def send_report_email(
         if not pdf_bytes:
             raise HTTPException(status_code=400, detail="PDF file is empty")
 
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = SMTP_FROM
-        message["To"] = to
-
-        # Load and attach logo image for inline display
-        # Try to find logo_header.png first, fallback to existing logo
-        logo_header_path = ROOT_DIR.parent / "frontend" / "public" / "img" / "logo" / "logo_header.png"
-        logo_path = ROOT_DIR.parent / "frontend" / "public" / "img" / "logo" / "imalogotipo-blanco_sinfondo_2.png"
-        
-        # Prefer logo_header.png if it exists, otherwise use the existing logo
-        if logo_header_path.exists():
-            logo_path = logo_header_path
-        
-        logo_img = None
-        if logo_path.exists():
-            try:
-                with open(logo_path, "rb") as f:
-                    logo_img = f.read()
-                
-                # Attach logo as inline image with Content-ID
-                logo_part = MIMEImage(logo_img)
-                logo_part.add_header("Content-ID", "<logo_header>")
-                logo_part.add_header("Content-Disposition", "inline", filename="logo_header.png")
-                message.attach(logo_part)
-                print(f"[EMAIL] Logo attached successfully: {logo_path.name}")
-            except Exception as e:
-                print(f"[EMAIL] Warning: Could not load logo image: {str(e)}")
-                logo_img = None
-
-        # Load and attach pie_correo1.png image for inline display at the end
-        # Try new location first (frontend/public/img/pie_correo1.png), fallback to formas folder
-        pie_correo1_path = ROOT_DIR.parent / "frontend" / "public" / "img" / "pie_correo1.png"
-        pie_correo1_fallback_path = ROOT_DIR.parent / "frontend" / "public" / "img" / "formas" / "pie_correo1.png"
-        
-        # Use new location if exists, otherwise use fallback
-        if not pie_correo1_path.exists() and pie_correo1_fallback_path.exists():
-            pie_correo1_path = pie_correo1_fallback_path
-        
-        pie_correo1_img = None
-        if pie_correo1_path.exists():
-            try:
-                # Log the path being used for debugging
-                print(f"[EMAIL] Loading pie_correo1 image from: {pie_correo1_path}")
-                
-                with open(pie_correo1_path, "rb") as f:
-                    pie_correo1_img = f.read()
-                
-                # Verify the image was read successfully
-                if not pie_correo1_img:
-                    print(f"[EMAIL] ERROR: pie_correo1 image file is empty: {pie_correo1_path}")
-                else:
-                    # Attach pie_correo1 as inline image with Content-ID
-                    pie_correo1_part = MIMEImage(pie_correo1_img)
-                    pie_correo1_part.add_header("Content-ID", "<pie_correo1>")
-                    pie_correo1_part.add_header("Content-Disposition", "inline", filename="pie_correo1.png")
-                    message.attach(pie_correo1_part)
-                    print(f"[EMAIL] ✓ Pie correo1 image attached successfully: {pie_correo1_path.name} ({len(pie_correo1_img)} bytes)")
-            except FileNotFoundError as e:
-                print(f"[EMAIL] ERROR: pie_correo1 image file not found: {pie_correo1_path}")
-                print(f"[EMAIL] Full path attempted: {pie_correo1_path.absolute()}")
-            except PermissionError as e:
-                print(f"[EMAIL] ERROR: Permission denied reading pie_correo1 image: {pie_correo1_path}")
-            except Exception as e:
-                print(f"[EMAIL] ERROR: Could not load pie_correo1 image: {str(e)}")
-                print(f"[EMAIL] Exception type: {type(e).__name__}")
-                pie_correo1_img = None
-        else:
-            print(f"[EMAIL] WARNING: pie_correo1 image not found at either location:")
-            print(f"[EMAIL]   - Primary: {ROOT_DIR.parent / 'frontend' / 'public' / 'img' / 'pie_correo1.png'}")
-            print(f"[EMAIL]   - Fallback: {pie_correo1_fallback_path}")
-            print(f"[EMAIL] Email will be sent without pie_correo1 image.")
-
-        # Add professional corporate HTML content for email body
-        # Header padding reduced by ~40% (from 25px to 15px) for more compact design
-        BODY_HTML = """<!DOCTYPE html>
-<html>
-<body style="font-family: Arial, sans-serif; color: #222; padding: 20px;">
-  <div style="background:#1A2346; padding: 15px; color: white; border-radius: 8px;">
-    <table style="width: 100%; border-collapse: collapse;">
-      <tr>
-        <td style="width: 160px; vertical-align: middle; padding-right: 20px;">
-          <img src="cid:logo_header" alt="Redland School Logo" style="width: 160px; height: auto; display: block;" />
-        </td>
-        <td style="vertical-align: middle; text-align: center;">
-          <h1 style="margin:0; font-size: 24px; letter-spacing: 1px;">
-            REDLAND SCHOOL
-          </h1>
-          <p style="margin:3px 0 0 0; font-size: 14px;">
-            Registro de Actividades y Evaluaciones
-          </p>
-        </td>
-        <td style="width: 160px;"></td>
-      </tr>
-    </table>
-  </div>
-
-  <h2 style="margin-top: 30px; color:#1A2346; font-size:22px;">
-    Reporte Institucional
-  </h2>
-
-  <p style="font-size: 15px; line-height:1.6;">
-    Estimado/a,<br><br>
-    Se adjunta el reporte institucional correspondiente al período seleccionado.<br>
-    El documento adjunto contiene todas las actividades y evaluaciones dentro del rango de fechas indicado.
-  </p>
-
-  <p style="font-size: 14px; margin-top: 30px;">
-    Saludos cordiales,<br>
-    <strong>Registro Escolar Web – Redland School</strong>
-  </p>
-
-  <p style="font-size: 12px; color:#555; margin-top:40px;">
-    Este es un mensaje generado automáticamente por la plataforma.
-  </p>
-
-  <div style="margin-top: 40px; width: 100%;">
-    <img src="cid:pie_correo1" alt="Pie de correo" style="width: 100%; max-height: 200px; object-fit: cover; display: block;" />
-  </div>
-</body>
-</html>"""
-        html_part = MIMEText(BODY_HTML, "html", "utf-8")
-        message.attach(html_part)
-
-        # Attach PDF file directly - NO generation, just attach what we received
-        # This PDF is EXACTLY the same as the one generated by the browser
-        pdf_part = MIMEApplication(pdf_bytes, _subtype="pdf")
-        pdf_part.add_header(
-            "Content-Disposition",
-            "attachment",
-            filename=pdf.filename or "Reporte.pdf"
-        )
-        message.attach(pdf_part)
-        print(f"[EMAIL] PDF attachment added successfully: {pdf.filename}")
-
-        # Send email
-        with smtplib.SMTP(SMTP_SERVER, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(message)
-
-        return {
-            "success": True,
-            "message": f"Email sent successfully to {to}"
-        }
+        return await queue_report_email(settings, pdf_bytes, pdf.filename, subject, to, recipientRoles, current_user)
 
+    except HTTPException:
+        raise
     except Exception as e:
         # Log error for debugging (in production, use proper logging)
         raise HTTPException(
@@ -1888,6 +2230,126 @@ async def send_report_email(
         )
 
 
+@app.get("/api/send-report-email/{job_id}")
+async def get_report_email_status(
+    job_id: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Delivery status of a queued report email: queued, sending, sent or failed
+    Only the user who queued the job (or an Editor) can see it
+    """
+    try:
+        job = await mail_queue.get_job(job_id)
+        if not job or (current_user.get("role") != "editor" and job.get("requested_by") != current_user["email"]):
+            raise HTTPException(status_code=404, detail="Email job not found")
+        return {"success": True, **job}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================
+# SERVER-SIDE REPORTS
+# ============================================
+
+class ReportSendRequest(BaseModel):
+    reportType: str
+    section: str = "todas"
+    nivel: str = "todos"
+    dateFrom: str
+    dateTo: str
+    to: Optional[str] = None
+    recipientRoles: Optional[str] = None
+    subject: Optional[str] = None
+
+def report_params(report_type: str, section: str, nivel: str, date_from: str, date_to: str) -> ReportParams:
+    params = ReportParams(report_type, section, nivel or "todos", date_from, date_to)
+    try:
+        params.validate()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return params
+
+async def render_report(params: ReportParams) -> RenderedReport:
+    """
+    Rendered report for `params`, from the cache while the collections it reads
+    have not changed in its range; otherwise queried and rendered in a thread
+    """
+    repositories = {key: getattr(database, key) for key in params.collections}
+    versions = await database.versions.get_many([repo.name for repo in repositories.values()])
+    cached = report_cache.get(params, versions)
+    if cached is not None:
+        return cached
+
+    query = build_calendar_query(params.date_from, params.date_to, params.seccion)
+    activities, evaluations = [], []
+    if "activities" in repositories:
+        activities = await fetch_report_rows(database.activities, query, ACTIVITY_SORT, ACTIVITY_PROJECTION, params.nivel)
+    if "evaluations" in repositories:
+        evaluations = await fetch_report_rows(database.evaluations, query, EVALUATION_SORT, EVALUATION_PROJECTION, params.nivel)
+
+    pdf_bytes = await asyncio.to_thread(render_report_pdf, params, activities, evaluations, report_assets.logo_path)
+    print(f"[REPORT] Rendered {params.filename} ({len(pdf_bytes)} bytes)")
+    return report_cache.set(params, versions, pdf_bytes)
+
+@app.get("/api/reports/render")
+async def get_report_pdf(
+    request: Request,
+    reportType: str,
+    dateFrom: str,
+    dateTo: str,
+    section: str = "todas",
+    nivel: str = "todos",
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Render the activities/evaluations report as a PDF on the server
+    Same parameters as the report panel; repeated requests for unchanged data
+    are served from the report cache (and answer 304 to If-None-Match)
+    """
+    try:
+        params = report_params(reportType, section, nivel, dateFrom, dateTo)
+        report = await render_report(params)
+        headers = {
+            "ETag": make_etag("report", ".".join(str(v) for v in report.versions.values()), params.__dict__),
+            "Cache-Control": CALENDAR_CACHE_CONTROL,
+            "Content-Disposition": f'inline; filename="{params.filename}"',
+        }
+        if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        return Response(content=report.pdf, media_type="application/pdf", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rendering report: {str(e)}")
+
+@app.post("/api/reports/send")
+async def send_rendered_report(payload: ReportSendRequest, current_user: dict = Depends(get_current_admin_user)):
+    """
+    Render the report on the server and email it (no PDF upload needed, Editor only)
+    Recipients and response are the same as /api/send-report-email (202 + job_id)
+    """
+    try:
+        params = report_params(payload.reportType, payload.section, payload.nivel, payload.dateFrom, payload.dateTo)
+        settings = mail_queue.settings or SMTPSettings.from_env()
+        if not settings.configured:
+            return {
+                "success": True,
+                "message": "Email functionality not configured. Please add SMTP credentials to .env file.",
+                "demo_mode": True
+            }
+
+        report = await render_report(params)
+        subject = payload.subject or f"Reporte Institucional {params.date_from} - {params.date_to}"
+        return await queue_report_email(settings, report.pdf, params.filename, subject, payload.to, payload.recipientRoles, current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error sending report: {str(e)}")
+
+
 @app.get("/api/test-email")
 async def test_email():
     """
@@ -2031,6 +2493,48 @@ async def root():
 # ACTIVITY LOGS (AUDIT) ENDPOINTS
 # ============================================
 
+def build_log_query(
+    user: str | None = None,
+    action: str | None = None,
+    entity: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    seccion: str | None = None
+) -> dict:
+    """MongoDB filter for activity log reads; raises 400 for invalid action/entity"""
+    query = {}
+    
+    # Filter by user
+    if user:
+        query["user"] = user
+    
+    # Filter by action
+    if action:
+        if action not in ["create", "update", "delete"]:
+            raise HTTPException(status_code=400, detail="Invalid action. Must be create, update, or delete")
+        query["action"] = action
+    
+    # Filter by entity
+    if entity:
+        if entity not in ["activity", "evaluation"]:
+            raise HTTPException(status_code=400, detail="Invalid entity. Must be activity or evaluation")
+        query["entity"] = entity
+    
+    # Filter by date range (on timestamp)
+    if date_from or date_to:
+        timestamp_query = {}
+        if date_from:
+            timestamp_query["$gte"] = date_from + "T00:00:00"
+        if date_to:
+            timestamp_query["$lte"] = date_to + "T23:59:59"
+        query["timestamp"] = timestamp_query
+    
+    # Filter by seccion (denormalized from before/after when the entry is written)
+    if seccion:
+        query["secciones"] = seccion
+    
+    return query
+
 @app.get("/api/activity-logs")
 async def get_activity_logs(
     user: str | None = None,
@@ -2039,85 +2543,192 @@ async def get_activity_logs(
     date_from: str | None = None,
     date_to: str | None = None,
     seccion: str | None = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
     current_user: dict = Depends(get_current_admin_user)
 ):
     """
     Get activity logs with filters (Editor only)
     Filters: user, action (create/update/delete), entity (activity/evaluation), date range, seccion
+    Pagination: newest first, at most `limit` entries per page; `next_cursor`
+    (null on the last page) is sent back as `cursor` for the following page
+    Entries moved out by the retention policy are read from the monthly
+    archives that overlap the requested range
+    Update entries only carry `changes`; their full states are served per
+    entry by /api/activity-logs/{log_id}/states
     """
     try:
-        query = {}
+        query = build_log_query(user, action, entity, date_from, date_to, seccion)
         
-        # Filter by user
-        if user:
-            query["user"] = user
-        
-        # Filter by action
-        if action:
-            if action not in ["create", "update", "delete"]:
-                raise HTTPException(status_code=400, detail="Invalid action. Must be create, update, or delete")
-            query["action"] = action
-        
-        # Filter by entity
-        if entity:
-            if entity not in ["activity", "evaluation"]:
-                raise HTTPException(status_code=400, detail="Invalid entity. Must be activity or evaluation")
-            query["entity"] = entity
-        
-        # Filter by date range (on timestamp)
-        if date_from or date_to:
-            timestamp_query = {}
-            if date_from:
-                timestamp_query["$gte"] = date_from + "T00:00:00"
-            if date_to:
-                timestamp_query["$lte"] = date_to + "T23:59:59"
-            query["timestamp"] = timestamp_query
-        
-        # Filter by seccion (extract from before/after data)
-        if seccion:
-            # This requires checking the before/after fields
-            # For simplicity, we'll filter in Python after fetching
-            pass
-        
-        # Fetch logs
-        logs = list(activity_logs_collection.find(query).sort("timestamp", -1).limit(1000))
-        
-        # Filter by seccion if needed (check before/after data)
-        if seccion:
-            filtered_logs = []
-            for log in logs:
-                # Check if seccion matches in before or after data
-                before_seccion = log.get("before", {}).get("seccion")
-                after_seccion = log.get("after", {}).get("seccion")
-                if before_seccion == seccion or after_seccion == seccion:
-                    filtered_logs.append(log)
-            logs = filtered_logs
-        
-        # Serialize logs (convert ObjectId to string)
-        serialized_logs = []
-        for log in logs:
-            serialized_log = {
-                "id": str(log["_id"]),
-                "timestamp": log.get("timestamp"),
-                "user": log.get("user"),
-                "action": log.get("action"),
-                "entity": log.get("entity"),
-                "entity_id": log.get("entity_id"),
-                "before": log.get("before"),
-                "after": log.get("after")
-            }
-            serialized_logs.append(serialized_log)
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        
+        sources = await log_sources(database, date_from, date_to, before=after[0] if after else None)
+        logs, has_more = await find_logs(sources, query, limit, after=after)
         
         return {
             "success": True,
-            "logs": serialized_logs,
-            "count": len(serialized_logs)
+            "logs": [serialize_log(log) for log in logs],
+            "count": len(logs),
+            "next_cursor": log_cursor(logs[-1]) if has_more else None
         }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching activity logs: {str(e)}")
 
+@app.get("/api/activity-logs/export")
+async def export_activity_logs(
+    format: str = "csv",
+    user: str | None = None,
+    action: str | None = None,
+    entity: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    seccion: str | None = None,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Export every log entry matching the filters (Editor only), newest first
+    format: csv, or ndjson (gzip-compressed, one JSON entry per line)
+    The file is streamed from a server-side cursor, including archived months
+    """
+    try:
+        if format not in EXPORT_FORMATS:
+            raise HTTPException(status_code=400, detail="Invalid format. Must be csv or ndjson")
+        query = build_log_query(user, action, entity, date_from, date_to, seccion)
+        sources = await log_sources(database, date_from, date_to)
+        
+        media_type, extension = EXPORT_FORMATS[format]
+        stream = stream_logs_csv if format == "csv" else stream_logs_ndjson_gzip
+        filename = f"activity_logs_{date_from or 'inicio'}_{date_to or datetime.utcnow().date().isoformat()}.{extension}"
+        return StreamingResponse(
+            stream(sources, query),
+            media_type=media_type,
+            headers={"Content-Disposition": f"attachment; filename={filename}"}
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error exporting activity logs: {str(e)}")
+
+def user_log_state(user: dict) -> dict:
+    """A user in the shape its audit entries use"""
+    return {
+        "email": user.get("email"),
+        "role": user.get("role"),
+        "is_active": user.get("is_active", True),
+        "created_at": user.get("created_at"),
+        "updated_at": user.get("updated_at")
+    }
+
+async def current_entity_state(entity: str, entity_id: str) -> dict | None:
+    """Current state of a logged item in the shape its audit entries use (None if it no longer exists)"""
+    if entity == "user":
+        user = await database.users.find_one({"email": entity_id})
+        return user_log_state(user) if user else None
+    if entity == "activity":
+        repository, serialize = database.activities, serialize_activity
+    elif entity == "evaluation":
+        repository, serialize = database.evaluations, serialize_evaluation
+    else:
+        return None
+    if not ObjectId.is_valid(entity_id):
+        return None
+    document = await repository.find_one({"_id": ObjectId(entity_id)})
+    return serialize(document) if document else None
+
+async def nearest_snapshot(log: dict, later: bool = False) -> dict | None:
+    """
+    Closest full-snapshot entry (create/delete, or an update logged before
+    diffs existed) of the same item before `log` (or after it, with later=True).
+    Reads only the collections of the months on that side of the entry, nearest first.
+    """
+    timestamp = log.get("timestamp") or ""
+    query = {"entity_id": log.get("entity_id"), "entity": log.get("entity"), "changes": {"$exists": False}}
+    if later:
+        query["timestamp"] = {"$gte": timestamp}
+        sources = list(reversed(await log_sources(database, date_from=timestamp)))
+        sort = LOG_SORT_ASCENDING
+    else:
+        query["timestamp"] = {"$lte": timestamp}
+        sources = await log_sources(database, date_to=timestamp)
+        sort = LOG_SORT
+    for repository in sources:
+        found = [entry for entry in await repository.find(query, sort=sort, limit=2) if entry["_id"] != log["_id"]]
+        if found:
+            return found[0]
+    return None
+
+async def rebuild_log_state(log: dict) -> dict:
+    """
+    reconstruct_states for one entry, reading only the window it needs: the
+    item's entries (and bulk entries of its collection) between the nearest
+    snapshot and the entry, from the collections of the months in that window.
+    Without an earlier snapshot the window runs forward to the next snapshot
+    or, failing that, to the current document.
+    """
+    if "changes" not in log:
+        return reconstruct_states(log, [])
+    
+    timestamp = log.get("timestamp") or ""
+    current = None
+    snapshot = await nearest_snapshot(log)
+    if snapshot is not None:
+        window_from, window_to = snapshot.get("timestamp") or "", timestamp
+    else:
+        snapshot = await nearest_snapshot(log, later=True)
+        window_from, window_to = timestamp, snapshot.get("timestamp") if snapshot else None
+        if snapshot is None:
+            current = await current_entity_state(log.get("entity"), log.get("entity_id"))
+    
+    window = {"$gte": window_from, **({"$lte": window_to} if window_to else {})}
+    history, bulk = [], []
+    for repository in await log_sources(database, date_from=window_from, date_to=window_to):
+        history += await repository.find({"entity_id": log.get("entity_id"), "entity": log.get("entity"), "timestamp": window})
+        bulk += await repository.find({"entity_id": "bulk", "entity": log.get("entity"), "timestamp": window})
+    # An entry being archived can briefly be in two collections
+    history = list({entry["_id"]: entry for entry in history}.values())
+    return reconstruct_states(log, history, current, bulk)
+
+@app.get("/api/activity-logs/{log_id}/states")
+async def get_activity_log_states(
+    log_id: str,
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Full before/after states of one log entry (Editor only)
+    Update entries only store the changed fields; their full states are rebuilt
+    from the item's history. `complete` is false when the rebuilt states may be inexact
+    """
+    try:
+        try:
+            obj_id = ObjectId(log_id)
+        except InvalidId:
+            raise HTTPException(status_code=400, detail="Invalid log ID")
+        
+        log = None
+        for repository in await log_sources(database):
+            log = await repository.find_one({"_id": obj_id})
+            if log is not None:
+                break
+        if log is None:
+            raise HTTPException(status_code=404, detail="Log entry not found")
+        
+        return {
+            "success": True,
+            "log": serialize_log(log),
+            **await rebuild_log_state(log)
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rebuilding log states: {str(e)}")
+
 @app.get("/api/users/check-status")
 async def check_users_status():
     """
@@ -2125,13 +2736,13 @@ async def check_users_status():
     Useful for debugging login issues
     """
     try:
-        user_count = users_collection.count_documents({})
-        sample_users = list(users_collection.find({}).limit(5))
+        user_count = await database.users.count()
+        sample_users = await database.users.find({}, limit=5)
         
         return {
             "user_count": user_count,
             "collection_name": "users",
-            "database_name": db.name,
+            "database_name": database.name,
             "sample_users": [
                 {
                     "email": u.get("email"),
@@ -2149,6 +2760,103 @@ async def check_users_status():
             "message": "Error checking users collection"
         }
 
+@app.get("/api/admin/indexes")
+async def get_index_report(current_user: dict = Depends(get_current_admin_user)):
+    """
+    Index audit (Editor only)
+    Reports missing/extra/unused indexes and per-index usage stats for every collection
+    """
+    try:
+        return {
+            "success": True,
+            "indexes": await audit_indexes(database.db)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error auditing indexes: {str(e)}")
+
+@app.get("/api/admin/cache-stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_admin_user)):
+    """
+    In-process cache statistics (Editor only)
+    """
+    return {
+        "success": True,
+        "caches": {
+            "users": user_cache.stats(),
+            "calendar_responses": calendar_cache.stats(),
+            "reports": report_cache.stats()
+        }
+    }
+
+@app.get("/api/admin/audit-stats")
+async def get_audit_stats(current_user: dict = Depends(get_current_admin_user)):
+    """
+    Background audit writer statistics: queue depth, written/dropped/failed entries,
+    and log retention runs (Editor only)
+    """
+    return {
+        "success": True,
+        "audit_writer": audit_writer.stats(),
+        "log_archiver": log_archiver.stats()
+    }
+
+@app.get("/api/admin/slow-queries")
+async def get_slow_queries(
+    collection: str | None = None,
+    command: str | None = None,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    current_user: dict = Depends(get_current_admin_user)
+):
+    """
+    Most recent MongoDB commands slower than SLOW_QUERY_THRESHOLD_MS (Editor only)
+    Each entry has the filter shape, duration, documents returned and, from
+    explain(), the plan stages and documents/keys examined
+    """
+    try:
+        query = {}
+        if collection:
+            query["collection"] = collection
+        if command:
+            query["command"] = command
+        # Capped collection: natural order is insertion order
+        entries = await database.collection(SLOW_QUERIES_COLLECTION).find(query, sort=[("$natural", -1)], limit=limit)
+        return {
+            "success": True,
+            "threshold_ms": slow_query_profiler.threshold_ms,
+            "slow_queries": [
+                {"id": str(entry["_id"]), **{key: value for key, value in entry.items() if key != "_id"}}
+                for entry in entries
+            ],
+            "count": len(entries)
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error fetching slow queries: {str(e)}")
+
+@app.get("/api/metrics")
+async def get_metrics(request: Request, token: str = Depends(oauth2_scheme)):
+    """
+    Prometheus metrics: request latency per route, MongoDB command durations
+    per collection, and cache/audit/mail/archive counters
+    Requires "Authorization: Bearer <token>" with METRICS_TOKEN (for the
+    scraper) or an editor's access token
+    """
+    metrics_token = os.environ.get("METRICS_TOKEN")
+    if not (metrics_token and hmac.compare_digest(token.encode("utf-8"), metrics_token.encode("utf-8"))):
+        await get_current_admin_user(await get_current_user(token))
+    components = {
+        "user_cache": user_cache.stats(),
+        "calendar_cache": calendar_cache.stats(),
+        "report_cache": report_cache.stats(),
+        "audit_writer": audit_writer.stats(),
+        "mail_queue": mail_queue.stats(),
+        "log_archiver": log_archiver.stats(),
+        "slow_query_profiler": slow_query_profiler.stats(),
+    }
+    return Response(
+        content=render_metrics(request_metrics, mongo_metrics, components),
+        media_type=PROMETHEUS_CONTENT_TYPE
+    )
+
 @app.get("/api/test-db")
 async def test_db_connection():
     """
@@ -2157,16 +2865,15 @@ async def test_db_connection():
     """
     try:
         # Test connection by listing collections
-        collections = db.list_collection_names()
+        collections = await database.list_collection_names()
         
         # Get database name
-        db_name = db.name
+        db_name = database.name
         
         # Get collection counts
         collection_info = {}
         for collection_name in collections:
-            collection = db[collection_name]
-            collection_info[collection_name] = collection.count_documents({})
+            collection_info[collection_name] = await database.count_documents(collection_name)
         
         return {
             "status": "ok",
@@ -2181,8 +2888,3 @@ async def test_db_connection():
             "error": str(e),
             "message": "Failed to connect to MongoDB Atlas"
         }
-
-# Cleanup on shutdown
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
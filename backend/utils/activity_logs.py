@@ -0,0 +1,232 @@
+from pymongo import UpdateOne
+
+from utils.calendar_data import encode_cursor
+
+
+BACKFILL_BATCH_SIZE = 500
+
+# Newest first; _id breaks ties between entries with the same timestamp
+LOG_SORT = [("timestamp", -1), ("_id", -1)]
+LOG_SORT_ASCENDING = [("timestamp", 1), ("_id", 1)]
+
+
+def log_secciones(before: dict | None, after: dict | None) -> list:
+    """
+    Sections an audit entry belongs to, stored on the entry as `secciones` so
+    the log can be filtered by section with an index (an update that moves an
+    item between sections belongs to both)
+    """
+    secciones = []
+    for state in (before, after):
+        seccion = state.get("seccion") if isinstance(state, dict) else None
+        if seccion and seccion not in secciones:
+            secciones.append(seccion)
+    return secciones
+
+
+def before_log(query: dict, timestamp: str, last_id) -> dict:
+    """Restrict a query to entries older than (timestamp, last_id) in LOG_SORT order"""
+    keyset = {"$or": [
+        {"timestamp": {"$lt": timestamp}},
+        {"timestamp": timestamp, "_id": {"$lt": last_id}},
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+def log_cursor(log: dict) -> str:
+    return encode_cursor(log.get("timestamp") or "", str(log["_id"]))
+
+
+def serialize_log(log: dict) -> dict:
+    """Convert an activity_logs document to the API format (ObjectId to string)"""
+    return {
+        "id": str(log["_id"]),
+        "timestamp": log.get("timestamp"),
+        "user": log.get("user"),
+        "action": log.get("action"),
+        "entity": log.get("entity"),
+        "entity_id": log.get("entity_id"),
+        "secciones": log.get("secciones", []),
+        "before": log.get("before"),
+        "after": log.get("after"),
+        # Updates store only the changed fields; full states via reconstruct_states
+        "changes": log.get("changes"),
+        # Bulk entries: filter, match count and operation summary
+        "bulk": log.get("bulk")
+    }
+
+
+def field_changes(before: dict, after: dict) -> dict:
+    """
+    Field-level diff of two states: {field: {"from": old, "to": new}} for every
+    field that differs. A side is omitted when the field is absent from that
+    state, so removed and added fields round-trip through apply_changes.
+    """
+    changes = {}
+    for field in list(before) + [field for field in after if field not in before]:
+        if field in before and field in after and before[field] == after[field]:
+            continue
+        change = {}
+        if field in before:
+            change["from"] = before[field]
+        if field in after:
+            change["to"] = after[field]
+        changes[field] = change
+    return changes
+
+
+def apply_changes(state: dict, changes: dict, reverse: bool = False) -> dict:
+    """New state with `changes` applied (or undone with reverse=True)"""
+    side = "from" if reverse else "to"
+    state = dict(state)
+    for field, change in changes.items():
+        if side in change:
+            state[field] = change[side]
+        else:
+            state.pop(field, None)
+    return state
+
+
+def compact_log_entry(action: str, entity_id: str, before: dict | None, after: dict | None) -> dict:
+    """
+    Stored form of an audit entry's states: full snapshots for create/delete
+    (and bulk summaries), only the changed fields for single-item updates
+    """
+    if action == "update" and entity_id != "bulk" and isinstance(before, dict) and isinstance(after, dict):
+        return {"changes": field_changes(before, after)}
+    return {"before": before, "after": after}
+
+
+def _log_order(log: dict) -> tuple:
+    return (log.get("timestamp") or "", log["_id"])
+
+
+def _bulk_between(bulk: list, start: tuple | None, end: tuple | None) -> bool:
+    """True if a bulk summary entry falls strictly between two log positions (None = unbounded)"""
+    return any((start is None or _log_order(entry) > start) and (end is None or _log_order(entry) < end)
+               for entry in bulk)
+
+
+def reconstruct_states(log: dict, history: list, current: dict | None = None, bulk: list = ()) -> dict:
+    """
+    Full before/after states of an audit entry stored as a diff.
+
+    Replays the entity's history forward from the last full snapshot before
+    the entry (its create entry, or an update logged before diffs existed);
+    without one, undoes later diffs starting from the current document.
+    Bulk operations are logged as one summary entry (entity_id "bulk"), so
+    their effect on individual items is not part of the replay: when one falls
+    inside the replayed window the result is marked incomplete.
+
+    Args:
+        log: the audit entry
+        history: every entry for the same entity and entity_id, any order
+        current: current state of the entity (serialized), if it still exists
+        bulk: bulk summary entries of the same entity type, any order
+
+    Returns:
+        {"before", "after", "complete"}; complete is False when the states may
+        be wrong (a bulk operation inside the replayed window) or when no
+        snapshot or current state was available and only the changed fields
+        are known
+    """
+    changes = log.get("changes")
+    if changes is None:
+        return {"before": log.get("before"), "after": log.get("after"), "complete": True}
+
+    history = sorted(history, key=_log_order)
+    target = _log_order(log)
+    earlier = [entry for entry in history if _log_order(entry) < target]
+    later = [entry for entry in history if _log_order(entry) > target]
+
+    # Forward from the last snapshot
+    state, snapshot = None, None
+    for entry in earlier:
+        if "changes" in entry:
+            state = apply_changes(state, entry["changes"]) if state is not None else None
+        else:
+            state, snapshot = entry.get("after"), _log_order(entry)
+    if state is not None:
+        return {
+            "before": state,
+            "after": apply_changes(state, changes),
+            "complete": not _bulk_between(bulk, snapshot, target),
+        }
+
+    # Backward from the current document (or the snapshot of a later delete)
+    state, snapshot = current, None
+    for entry in reversed(later):
+        if "changes" in entry:
+            state = apply_changes(state, entry["changes"], reverse=True) if state is not None else None
+        else:
+            state, snapshot = entry.get("before"), _log_order(entry)
+    if state is not None:
+        return {
+            "before": apply_changes(state, changes, reverse=True),
+            "after": state,
+            "complete": not _bulk_between(bulk, target, snapshot),
+        }
+
+    return {
+        "before": {field: change["from"] for field, change in changes.items() if "from" in change},
+        "after": {field: change["to"] for field, change in changes.items() if "to" in change},
+        "complete": False,
+    }
+
+
+async def _backfill(repository, query: dict, projection: dict | None, update_for) -> int:
+    """Apply update_for(entry) to every entry matching query, in batched bulk writes"""
+    updated = 0
+    batch = []
+    async for log in repository.find_cursor(query, projection=projection):
+        batch.append(UpdateOne({"_id": log["_id"]}, update_for(log)))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            result = await repository.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await repository.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    return updated
+
+
+async def backfill_log_secciones(repository) -> int:
+    """
+    Store `secciones` on audit entries written before it existed.
+
+    Returns:
+        number of entries updated
+    """
+    updated = await _backfill(
+        repository,
+        {"secciones": {"$exists": False}},
+        {"before.seccion": 1, "after.seccion": 1},
+        lambda log: {"$set": {"secciones": log_secciones(log.get("before"), log.get("after"))}},
+    )
+    if updated:
+        print(f"[BACKFILL] {repository.name}: stored secciones on {updated} log entr(ies)")
+    return updated
+
+
+async def compact_update_logs(repository) -> int:
+    """
+    Replace the full before/after snapshots of update entries written before
+    diffs existed with their field-level changes.
+
+    Returns:
+        number of entries compacted
+    """
+    query = {
+        "action": "update",
+        "entity_id": {"$ne": "bulk"},
+        "changes": {"$exists": False},
+        "before": {"$ne": None},
+        "after": {"$ne": None},
+    }
+    updated = await _backfill(
+        repository, query, {"before": 1, "after": 1},
+        lambda log: {"$set": {"changes": field_changes(log["before"], log["after"])}, "$unset": {"before": "", "after": ""}},
+    )
+    if updated:
+        print(f"[BACKFILL] {repository.name}: compacted {updated} update log entr(ies) to field changes")
+    return updated
@@ -0,0 +1,116 @@
+import asyncio
+from typing import Optional
+
+
+_STOP = object()
+
+
+class AuditLogWriter:
+    """
+    Background writer for activity_logs entries.
+
+    Request handlers call `submit()`, which only enqueues the entry; a worker
+    task batches queued entries into `insert_many` calls, flushing when a
+    batch is full or `flush_interval` seconds after its first entry, and
+    drains the queue on shutdown. When the bounded queue is full new entries
+    are dropped (and counted) rather than slowing requests down.
+    """
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 200, flush_interval: float = 1.0):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._repository = None
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+
+    def start(self, repository):
+        """Start the worker (called from the lifespan hook, inside the event loop)"""
+        self._repository = repository
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Flush pending entries and stop the worker"""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+            print(f"[AUDIT] Timed out flushing audit log; {self._queue.qsize()} entries not written")
+        self._task = None
+
+    def submit(self, entry: dict) -> bool:
+        """Enqueue an entry without waiting. Returns False if it was dropped."""
+        if self._queue is None:
+            self.dropped += 1
+            print("[AUDIT] Audit writer not started; entry dropped")
+            return False
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+
+    async def _collect(self) -> tuple[list, bool]:
+        """Wait for one entry, then gather more until the batch is full or the interval elapses"""
+        loop = asyncio.get_running_loop()
+        first = await self._queue.get()
+        if first is _STOP:
+            return [], True
+        batch = [first]
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                entry = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if entry is _STOP:
+                return batch, True
+            batch.append(entry)
+        return batch, False
+
+    async def _write(self, batch: list):
+        try:
+            await self._repository.insert_many(batch, ordered=False)
+            self.written += len(batch)
+            self.batches += 1
+        except Exception as e:
+            # Logging errors should not break the main flow
+            self.failed += len(batch)
+            print(f"[AUDIT] Error writing {len(batch)} audit log entries: {e}")
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._collect()
+            if batch:
+                await self._write(batch)
+        # Drain whatever was queued after the stop signal
+        remaining = []
+        while not self._queue.empty():
+            entry = self._queue.get_nowait()
+            if entry is not _STOP:
+                remaining.append(entry)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._write(remaining[start:start + self.batch_size])
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self.max_queue_size,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
@@ -0,0 +1,98 @@
+import re
+from datetime import date, timedelta
+from typing import Optional
+
+from utils.dates import SUNDAY_START_MESSAGE, validate_ranges_no_sunday
+
+
+MS_PER_DAY = 24 * 60 * 60 * 1000
+# Largest shift accepted by the bulk shift endpoints (days, either direction)
+MAX_SHIFT_DAYS = 366
+# Only fecha values in this format are moved by a shift (the format $dateFromString parses)
+ISO_DATE_PATTERN = r"\d{4}-\d{2}-\d{2}"
+ISO_DATE_REGEX = f"^{ISO_DATE_PATTERN}$"
+
+
+def bulk_filter_query(date_from: str, date_to: str, seccion: Optional[str] = None,
+                      cursos: Optional[list] = None) -> dict:
+    """Filter for bulk operations: fecha range, optionally seccion and any of `cursos`"""
+    query = {"fecha": {"$gte": date_from, "$lte": date_to}}
+    if seccion:
+        query["seccion"] = seccion
+    if cursos:
+        query["cursos"] = {"$in": cursos}
+    return query
+
+
+def shiftable_query(query: dict) -> dict:
+    """
+    Restrict a bulk filter to items whose fecha the shift pipeline can move,
+    so validation, counts and cache invalidation see the same items the
+    update changes
+    """
+    fecha = query.get("fecha", {})
+    return {**query, "fecha": {**fecha, "$regex": ISO_DATE_REGEX} if isinstance(fecha, dict) else fecha}
+
+
+def _shifted_date_expression(field: str, days: int) -> dict:
+    """
+    Aggregation expression for a YYYY-MM-DD string field moved by `days`.
+    Values that are not valid dates (or missing) are left as they are.
+    """
+    parsed = {"$dateFromString": {"dateString": f"${field}", "format": "%Y-%m-%d", "onError": None, "onNull": None}}
+    shifted = {"$dateToString": {"format": "%Y-%m-%d", "date": {"$add": [parsed, days * MS_PER_DAY]}}}
+    return {"$ifNull": [shifted, f"${field}"]}
+
+
+def shift_dates_pipeline(days: int, fields: list, updated_by: str, updated_at: str) -> list:
+    """Update pipeline for update_many that moves every date field by `days` on the server"""
+    return [{"$set": {
+        **{field: _shifted_date_expression(field, days) for field in fields},
+        "updated_at": updated_at,
+        "updated_by": updated_by,
+    }}]
+
+
+async def affected_groups(repository, query: dict) -> list:
+    """
+    Distinct (fecha, fechaFin, seccion) combinations matched by `query`, with
+    counts: enough to validate a shift and invalidate caches without loading
+    the documents themselves
+    """
+    pipeline = [
+        {"$match": query},
+        {"$group": {
+            "_id": {"fecha": "$fecha", "fechaFin": "$fechaFin", "seccion": "$seccion"},
+            "count": {"$sum": 1},
+        }},
+    ]
+    groups = await repository.aggregate(pipeline)
+    return [{**group["_id"], "count": group["count"]} for group in groups]
+
+
+def shift_date_string(value, days: int):
+    """`value` moved by `days`, like the shift pipeline: only valid YYYY-MM-DD strings move"""
+    if not isinstance(value, str) or not re.fullmatch(ISO_DATE_PATTERN, value):
+        return value
+    try:
+        return (date.fromisoformat(value) + timedelta(days=days)).isoformat()
+    except ValueError:
+        return value
+
+
+def shift_sunday_errors(groups: list, days: int, sunday_message: Optional[str] = None) -> list:
+    """
+    Sunday validation of a shift: for each distinct (fecha, fechaFin) the
+    shifted range is checked with the vectorized validator.
+    `sunday_message` replaces the (activity) message for a start date on Sunday.
+    Returns "original -> shifted: message" strings for the ranges that fail.
+    """
+    fechas = [shift_date_string(group.get("fecha"), days) for group in groups]
+    fechas_fin = [shift_date_string(group.get("fechaFin"), days) if group.get("fechaFin") else None for group in groups]
+    errors = []
+    for group, fecha, error in zip(groups, fechas, validate_ranges_no_sunday(fechas, fechas_fin)):
+        if error == SUNDAY_START_MESSAGE and sunday_message:
+            error = sunday_message
+        if error:
+            errors.append(f"{group.get('fecha')} -> {fecha}: {error}")
+    return errors
@@ -0,0 +1,136 @@
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Bounded in-process LRU cache whose entries expire after `ttl` seconds.
+
+    Meant for use from the event loop only (no locking). Hit/miss counters
+    are kept so the saved database round trips can be reported.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, is_valid: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Return the cached value, or None if missing, expired or rejected by `is_valid`"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock() or (is_valid is not None and not is_valid(value)):
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def invalidate_many(self, keys):
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry for which predicate(key, value) is true; returns how many"""
+        keys = [key for key, (_, value) in self._entries.items() if predicate(key, value)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def items(self) -> list:
+        return [(key, value) for key, (_, value) in self._entries.items()]
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class VersionedRangeCache(ABC):
+    """
+    Base for caches of responses built from versioned collections over a
+    (date range, seccion). Entries must provide covers(fecha, seccion);
+    subclasses say which collection version an entry was built from.
+
+    An entry is only served while its versions are current. `invalidate()`
+    drops the entries whose range contains a changed (fecha, seccion) and
+    moves the rest to the new version, so writes outside an entry's range do
+    not evict it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.invalidations = 0
+
+    @abstractmethod
+    def _version(self, key, entry, collection: str) -> Optional[int]:
+        """Version of `collection` the entry was built from, None if it does not use it"""
+
+    @abstractmethod
+    def _set_version(self, key, entry, collection: str, version: int):
+        """Record that the entry is current at `version` of `collection`"""
+
+    def invalidate(self, collection: str, changes: list, new_version: int) -> int:
+        """
+        Drop entries affected by a write to `collection`.
+
+        Args:
+            changes: (fecha, seccion) pairs touched by the write (old and new values)
+            new_version: collection version returned by the bump for this write
+
+        Returns:
+            number of entries dropped
+        """
+        def affected(key, entry):
+            version = self._version(key, entry, collection)
+            if version is None:
+                return False
+            # Another write happened in between (e.g. on another worker): cannot vouch for it
+            if version != new_version - 1:
+                return True
+            return any(entry.covers(fecha, seccion) for fecha, seccion in changes if fecha)
+
+        dropped = self._cache.invalidate_where(affected)
+        for key, entry in self._cache.items():
+            if self._version(key, entry, collection) == new_version - 1:
+                self._set_version(key, entry, collection, new_version)
+        self.invalidations += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        stats["invalidated_entries"] = self.invalidations
+        return stats
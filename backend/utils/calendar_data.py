@@ -0,0 +1,296 @@
+import base64
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import UpdateOne
+
+
+# Custom order for niveles (Middle 5-8, then Senior I-IV)
+NIVEL_ORDER = ["5", "6", "7", "8", "I", "II", "III", "IV"]
+UNKNOWN_NIVEL_INDEX = 999  # Unknown niveles go to end
+NO_HORA_MINUTES = 9999  # Activities without hora or "TODO EL DIA" go to end
+
+BACKFILL_BATCH_SIZE = 500
+MAX_PAGE_SIZE = 1000  # Upper bound for `limit` on paginated calendar reads
+
+
+def extract_nivel(document: dict) -> str | None:
+    """Extract nivel from the first curso of an activity/evaluation ("5° A" -> "5", "I EM A" -> "I")"""
+    cursos = document.get("cursos", [])
+    if not cursos:
+        # Fallback to legacy curso field
+        curso = document.get("curso", "")
+        if curso:
+            cursos = [curso] if isinstance(curso, str) else curso
+
+    if not cursos:
+        return None
+
+    # Get first curso to determine nivel
+    first_curso = cursos[0] if isinstance(cursos, list) else cursos
+    if not isinstance(first_curso, str):
+        return None
+
+    first_curso = first_curso.strip()
+
+    # Check for Middle levels (5, 6, 7, 8)
+    for nivel in ["5", "6", "7", "8"]:
+        if first_curso.startswith(nivel + "°") or first_curso.startswith(nivel + " "):
+            return nivel
+
+    # Check for Senior levels (I, II, III, IV)
+    for nivel in ["I", "II", "III", "IV"]:
+        if first_curso.startswith(nivel + " EM") or first_curso.startswith(nivel + " "):
+            return nivel
+
+    return None
+
+
+def nivel_index(document: dict) -> int:
+    nivel = extract_nivel(document)
+    if nivel is None or nivel not in NIVEL_ORDER:
+        return UNKNOWN_NIVEL_INDEX
+    return NIVEL_ORDER.index(nivel)
+
+
+def hora_minutes(hora) -> int:
+    """Convert "HH:MM" to minutes since midnight for sorting"""
+    if hora and hora != "TODO EL DIA":
+        try:
+            time_parts = hora.split(':')
+            if len(time_parts) >= 2:
+                return int(time_parts[0]) * 60 + int(time_parts[1])
+        except (ValueError, IndexError, AttributeError):
+            pass
+    return NO_HORA_MINUTES
+
+
+def activity_sort_fields(document: dict) -> dict:
+    """Derived fields stored on each activity so MongoDB can sort without Python work"""
+    return {
+        "nivel_index": nivel_index(document),
+        "hora_minutes": hora_minutes(document.get("hora")),
+    }
+
+
+def evaluation_sort_fields(document: dict) -> dict:
+    """Derived fields stored on each evaluation (evaluations are ordered by nivel only)"""
+    return {
+        "nivel_index": nivel_index(document),
+    }
+
+
+# $project stages mirroring serialize_activity / serialize_evaluation in server.py,
+# so documents leave the database already in frontend format.
+ACTIVITY_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "seccion": 1,
+    "actividad": 1,
+    "fecha": 1,
+    "fechaFin": {"$ifNull": ["$fechaFin", None]},
+    "hora": 1,
+    "lugar": {"$ifNull": ["$lugar", None]},
+    "responsable": {"$ifNull": ["$responsable", None]},
+    "importante": {"$ifNull": ["$importante", False]},
+    "timestamp": {"$ifNull": ["$created_at", {"$ifNull": ["$timestamp", ""]}]},
+    "created_by": {"$ifNull": ["$created_by", ""]},
+    # Include cursos if present (new format)
+    "cursos": "$cursos",
+    # Include legacy curso only when cursos is absent
+    "curso": {"$cond": [{"$eq": [{"$type": "$cursos"}, "missing"]}, "$curso", "$$REMOVE"]},
+}
+
+EVALUATION_PROJECTION = {
+    "_id": 0,
+    "id": {"$toString": "$_id"},
+    "seccion": 1,
+    "asignatura": 1,
+    "tema": {"$ifNull": ["$tema", None]},
+    "fecha": 1,
+    "timestamp": {"$ifNull": ["$created_at", {"$ifNull": ["$timestamp", ""]}]},
+    "created_by": {"$ifNull": ["$created_by", ""]},
+    # Always an array: cursos, or legacy curso converted to an array
+    "cursos": {
+        "$cond": [
+            {"$isArray": "$cursos"},
+            "$cursos",
+            {"$cond": [
+                {"$eq": [{"$type": "$curso"}, "string"]},
+                ["$curso"],
+                {"$cond": [{"$isArray": "$curso"}, "$curso", []]},
+            ]},
+        ]
+    },
+    # hora, or legacy hour
+    "hora": {"$ifNull": ["$hora", "$hour"]},
+}
+
+ACTIVITY_SORT = {"fecha": 1, "nivel_index": 1, "hora_minutes": 1, "_id": 1}
+EVALUATION_SORT = {"fecha": 1, "nivel_index": 1, "_id": 1}
+
+
+def encode_cursor(fecha: str, last_id: str) -> str:
+    """Opaque keyset cursor for the last (fecha, _id) returned in a page"""
+    return base64.urlsafe_b64encode(f"{fecha}|{last_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> tuple[str, ObjectId]:
+    """
+    Inverse of encode_cursor.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        fecha, last_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return fecha, ObjectId(last_id)
+    except (ValueError, UnicodeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_cursor(query: dict, cursor: str | None) -> dict:
+    """Restrict a query to documents strictly after the cursor in (fecha, _id) order"""
+    if not cursor:
+        return query
+    fecha, last_id = decode_cursor(cursor)
+    keyset = {"$or": [
+        {"fecha": {"$gt": fecha}},
+        {"fecha": fecha, "_id": {"$gt": last_id}},
+    ]}
+    return {"$and": [query, keyset]} if query else keyset
+
+
+def grouped_by_date_pipeline(query: dict, sort: dict, projection: dict, limit: int | None = None) -> list:
+    """
+    Aggregation that returns one document per fecha:
+        {"fecha": "YYYY-MM-DD", "secciones": {"Junior": [...], "Middle": [...]},
+         "count": <items>, "last_id": <greatest id of the date>}
+    with the items of each seccion already sorted and serialized.
+
+    With `limit`, only the first `limit` documents in (fecha, _id) order are
+    grouped (keyset pagination, see after_cursor).
+    """
+    pipeline = [{"$match": query}]
+    if limit:
+        pipeline += [{"$sort": {"fecha": 1, "_id": 1}}, {"$limit": limit}]
+    return pipeline + [
+        {"$sort": sort},
+        {"$project": projection},
+        {"$group": {
+            "_id": {"fecha": "$fecha", "seccion": "$seccion"},
+            "items": {"$push": "$$ROOT"},
+            "count": {"$sum": 1},
+            # ObjectId hex strings sort like the ObjectIds themselves
+            "last_id": {"$max": "$id"},
+        }},
+        {"$group": {
+            "_id": "$_id.fecha",
+            "secciones": {"$push": {"k": "$_id.seccion", "v": "$items"}},
+            "count": {"$sum": "$count"},
+            "last_id": {"$max": "$last_id"},
+        }},
+        {"$sort": {"_id": 1}},
+        {"$project": {
+            "_id": 0,
+            "fecha": "$_id",
+            "secciones": {"$arrayToObject": "$secciones"},
+            "count": 1,
+            "last_id": 1,
+        }},
+    ]
+
+
+class GroupedReader:
+    """
+    Iterates the grouped calendar pipeline one date at a time and tracks the
+    keyset cursor for the next page.
+    """
+
+    def __init__(self, repository, query: dict, sort: dict, projection: dict,
+                 limit: int | None = None, cursor: str | None = None):
+        self.repository = repository
+        self.query = after_cursor(query, cursor)
+        self.sort = sort
+        self.projection = projection
+        self.limit = limit
+        self.count = 0
+        self.last_group = None
+
+    async def groups(self):
+        pipeline = grouped_by_date_pipeline(self.query, self.sort, self.projection, self.limit)
+        async for group in self.repository.aggregate_cursor(pipeline, allowDiskUse=True):
+            self.count += group["count"]
+            self.last_group = group
+            yield group["fecha"], group["secciones"]
+
+    @property
+    def next_cursor(self) -> str | None:
+        """Cursor for the following page, or None when the range is exhausted"""
+        if not self.limit or self.count < self.limit or self.last_group is None:
+            return None
+        return encode_cursor(self.last_group["fecha"], self.last_group["last_id"])
+
+
+async def fetch_grouped(repository, query: dict, sort: dict, projection: dict,
+                        limit: int | None = None, cursor: str | None = None) -> tuple[dict, str | None]:
+    """
+    Run the grouping pipeline and build {fecha: {seccion: [items]}}.
+
+    Returns:
+        (grouped, next_cursor) - next_cursor is None unless a full page was read
+    """
+    reader = GroupedReader(repository, query, sort, projection, limit=limit, cursor=cursor)
+    grouped = {}
+    async for fecha, secciones in reader.groups():
+        grouped[fecha] = secciones
+    return grouped, reader.next_cursor
+
+
+async def stream_grouped_json(key: str, repository, query: dict, sort: dict, projection: dict,
+                              limit: int | None = None, cursor: str | None = None):
+    """
+    Same body as fetch_grouped's endpoint response, emitted one date group at a
+    time as the aggregation cursor yields them, so memory stays bounded by the
+    largest single date instead of the whole range.
+    """
+    reader = GroupedReader(repository, query, sort, projection, limit=limit, cursor=cursor)
+    yield '{"success": true, ' + json.dumps(key) + ': {'
+    first = True
+    async for fecha, secciones in reader.groups():
+        yield ("" if first else ", ") + json.dumps(fecha) + ": " + json.dumps(secciones, ensure_ascii=False, default=str)
+        first = False
+    yield "}"
+    if limit:
+        yield ', "next_cursor": ' + json.dumps(reader.next_cursor)
+    yield "}"
+
+
+async def backfill_sort_fields(repository, derive) -> int:
+    """
+    Store derived sort fields on documents written before they existed.
+
+    Args:
+        repository: MongoRepository of activities or evaluations
+        derive: activity_sort_fields or evaluation_sort_fields
+
+    Returns:
+        number of documents updated
+    """
+    query = {"nivel_index": {"$exists": False}}
+    projection = {"cursos": 1, "curso": 1, "hora": 1}
+    updated = 0
+    batch = []
+    async for document in repository.find_cursor(query, projection=projection):
+        batch.append(UpdateOne({"_id": document["_id"]}, {"$set": derive(document)}))
+        if len(batch) >= BACKFILL_BATCH_SIZE:
+            result = await repository.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await repository.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    if updated:
+        print(f"[BACKFILL] {repository.name}: stored sort fields on {updated} document(s)")
+    return updated
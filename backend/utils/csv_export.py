@@ -0,0 +1,25 @@
+import csv
+import io
+
+
+CSV_CHUNK_ROWS = 500  # Rows encoded per yielded chunk
+
+
+async def stream_csv(columns: list, rows, chunk_rows: int = CSV_CHUNK_ROWS):
+    """
+    CSV (csv module quoting) of a header and an async iterable of rows,
+    yielded as text chunks of `chunk_rows` rows so large exports are never
+    built in memory
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    count = 0
+    async for row in rows:
+        writer.writerow(row)
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
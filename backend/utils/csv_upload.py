@@ -0,0 +1,170 @@
+import asyncio
+import codecs
+import os
+
+import pandas as pd
+from fastapi import HTTPException
+
+
+# Upper bound for uploaded CSV files (bytes)
+CSV_MAX_UPLOAD_BYTES = int(os.environ.get("CSV_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Rows parsed per chunk; only one chunk is held in memory at a time
+CSV_CHUNK_ROWS = int(os.environ.get("CSV_CHUNK_ROWS", "5000"))
+# Bytes decoded at a time while validating the encoding of the whole file
+ENCODING_BLOCK_BYTES = 64 * 1024
+# Allowance for multipart boundaries and headers on top of the file itself
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# utf-8-sig also reads plain UTF-8 and strips the BOM Excel adds.
+# latin-1 decodes any byte sequence, so it must stay last.
+CSV_ENCODINGS = ["utf-8-sig", "cp1252", "latin-1"]
+
+
+class CSVUploadError(ValueError):
+    """Invalid CSV upload; status_code is the HTTP status to answer with"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def upload_size(fileobj) -> int:
+    """Size of a seekable file object, leaving it positioned at the start"""
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+def too_large_detail(size: int | None = None) -> str:
+    actual = f" ({size} bytes)" if size is not None else ""
+    return f"CSV file is too large{actual}. Maximum allowed is {CSV_MAX_UPLOAD_BYTES} bytes."
+
+
+def _decodes(fileobj, encoding: str, block_size: int) -> bool:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    try:
+        while True:
+            block = fileobj.read(block_size)
+            if not block:
+                decoder.decode(b"", final=True)
+                return True
+            decoder.decode(block, final=False)
+    except UnicodeDecodeError:
+        return False
+    finally:
+        fileobj.seek(0)
+
+
+def detect_encoding(fileobj, block_size: int = ENCODING_BLOCK_BYTES) -> str | None:
+    """
+    Pick the first encoding in CSV_ENCODINGS that decodes the whole file.
+
+    The file is decoded block by block (an incremental decoder keeps
+    multi-byte characters split across blocks intact), so an invalid byte
+    anywhere is found before any row is written. The file is rewound.
+    """
+    for encoding in CSV_ENCODINGS:
+        if _decodes(fileobj, encoding, block_size):
+            return encoding
+    return None
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Plain ASGI middleware that stops CSV uploads over CSV_MAX_UPLOAD_BYTES
+    while the body is received, before it is spooled to disk: requests whose
+    Content-Length is over the limit get 413 right away, and bodies sent
+    without one are counted and cut off with a 413 once they exceed it.
+    """
+
+    def __init__(self, app, paths: set, max_bytes: int = CSV_MAX_UPLOAD_BYTES):
+        self.app = app
+        self.paths = paths
+        self.max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        try:
+            content_length = int(headers.get(b"content-length", b""))
+        except ValueError:
+            content_length = None
+        if content_length is not None and content_length > self.max_body_bytes:
+            await self._reject(send)
+            return
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside the form parser; FastAPI re-raises HTTPExceptions as they are
+                    raise HTTPException(status_code=413, detail=too_large_detail())
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+    @staticmethod
+    async def _reject(send):
+        body = ('{"detail":"' + too_large_detail() + '"}').encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode("ascii"))],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def iter_csv_chunks(upload, required_columns: list, chunksize: int = CSV_CHUNK_ROWS):
+    """
+    Parse an uploaded CSV straight from its spooled file, one chunk at a time.
+
+    The size and the encoding of the whole file are checked before the first
+    chunk is yielded, so callers never write part of a file that is then
+    rejected. Column names are normalized (stripped, lowercased) and checked against
+    `required_columns`. Parsing runs in a worker thread so large files do not
+    block the event loop. The DataFrame index keeps counting across chunks,
+    so row numbers refer to the original file.
+
+    Raises:
+        CSVUploadError: file too large, undecodable, or missing a required column
+        pandas.errors.EmptyDataError: file is empty
+    """
+    fileobj = upload.file
+    size = upload_size(fileobj)
+    if size > CSV_MAX_UPLOAD_BYTES:
+        raise CSVUploadError(413, too_large_detail(size))
+
+    encoding = await asyncio.to_thread(detect_encoding, fileobj)
+    if encoding is None:
+        raise CSVUploadError(
+            400,
+            "Could not decode CSV file. Please ensure the file is in UTF-8, Latin-1, or Windows-1252 encoding."
+        )
+
+    reader = pd.read_csv(fileobj, encoding=encoding, chunksize=chunksize)
+    try:
+        while True:
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+
+            chunk.columns = chunk.columns.str.strip().str.lower()
+            for column in required_columns:
+                if column not in chunk.columns:
+                    raise CSVUploadError(
+                        400,
+                        f"CSV must have a{'n' if column[0] in 'aeiou' else ''} '{column}' column. "
+                        f"Found columns: {', '.join(chunk.columns)}"
+                    )
+            yield chunk
+    finally:
+        reader.close()
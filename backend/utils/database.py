@@ -0,0 +1,168 @@
+from typing import Any, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import BulkWriteError
+
+from utils.versioning import DataVersions
+
+
+class MongoRepository:
+    """
+    Async access to a single MongoDB collection.
+
+    Every endpoint goes through a repository instead of touching the driver
+    directly, so all database I/O is awaited on the event loop (Motor) and
+    never blocks other requests.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    @property
+    def name(self) -> str:
+        return self.collection.name
+
+    async def find_one(self, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+        return await self.collection.find_one(query, projection)
+
+    def find_cursor(
+        self,
+        query: dict,
+        projection: Optional[dict] = None,
+        sort: Optional[list] = None,
+        limit: int = 0,
+    ):
+        """Return an async cursor, for callers that iterate without materializing"""
+        cursor = self.collection.find(query, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def find(
+        self,
+        query: dict,
+        projection: Optional[dict] = None,
+        sort: Optional[list] = None,
+        limit: int = 0,
+    ) -> list:
+        cursor = self.find_cursor(query, projection=projection, sort=sort, limit=limit)
+        return await cursor.to_list(length=None)
+
+    async def count(self, query: Optional[dict] = None) -> int:
+        return await self.collection.count_documents(query or {})
+
+    async def insert_one(self, document: dict) -> Any:
+        """Insert a document and return its new _id"""
+        result = await self.collection.insert_one(document)
+        return result.inserted_id
+
+    async def insert_many(self, documents: list, ordered: bool = True) -> list:
+        """Insert documents and return their new _ids"""
+        result = await self.collection.insert_many(documents, ordered=ordered)
+        return result.inserted_ids
+
+    async def insert_many_partial(self, documents: list) -> dict:
+        """
+        Unordered insert that keeps going past documents that fail.
+
+        The driver assigns every document its _id in place. Returns
+        {index: error message} for the documents that were not inserted.
+        """
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+            return {}
+        except BulkWriteError as e:
+            return {item["index"]: item.get("errmsg", "write error") for item in e.details.get("writeErrors", [])}
+
+    async def create_indexes(self, models: list) -> list:
+        return await self.collection.create_indexes(models)
+
+    async def bulk_write(self, operations: list, ordered: bool = True):
+        return await self.collection.bulk_write(operations, ordered=ordered)
+
+    async def find_one_and_update(self, query: dict, update: dict, **kwargs) -> Optional[dict]:
+        return await self.collection.find_one_and_update(query, update, **kwargs)
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        return await self.collection.update_one(query, update, upsert=upsert)
+
+    async def update_many(self, query: dict, update: Any):
+        return await self.collection.update_many(query, update)
+
+    async def delete_one(self, query: dict) -> int:
+        result = await self.collection.delete_one(query)
+        return result.deleted_count
+
+    async def delete_many(self, query: dict) -> int:
+        result = await self.collection.delete_many(query)
+        return result.deleted_count
+
+    def aggregate_cursor(self, pipeline: list, **kwargs):
+        return self.collection.aggregate(pipeline, **kwargs)
+
+    async def aggregate(self, pipeline: list, **kwargs) -> list:
+        return await self.aggregate_cursor(pipeline, **kwargs).to_list(length=None)
+
+
+class UserRepository(MongoRepository):
+    async def find_by_email(self, email: str) -> Optional[dict]:
+        return await self.find_one({"email": email})
+
+
+class Database:
+    """
+    Owns the Motor client and the repositories for every collection.
+
+    The client is not created at import time: `connect()` is called from the
+    FastAPI lifespan hook (inside the running event loop) and `close()` on
+    shutdown.
+    """
+
+    def __init__(self, uri: str, db_name: str, event_listeners: Optional[list] = None):
+        self.uri = uri
+        self.db_name = db_name
+        self.event_listeners = event_listeners or []
+        self.client: Optional[AsyncIOMotorClient] = None
+        self.db = None
+        self.users: Optional[UserRepository] = None
+        self.activities: Optional[MongoRepository] = None
+        self.evaluations: Optional[MongoRepository] = None
+        self.activity_logs: Optional[MongoRepository] = None
+        self.data_versions: Optional[MongoRepository] = None
+        self.mail_jobs: Optional[MongoRepository] = None
+        self.versions: Optional[DataVersions] = None
+
+    def connect(self):
+        self.client = AsyncIOMotorClient(self.uri, event_listeners=self.event_listeners)
+        self.db = self.client[self.db_name]
+        self.users = UserRepository(self.db["users"])
+        self.activities = MongoRepository(self.db["registro_activities"])
+        self.evaluations = MongoRepository(self.db["registro_evaluations"])
+        self.activity_logs = MongoRepository(self.db["activity_logs"])
+        self.data_versions = MongoRepository(self.db["data_versions"])
+        self.versions = DataVersions(self.data_versions)
+        self.mail_jobs = MongoRepository(self.db["mail_jobs"])
+        print(f"[DB] Connected to MongoDB database '{self.db_name}'")
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+            print("[DB] MongoDB client closed")
+
+    @property
+    def name(self) -> str:
+        return self.db_name
+
+    def collection(self, name: str) -> MongoRepository:
+        """Repository for a collection without a fixed attribute (e.g. monthly log archives)"""
+        return MongoRepository(self.db[name])
+
+    async def list_collection_names(self) -> list:
+        return await self.db.list_collection_names()
+
+    async def count_documents(self, collection_name: str) -> int:
+        # From collection metadata: a full count would scan ever-growing collections
+        return await self.db[collection_name].estimated_document_count()
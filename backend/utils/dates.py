@@ -0,0 +1,184 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+
+SUNDAY = 6  # date.weekday(): 0=Monday ... 6=Sunday
+DATE_CACHE_SIZE = 8192
+
+# Fallback formats for input that is not already YYYY-MM-DD
+DATE_FORMATS = [
+    "%Y-%m-%d",           # YYYY-MM-DD (standard, but not zero-padded)
+    "%Y/%m/%d",           # YYYY/MM/DD
+    "%d-%m-%Y",           # DD-MM-YYYY
+    "%d/%m/%Y",           # DD/MM/YYYY
+    "%m-%d-%Y",           # MM-DD-YYYY
+    "%m/%d/%Y",           # MM/DD/YYYY
+]
+
+SUNDAY_START_MESSAGE = "No se permiten actividades en Domingo"
+SUNDAY_END_MESSAGE = "No se permiten actividades en Domingo (fecha de término)"
+END_BEFORE_START_MESSAGE = "La fecha de término debe ser posterior o igual a la fecha de inicio"
+SUNDAY_IN_RANGE_MESSAGE = "No se permiten actividades en Domingo. El rango de fechas incluye el domingo {}"
+
+
+def _is_iso_date_shape(value: str) -> bool:
+    return (len(value) == 10 and value[4] == "-" and value[7] == "-"
+            and value[:4].isdigit() and value[5:7].isdigit() and value[8:].isdigit())
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse(value: str) -> Optional[date]:
+    """Parse a stripped date string; None if no known format matches"""
+    # Fast path: already YYYY-MM-DD (what the frontend sends)
+    if _is_iso_date_shape(value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def parse_date(date_string) -> Optional[date]:
+    """Date for any supported format, or None if it cannot be parsed"""
+    if not isinstance(date_string, str):
+        return None
+    return _parse(date_string.strip())
+
+
+def normalize_date_string(date_string: str) -> str:
+    """
+    Normalize date string to YYYY-MM-DD format
+    Handles various input formats and ensures consistent output; input that
+    matches no format is returned unchanged (will cause error in caller)
+    """
+    if not date_string:
+        return date_string
+    parsed = parse_date(date_string)
+    if parsed is None:
+        return date_string.strip()
+    return parsed.isoformat()
+
+
+def is_sunday(date_string: str) -> bool:
+    """True if the date (any supported format) is a Sunday; False if it is not a valid date"""
+    parsed = parse_date(date_string)
+    return parsed is not None and parsed.weekday() == SUNDAY
+
+
+def first_sunday_between(start: date, end: date) -> Optional[date]:
+    """First Sunday in [start, end], computed from the weekday of start (no day-by-day walk)"""
+    offset = (SUNDAY - start.weekday()) % 7
+    if offset > (end - start).days:
+        return None
+    return start + timedelta(days=offset)
+
+
+def validate_date_range_no_sunday(fecha_inicio: str, fecha_fin: str | None = None) -> tuple[bool, str | None]:
+    """
+    Validate that a date range (fecha_inicio to fecha_fin) does not contain any Sunday
+    If fecha_fin is None, only validates fecha_inicio
+
+    Returns: (is_valid, error_message)
+    - is_valid: True if no Sunday found, False otherwise
+    - error_message: Error message if invalid, None if valid
+    """
+    if not fecha_inicio:
+        return (True, None)
+
+    start = parse_date(fecha_inicio)
+    if start is not None and start.weekday() == SUNDAY:
+        return (False, SUNDAY_START_MESSAGE)
+    if not fecha_fin:
+        return (True, None)
+
+    end = parse_date(fecha_fin)
+    if end is not None and end.weekday() == SUNDAY:
+        return (False, SUNDAY_END_MESSAGE)
+    if start is None or end is None:
+        invalid = fecha_inicio if start is None else fecha_fin
+        return (False, f"Formato de fecha inválido: {invalid}")
+    if end < start:
+        return (False, END_BEFORE_START_MESSAGE)
+
+    sunday = first_sunday_between(start, end)
+    if sunday is not None:
+        return (False, SUNDAY_IN_RANGE_MESSAGE.format(sunday.isoformat()))
+    return (True, None)
+
+
+def to_ordinals(values) -> np.ndarray:
+    """
+    Proleptic Gregorian ordinal (date.toordinal()) of each value, in any
+    supported format, as int64; 0 marks missing or unparseable values
+    """
+    def ordinal(value) -> int:
+        parsed = parse_date(value)
+        return parsed.toordinal() if parsed is not None else 0
+
+    return np.fromiter((ordinal(value) for value in values), dtype=np.int64, count=len(values))
+
+
+def weekday_of_ordinals(ordinals: np.ndarray) -> np.ndarray:
+    """date.weekday() for ordinals (ordinal 1, 0001-01-01, was a Monday)"""
+    return (ordinals - 1) % 7
+
+
+def sunday_mask(values) -> np.ndarray:
+    """Vectorized is_sunday: boolean array, False for missing or unparseable values"""
+    ordinals = to_ordinals(values)
+    return (ordinals > 0) & (weekday_of_ordinals(ordinals) == SUNDAY)
+
+
+def validate_ranges_no_sunday(fechas, fechas_fin=None) -> list:
+    """
+    Vectorized validate_date_range_no_sunday for bulk endpoints.
+
+    Args:
+        fechas: start dates
+        fechas_fin: optional end dates (same length; None entries mean single-day items)
+
+    Returns:
+        list of error messages (None for valid items), same messages as
+        validate_date_range_no_sunday
+    """
+    count = len(fechas)
+    if count == 0:
+        return []
+    start = to_ordinals(fechas)
+    end = to_ordinals(fechas_fin) if fechas_fin is not None else np.zeros(count, dtype=np.int64)
+    has_start = np.array([bool(v) for v in fechas])
+    has_end = np.array([bool(v) for v in fechas_fin]) if fechas_fin is not None else np.zeros(count, dtype=bool)
+
+    start_ok = start > 0
+    end_ok = end > 0
+    start_sunday = start_ok & (weekday_of_ordinals(start) == SUNDAY)
+    end_sunday = has_end & end_ok & (weekday_of_ordinals(end) == SUNDAY)
+    unparseable = has_end & ~(start_ok & end_ok)
+    reversed_range = has_end & start_ok & end_ok & (end < start)
+    # Offset from start to its next Sunday; the range contains it if it fits in the span
+    offset = (SUNDAY - weekday_of_ordinals(start)) % 7
+    sunday_inside = has_end & start_ok & end_ok & ~reversed_range & (offset <= end - start)
+
+    errors = [None] * count
+    for index in np.flatnonzero(has_start & (start_sunday | end_sunday | unparseable | reversed_range | sunday_inside)):
+        if start_sunday[index]:
+            errors[index] = SUNDAY_START_MESSAGE
+        elif end_sunday[index]:
+            errors[index] = SUNDAY_END_MESSAGE
+        elif unparseable[index]:
+            invalid = fechas[index] if not start_ok[index] else fechas_fin[index]
+            errors[index] = f"Formato de fecha inválido: {invalid}"
+        elif reversed_range[index]:
+            errors[index] = END_BEFORE_START_MESSAGE
+        else:
+            sunday = date.fromordinal(int(start[index] + offset[index]))
+            errors[index] = SUNDAY_IN_RANGE_MESSAGE.format(sunday.isoformat())
+    return errors
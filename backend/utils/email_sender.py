@@ -1,8 +1,14 @@
-import os
 import smtplib
+import threading
 from email.mime.multipart import MIMEMultipart
 from typing import Optional
 
+from utils.smtp_session import SMTPSession, SMTPSettings
+
+# Shared persistent SMTP session; smtplib connections are not thread-safe
+_session: Optional[SMTPSession] = None
+_session_lock = threading.Lock()
+
 def send_email_smtp(
     message: MIMEMultipart,
     to_email: str,
@@ -23,41 +29,26 @@ def send_email_smtp(
         Exception: If SMTP configuration is missing or sending fails
     """
     try:
-        # Get SMTP settings from environment (matching existing server.py variables)
-        SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
-        SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
-        SMTP_USER = os.environ.get("SMTP_USER", "")
-        SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD", "")
-        SMTP_FROM = os.environ.get("SMTP_FROM", SMTP_USER)
-
         # Validate required credentials
-        if not SMTP_USER or not SMTP_PASSWORD:
+        settings = SMTPSettings.from_env()
+        if not settings.configured:
             error_msg = "SMTP_USER and SMTP_PASSWORD environment variables are required"
             print(f"[EMAIL_SENDER] ERROR: {error_msg}")
             raise ValueError(error_msg)
 
-        print(f"[EMAIL_SENDER] Connecting to {SMTP_SERVER}:{SMTP_PORT}...")
-        
-        # Create SMTP connection
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        
-        # Enable STARTTLS (required for Gmail)
-        print(f"[EMAIL_SENDER] Starting TLS...")
-        server.starttls()
-        
-        # Authenticate
-        print(f"[EMAIL_SENDER] Authenticating as {SMTP_USER}...")
-        server.login(SMTP_USER, SMTP_PASSWORD)
-        print(f"[EMAIL_SENDER] Authentication successful")
-        
-        # Send message
-        print(f"[EMAIL_SENDER] Sending email to {to_email}...")
-        server.send_message(message)
+        # Reuse one authenticated connection across calls; it is re-opened
+        # if the settings change or the server dropped it
+        global _session
+        with _session_lock:
+            if _session is None or _session.settings != settings:
+                if _session is not None:
+                    _session.close()
+                _session = SMTPSession(settings)
+
+            print(f"[EMAIL_SENDER] Sending email to {to_email}...")
+            _session.send(message)
         print(f"[EMAIL_SENDER] Email sent successfully to {to_email}")
-        
-        # Close connection
-        server.quit()
-        
+
         return {
             "success": True,
             "message": f"Email sent successfully to {to_email}"
@@ -0,0 +1,134 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import ConnectionFailure, OperationFailure, PyMongoError
+
+
+# Indexes the backend relies on, per collection.
+# Keep these in sync with the queries issued in server.py.
+INDEX_SPECS = {
+    "users": [
+        # find_one({"email": ...}) on every authenticated request
+        # Also serves the email-ordered directory, its keyset pagination and anchored prefix search
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        # Directory filtered by role, still ordered by email
+        IndexModel([("role", ASCENDING), ("email", ASCENDING)], name="role_email"),
+    ],
+    "registro_activities": [
+        # Calendar reads: fecha range (optionally + seccion), sorted by fecha
+        IndexModel([("fecha", ASCENDING), ("seccion", ASCENDING)], name="fecha_seccion"),
+        # Single-section reads: equality on seccion first, then the fecha range
+        IndexModel([("seccion", ASCENDING), ("fecha", ASCENDING)], name="seccion_fecha"),
+        # Grouped calendar pipeline: fecha range sorted by nivel and hora (utils/calendar_data.py)
+        IndexModel(
+            [("fecha", ASCENDING), ("nivel_index", ASCENDING), ("hora_minutes", ASCENDING), ("_id", ASCENDING)],
+            name="fecha_nivel_hora",
+        ),
+        # Keyset pagination on (fecha, _id)
+        IndexModel([("fecha", ASCENDING), ("_id", ASCENDING)], name="fecha_id"),
+    ],
+    "registro_evaluations": [
+        IndexModel([("fecha", ASCENDING), ("seccion", ASCENDING)], name="fecha_seccion"),
+        IndexModel([("seccion", ASCENDING), ("fecha", ASCENDING)], name="seccion_fecha"),
+        IndexModel([("fecha", ASCENDING), ("nivel_index", ASCENDING), ("_id", ASCENDING)], name="fecha_nivel"),
+        IndexModel([("fecha", ASCENDING), ("_id", ASCENDING)], name="fecha_id"),
+    ],
+    "activity_logs": [
+        # Newest-first listing, timestamp range filters and keyset pagination on (timestamp, _id)
+        IndexModel([("timestamp", DESCENDING), ("_id", DESCENDING)], name="timestamp_id_desc"),
+        # Section filter (secciones is denormalized from before/after at write time)
+        IndexModel([("secciones", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)], name="secciones_timestamp"),
+        IndexModel([("user", ASCENDING), ("timestamp", DESCENDING)], name="user_timestamp"),
+        IndexModel([("action", ASCENDING), ("timestamp", DESCENDING)], name="action_timestamp"),
+        IndexModel([("entity", ASCENDING), ("timestamp", DESCENDING)], name="entity_timestamp"),
+        # History of one item, replayed to rebuild the full states of diff-only update entries
+        IndexModel([("entity_id", ASCENDING), ("timestamp", ASCENDING)], name="entity_id_timestamp"),
+    ],
+    "mail_jobs": [
+        # Finished report email jobs expire once their status is no longer polled
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        # Startup sweep for jobs left queued/sending by a restart
+        IndexModel([("status", ASCENDING), ("updated_at", ASCENDING)], name="status_updated_at"),
+    ],
+}
+
+
+def _key_of(key) -> tuple:
+    """Normalize an index key (SON, dict or list of pairs) to a comparable tuple"""
+    items = key.items() if hasattr(key, "items") else key
+    return tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for field, direction in items)
+
+
+async def ensure_indexes(db) -> dict:
+    """
+    Create every declared index (no-op for those that already exist).
+
+    Failures are reported per collection and never abort startup, e.g. the
+    unique email index cannot be built while duplicate users exist. If the
+    server cannot be reached the remaining collections are skipped rather
+    than each waiting for its own server selection timeout.
+
+    Returns:
+        dict mapping collection name to created index names or an error string
+    """
+    results = {}
+    for collection_name, models in INDEX_SPECS.items():
+        try:
+            created = await db[collection_name].create_indexes(models)
+            results[collection_name] = created
+            print(f"[INDEXES] {collection_name}: ensured {', '.join(created)}")
+        except ConnectionFailure as e:
+            print(f"[INDEXES] ERROR: MongoDB unreachable, indexes not ensured: {e}")
+            for name in INDEX_SPECS:
+                results.setdefault(name, f"error: {e}")
+            break
+        except PyMongoError as e:
+            results[collection_name] = f"error: {e}"
+            print(f"[INDEXES] ERROR creating indexes on {collection_name}: {e}")
+    return results
+
+
+async def audit_indexes(db) -> dict:
+    """
+    Compare declared indexes with the ones present on the server.
+
+    For each collection reports missing declared indexes, extra indexes that
+    the backend does not declare, and per-index usage stats from $indexStats
+    (operations served since the server started tracking), flagging unused ones.
+    """
+    report = {}
+    for collection_name, models in INDEX_SPECS.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        existing_by_key = {_key_of(info["key"]): name for name, info in existing.items()}
+
+        declared_keys = {_key_of(model.document["key"]): model.document["name"] for model in models}
+        missing = [name for key, name in declared_keys.items() if key not in existing_by_key]
+        extra = [
+            name for key, name in existing_by_key.items()
+            if key not in declared_keys and name != "_id_"
+        ]
+
+        usage = []
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                accesses = stat.get("accesses", {})
+                since = accesses.get("since")
+                usage.append({
+                    "name": stat.get("name"),
+                    "key": dict(stat.get("key", {})),
+                    "ops": int(accesses.get("ops", 0)),
+                    "since": since.isoformat() if hasattr(since, "isoformat") else since,
+                })
+        except OperationFailure as e:
+            # $indexStats needs the indexStats privilege on the database
+            usage = None
+            print(f"[INDEXES] Could not read $indexStats for {collection_name}: {e}")
+
+        report[collection_name] = {
+            "declared": list(declared_keys.values()),
+            "missing": missing,
+            "extra": extra,
+            "unused": [u["name"] for u in usage if u["ops"] == 0 and u["name"] != "_id_"] if usage is not None else None,
+            "usage": usage,
+        }
+    return report
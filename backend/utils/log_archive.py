@@ -0,0 +1,197 @@
+import asyncio
+from datetime import datetime
+from typing import Optional
+
+from utils.activity_logs import LOG_SORT, before_log
+from utils.indexes import INDEX_SPECS
+
+
+ARCHIVE_PREFIX = "activity_logs_archive_"
+ARCHIVE_BATCH_SIZE = 1000
+
+
+def archive_collection_name(month: str) -> str:
+    """Archive collection for a "YYYY-MM" month, e.g. activity_logs_archive_2025_03"""
+    return ARCHIVE_PREFIX + month.replace("-", "_")
+
+
+def archive_month(collection_name: str) -> Optional[str]:
+    """Inverse of archive_collection_name ("YYYY-MM"), None for other collections"""
+    if not collection_name.startswith(ARCHIVE_PREFIX):
+        return None
+    month = collection_name[len(ARCHIVE_PREFIX):].replace("_", "-")
+    return month if len(month) == 7 and month[4] == "-" else None
+
+
+def retention_cutoff(now: datetime, months: int) -> str:
+    """
+    Timestamp (ISO, like log entries) before which entries are archived: the
+    first day of the month `months` months before the current one, so the hot
+    collection always holds whole months
+    """
+    index = now.year * 12 + (now.month - 1) - months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}-01T00:00:00"
+
+
+async def archive_months(database) -> list:
+    """Months ("YYYY-MM") that have an archive collection, newest first"""
+    names = await database.list_collection_names()
+    return sorted((month for month in map(archive_month, names) if month), reverse=True)
+
+
+async def log_sources(database, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                      before: Optional[str] = None) -> list:
+    """
+    Repositories to read for a log query, newest first: the hot collection,
+    then the archives of the months that overlap [date_from, date_to] and are
+    not newer than `before` (the timestamp of a pagination cursor)
+    """
+    sources = [database.activity_logs]
+    for month in await archive_months(database):
+        if date_from and month < date_from[:7]:
+            continue
+        if date_to and month > date_to[:7]:
+            continue
+        if before and month > before[:7]:
+            continue
+        sources.append(database.collection(archive_collection_name(month)))
+    return sources
+
+
+async def find_logs(sources: list, query: dict, limit: int, after: Optional[tuple] = None) -> tuple[list, bool]:
+    """
+    One page of log entries across the hot collection and its archives.
+
+    Sources are read in order, each continuing from the last entry returned so
+    far, so the page follows LOG_SORT across collections (and an entry that is
+    briefly in both the hot collection and an archive is returned once).
+
+    Args:
+        sources: repositories from log_sources
+        query: log filter
+        limit: page size
+        after: decoded pagination cursor (timestamp, _id), if any
+
+    Returns:
+        (entries, has_more)
+    """
+    logs = []
+    for repository in sources:
+        page_query = before_log(query, *after) if after else query
+        logs.extend(await repository.find(page_query, sort=LOG_SORT, limit=limit + 1 - len(logs)))
+        if len(logs) > limit:
+            return logs[:limit], True
+        if logs:
+            after = (logs[-1].get("timestamp") or "", logs[-1]["_id"])
+    return logs, False
+
+
+class LogArchiver:
+    """
+    Retention for activity_logs: a background task that periodically moves
+    entries older than `retention_months` whole months into one archive
+    collection per month (activity_logs_archive_YYYY_MM), keeping the hot
+    collection small. Entries are copied before they are deleted, so an
+    interrupted run only leaves duplicates that the next run cleans up.
+    """
+
+    def __init__(self, retention_months: int = 12, interval_seconds: float = 86400.0,
+                 batch_size: int = ARCHIVE_BATCH_SIZE):
+        self.retention_months = retention_months
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self._database = None
+        self._task: Optional[asyncio.Task] = None
+        self._indexed = set()
+        self.archived = 0
+        self.runs = 0
+        self.last_run: Optional[str] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.retention_months > 0
+
+    def start(self, database):
+        """Start the periodic task (called from the lifespan hook); a no-op when retention is disabled"""
+        self._database = database
+        if self.enabled:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.archive(datetime.utcnow())
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[ARCHIVE] Error archiving activity logs: {e}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def _archive_repository(self, month: str):
+        repository = self._database.collection(archive_collection_name(month))
+        if month not in self._indexed:
+            # Archives are read with the same filters and sort as the hot collection
+            await repository.create_indexes(INDEX_SPECS["activity_logs"])
+            self._indexed.add(month)
+        return repository
+
+    async def _move(self, month: str, batch: list) -> int:
+        repository = await self._archive_repository(month)
+        errors = await repository.insert_many_partial(batch)
+        # A duplicate key means the entry was copied by an interrupted run
+        moved = [log["_id"] for index, log in enumerate(batch)
+                 if index not in errors or "E11000" in errors[index]]
+        if len(moved) < len(batch):
+            print(f"[ARCHIVE] {len(batch) - len(moved)} entries could not be archived to {repository.name}; kept in activity_logs")
+        return await self._database.activity_logs.delete_many({"_id": {"$in": moved}}) if moved else 0
+
+    async def archive(self, now: datetime) -> dict:
+        """
+        Move every entry older than the retention cutoff to its month's archive.
+
+        Returns:
+            dict mapping "YYYY-MM" to the number of entries moved
+        """
+        cutoff = retention_cutoff(now, self.retention_months)
+        moved = {}
+        month, batch = None, []
+        cursor = self._database.activity_logs.find_cursor({"timestamp": {"$lt": cutoff}}, sort=[("timestamp", 1), ("_id", 1)])
+        async for log in cursor:
+            log_month = (log.get("timestamp") or "")[:7]
+            if archive_month(archive_collection_name(log_month)) is None:
+                continue  # not a YYYY-MM timestamp; left in place
+            if batch and (log_month != month or len(batch) >= self.batch_size):
+                moved[month] = moved.get(month, 0) + await self._move(month, batch)
+                batch = []
+            month = log_month
+            batch.append(log)
+        if batch:
+            moved[month] = moved.get(month, 0) + await self._move(month, batch)
+
+        self.runs += 1
+        self.archived += sum(moved.values())
+        self.last_run = now.isoformat()
+        self.last_error = None
+        if moved:
+            print(f"[ARCHIVE] Moved {sum(moved.values())} activity log entries older than {cutoff} to {len(moved)} monthly archive(s)")
+        return moved
+
+    def stats(self) -> dict:
+        return {
+            "retention_months": self.retention_months,
+            "interval_seconds": self.interval_seconds,
+            "runs": self.runs,
+            "archived": self.archived,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+        }
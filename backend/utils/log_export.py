@@ -0,0 +1,66 @@
+import json
+import zlib
+
+from utils.activity_logs import LOG_SORT, before_log, serialize_log
+from utils.csv_export import stream_csv
+
+
+EXPORT_CHUNK_ROWS = 500  # NDJSON lines compressed per yielded chunk
+EXPORT_CURSOR_BATCH = 1000  # Documents fetched per server round trip
+
+CSV_COLUMNS = ["id", "timestamp", "user", "action", "entity", "entity_id", "secciones", "changes", "before", "after"]
+EXPORT_FORMATS = {
+    # format: (media type, file extension)
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/gzip", "ndjson.gz"),
+}
+
+
+async def iter_logs(sources: list, query: dict):
+    """
+    Every entry matching `query` across the hot collection and its archives, in
+    LOG_SORT order, read through server-side cursors (nothing is materialized)
+    """
+    last = None
+    for repository in sources:
+        source_query = before_log(query, *last) if last else query
+        cursor = repository.find_cursor(source_query, sort=LOG_SORT).batch_size(EXPORT_CURSOR_BATCH)
+        async for log in cursor:
+            yield log
+            last = (log.get("timestamp") or "", log["_id"])
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+async def stream_logs_csv(sources: list, query: dict):
+    """CSV export, streamed in chunks; nested states are JSON cells"""
+    async def rows():
+        async for log in iter_logs(sources, query):
+            entry = serialize_log(log)
+            entry["secciones"] = ";".join(entry["secciones"])
+            yield [_csv_cell(entry[column]) for column in CSV_COLUMNS]
+
+    async for chunk in stream_csv(CSV_COLUMNS, rows()):
+        yield chunk
+
+
+async def stream_logs_ndjson_gzip(sources: list, query: dict):
+    """Gzip-compressed NDJSON export (one serialized entry per line), compressed chunk by chunk"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    lines = []
+    async for log in iter_logs(sources, query):
+        lines.append(json.dumps(serialize_log(log), ensure_ascii=False, default=str))
+        if len(lines) >= EXPORT_CHUNK_ROWS:
+            chunk = compressor.compress(("\n".join(lines) + "\n").encode("utf-8"))
+            lines = []
+            if chunk:
+                yield chunk
+    if lines:
+        yield compressor.compress(("\n".join(lines) + "\n").encode("utf-8"))
+    yield compressor.flush()
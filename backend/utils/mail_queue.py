@@ -0,0 +1,237 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from utils.smtp_session import SMTPSession, SMTPSettings, is_transient_smtp_error
+
+
+# How long finished job records are kept for status polling (TTL index on expires_at)
+MAIL_JOB_RETENTION_DAYS = 7
+# Job statuses that only a running queue moves forward
+UNFINISHED_STATUSES = ["queued", "sending"]
+INTERRUPTED_ERROR = "Interrupted: the server restarted before this message was sent"
+
+
+class MailQueueFull(Exception):
+    """Raised by submit() when the queue cannot accept more jobs"""
+
+
+class MailQueue:
+    """
+    Background delivery of email messages.
+
+    `submit()` records a job in the `mail_jobs` collection (so its status can be
+    polled from any worker) and enqueues one delivery per recipient. Worker
+    tasks each own a persistent SMTPSession, so `concurrency` bounds the number
+    of open SMTP connections while every recipient of a job reuses them. The
+    blocking SMTP calls run in a thread and transient failures are retried with
+    exponential backoff.
+
+    Job status: queued -> sending -> sent | partial | failed
+    Each entry of the job's `results` has its own queued/sending/sent/failed status.
+
+    Messages only live in memory, so jobs cut short by a restart cannot be
+    resumed: a job still queued/sending that has not been updated for
+    `stale_after_seconds` is marked failed, at startup and when its status is read.
+    """
+
+    def __init__(self, max_retries: int = 3, backoff_seconds: float = 2.0,
+                 concurrency: int = 1, max_queue_size: int = 1000,
+                 stale_after_seconds: float = 3600.0):
+        self.max_retries = max_retries
+        self.stale_after_seconds = stale_after_seconds
+        self.backoff_seconds = backoff_seconds
+        self.concurrency = concurrency
+        self.max_queue_size = max_queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list = []
+        self._sessions: list = []
+        self._repository = None
+        # job_id -> [deliveries still pending, deliveries failed, total deliveries]
+        self._pending: dict = {}
+        self.settings: Optional[SMTPSettings] = None
+
+    def start(self, repository, settings: Optional[SMTPSettings] = None):
+        """Start the worker tasks (called from the lifespan hook)"""
+        self._repository = repository
+        self.settings = settings or SMTPSettings.from_env()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._sessions = [SMTPSession(self.settings) for _ in range(self.concurrency)]
+        self._workers = [asyncio.create_task(self._run(session)) for session in self._sessions]
+
+    def _stale_query(self) -> dict:
+        cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after_seconds)
+        return {"status": {"$in": UNFINISHED_STATUSES}, "updated_at": {"$lt": cutoff.isoformat()}}
+
+    async def _fail_interrupted(self, query: dict) -> int:
+        now = datetime.utcnow().isoformat()
+        failed = 0
+        async for job in self._repository.find_cursor(query, projection={"results": 1}):
+            if job["_id"] in self._pending:
+                continue  # Still being delivered by this process
+            results = [
+                {**result, "status": "failed", "error": INTERRUPTED_ERROR} if result.get("status") in UNFINISHED_STATUSES else result
+                for result in job.get("results", [])
+            ]
+            sent = sum(1 for result in results if result.get("status") == "sent")
+            result = await self._repository.update_one(
+                {"_id": job["_id"], "status": {"$in": UNFINISHED_STATUSES}},
+                {"$set": {
+                    "status": "partial" if sent else "failed",
+                    "results": results,
+                    "failed": len(results) - sent,
+                    "error": INTERRUPTED_ERROR,
+                    "updated_at": now,
+                }},
+            )
+            failed += result.modified_count
+        return failed
+
+    async def fail_interrupted_jobs(self) -> int:
+        """
+        Mark jobs left queued/sending by a previous run as failed (called from
+        the lifespan hook). Only stale jobs are touched, so jobs of other
+        workers that are still being delivered are left alone.
+
+        Returns:
+            number of jobs marked failed
+        """
+        try:
+            failed = await self._fail_interrupted(self._stale_query())
+        except Exception as e:
+            print(f"[MAIL] Could not check for interrupted jobs: {e}")
+            return 0
+        if failed:
+            print(f"[MAIL] Marked {failed} interrupted job(s) as failed")
+        return failed
+
+    async def stop(self, timeout: float = 30.0):
+        """Let queued jobs finish (up to `timeout`), then close the SMTP sessions"""
+        if not self._workers:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            print(f"[MAIL] Stopping with {self._queue.qsize()} delivery(ies) still queued")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        for session in self._sessions:
+            await asyncio.to_thread(session.close)
+        self._workers = []
+        self._sessions = []
+
+    async def submit(self, deliveries: list, subject: str = "", requested_by: Optional[str] = None) -> str:
+        """
+        Queue messages for delivery as a single job and return its job id.
+
+        Args:
+            deliveries: list of (recipient, message) pairs, one message per recipient
+            requested_by: email of the user who queued the job (status access check)
+
+        Raises:
+            MailQueueFull: if the queue cannot take every delivery (or is not running)
+        """
+        if self._queue is None or self.max_queue_size - self._queue.qsize() < len(deliveries):
+            raise MailQueueFull("Mail queue is full, try again later")
+
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        recipients = [recipient for recipient, _ in deliveries]
+        await self._repository.insert_one({
+            "_id": job_id,
+            "status": "queued",
+            "recipients": recipients,
+            "subject": subject,
+            "requested_by": requested_by,
+            "results": [
+                {"email": recipient, "status": "queued", "attempts": 0, "error": None}
+                for recipient in recipients
+            ],
+            "sent": 0,
+            "failed": 0,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "expires_at": now + timedelta(days=MAIL_JOB_RETENTION_DAYS),
+        })
+        self._pending[job_id] = [len(deliveries), 0, len(deliveries)]
+        for index, (recipient, message) in enumerate(deliveries):
+            self._queue.put_nowait((job_id, index, recipient, message))
+        return job_id
+
+    async def get_job(self, job_id: str) -> Optional[dict]:
+        if await self._fail_interrupted({"_id": job_id, **self._stale_query()}):
+            print(f"[MAIL] Marked interrupted job {job_id} as failed")
+        job = await self._repository.find_one({"_id": job_id}, {"expires_at": 0})
+        if job is not None:
+            job["job_id"] = job.pop("_id")
+        return job
+
+    async def _update_job(self, job_id: str, query: Optional[dict] = None, inc: Optional[dict] = None, **fields):
+        fields["updated_at"] = datetime.utcnow().isoformat()
+        update = {"$set": fields}
+        if inc:
+            update["$inc"] = inc
+        try:
+            await self._repository.update_one({"_id": job_id, **(query or {})}, update)
+        except Exception as e:
+            print(f"[MAIL] Could not update job {job_id}: {e}")
+
+    async def _update_result(self, job_id: str, index: int, inc: Optional[dict] = None, **fields):
+        await self._update_job(job_id, inc=inc, **{f"results.{index}.{key}": value for key, value in fields.items()})
+
+    async def _deliver(self, session: SMTPSession, job_id: str, index: int, recipient: str, message) -> bool:
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._update_result(job_id, index, status="sending", attempts=attempt)
+            try:
+                await asyncio.to_thread(session.send, message, [recipient])
+                await self._update_result(job_id, index, inc={"sent": 1}, status="sent", error=None)
+                print(f"[MAIL] Job {job_id} sent to {recipient}")
+                return True
+            except Exception as e:
+                if is_transient_smtp_error(e) and attempt <= self.max_retries:
+                    delay = self.backoff_seconds * (2 ** (attempt - 1))
+                    print(f"[MAIL] Job {job_id} to {recipient}: attempt {attempt} failed ({e}); retrying in {delay:.0f}s")
+                    await self._update_result(job_id, index, status="queued", error=str(e))
+                    await asyncio.sleep(delay)
+                    continue
+                print(f"[MAIL] Job {job_id} to {recipient} failed: {e}")
+                await self._update_result(job_id, index, inc={"failed": 1}, status="failed", error=str(e))
+                return False
+
+    async def _finish(self, job_id: str, delivered: bool):
+        """Account for one finished delivery; set the job status once all are done"""
+        counters = self._pending.get(job_id)
+        if counters is None:
+            return
+        counters[0] -= 1
+        if not delivered:
+            counters[1] += 1
+        if counters[0] > 0:
+            return
+        del self._pending[job_id]
+        _, failed, total = counters
+        status = "sent" if failed == 0 else "failed" if failed == total else "partial"
+        await self._update_job(job_id, status=status)
+
+    async def _run(self, session: SMTPSession):
+        while True:
+            job_id, index, recipient, message = await self._queue.get()
+            delivered = False
+            try:
+                await self._update_job(job_id, query={"status": "queued"}, status="sending")
+                delivered = await self._deliver(session, job_id, index, recipient, message)
+            finally:
+                await self._finish(job_id, delivered)
+                self._queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "jobs_in_progress": len(self._pending),
+            "workers": len(self._workers),
+            "smtp_connects": sum(session.connects for session in self._sessions),
+        }
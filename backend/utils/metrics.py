@@ -0,0 +1,211 @@
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+from pymongo import monitoring
+
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Driver housekeeping, not application queries
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions", "buildInfo"}
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+def _label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """
+    Per-route request latency, status codes and in-flight requests.
+
+    Routes are labelled with their path template (/api/activities/{activity_id}),
+    never the raw path, so the number of series stays bounded.
+    """
+
+    def __init__(self):
+        self.latency: dict = {}  # (method, route) -> Histogram
+        self.statuses: dict = {}  # (method, route, status) -> count
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        histogram = self.latency.get(key)
+        if histogram is None:
+            histogram = self.latency[key] = Histogram()
+        histogram.observe(seconds)
+        status_key = (method, route, status)
+        self.statuses[status_key] = self.statuses.get(status_key, 0) + 1
+
+    def lines(self) -> list:
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests served, by route and status code",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status), count in sorted(self.statuses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_label(route)}",status="{status}"}} {count}')
+        lines += [
+            "# HELP http_request_duration_seconds Request latency, until the response body is sent",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.latency.items()):
+            lines += histogram.lines("http_request_duration_seconds", f'method="{method}",route="{_label(route)}"')
+        return lines
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware feeding RequestMetrics (it does not buffer bodies, so
+    streaming responses keep streaming and are timed until their last chunk)
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight -= 1
+            # FastAPI stores the matched route on the scope while routing
+            route = scope.get("route")
+            self.metrics.observe(
+                scope["method"],
+                getattr(route, "path", None) or "unmatched",
+                status,
+                time.perf_counter() - start,
+            )
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo command listener: duration histograms and failures per collection
+    and command. Motor runs the driver in worker threads, hence the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: dict = {}  # (connection, request_id) -> collection of in-flight commands
+        self.latency: dict = {}  # (collection, command) -> Histogram
+        self.failures: dict = {}  # (collection, command) -> count
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = ""  # database-level commands
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def _finished(self, event, failed: bool):
+        if event.command_name in IGNORED_COMMANDS:
+            return
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "")
+            key = (collection, event.command_name)
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(event.duration_micros / 1e6)
+            if failed:
+                self.failures[key] = self.failures.get(key, 0) + 1
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+    def lines(self) -> list:
+        with self._lock:
+            latency = sorted((key, histogram) for key, histogram in self.latency.items())
+            failures = sorted(self.failures.items())
+            lines = [
+                "# HELP mongodb_command_duration_seconds MongoDB command duration, by collection and command",
+                "# TYPE mongodb_command_duration_seconds histogram",
+            ]
+            for (collection, command), histogram in latency:
+                lines += histogram.lines("mongodb_command_duration_seconds", f'collection="{_label(collection)}",command="{command}"')
+        lines += [
+            "# HELP mongodb_command_failures_total MongoDB commands that failed",
+            "# TYPE mongodb_command_failures_total counter",
+        ]
+        for (collection, command), count in failures:
+            lines.append(f'mongodb_command_failures_total{{collection="{_label(collection)}",command="{command}"}} {count}')
+        return lines
+
+
+def stats_lines(name: str, help_text: str, label: str, stats: dict) -> list:
+    """
+    Numeric fields of component stats() dicts (caches, audit writer, mail
+    queue...) as one gauge family: name{label="<component>",field="<field>"}
+    """
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+    for component, values in stats.items():
+        for field, value in values.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            lines.append(f'{name}{{{label}="{_label(component)}",field="{field}"}} {value}')
+    return lines
+
+
+def render_metrics(requests: RequestMetrics, commands: Optional[MongoCommandMetrics], components: dict) -> str:
+    """Prometheus text exposition of every metric"""
+    lines = requests.lines()
+    if commands is not None:
+        lines += commands.lines()
+    lines += stats_lines("app_component_stat", "Counters and sizes reported by in-process components", "component", components)
+    return "\n".join(lines) + "\n"
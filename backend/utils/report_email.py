@@ -0,0 +1,240 @@
+import copy
+import re
+import threading
+import time
+from email.mime.application import MIMEApplication
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import parseaddr
+from pathlib import Path
+from typing import Optional
+
+
+# How often (seconds) the image files are stat()ed to pick up replaced files
+ASSET_RELOAD_CHECK_SECONDS = 10
+
+# Header padding reduced by ~40% (from 25px to 15px) for more compact design
+REPORT_BODY_HTML = """<!DOCTYPE html>
+<html>
+<body style="font-family: Arial, sans-serif; color: #222; padding: 20px;">
+  <div style="background:#1A2346; padding: 15px; color: white; border-radius: 8px;">
+    <table style="width: 100%; border-collapse: collapse;">
+      <tr>
+        <td style="width: 160px; vertical-align: middle; padding-right: 20px;">
+          <img src="cid:logo_header" alt="Redland School Logo" style="width: 160px; height: auto; display: block;" />
+        </td>
+        <td style="vertical-align: middle; text-align: center;">
+          <h1 style="margin:0; font-size: 24px; letter-spacing: 1px;">
+            REDLAND SCHOOL
+          </h1>
+          <p style="margin:3px 0 0 0; font-size: 14px;">
+            Registro de Actividades y Evaluaciones
+          </p>
+        </td>
+        <td style="width: 160px;"></td>
+      </tr>
+    </table>
+  </div>
+
+  <h2 style="margin-top: 30px; color:#1A2346; font-size:22px;">
+    Reporte Institucional
+  </h2>
+
+  <p style="font-size: 15px; line-height:1.6;">
+    Estimado/a,<br><br>
+    Se adjunta el reporte institucional correspondiente al período seleccionado.<br>
+    El documento adjunto contiene todas las actividades y evaluaciones dentro del rango de fechas indicado.
+  </p>
+
+  <p style="font-size: 14px; margin-top: 30px;">
+    Saludos cordiales,<br>
+    <strong>Registro Escolar Web – Redland School</strong>
+  </p>
+
+  <p style="font-size: 12px; color:#555; margin-top:40px;">
+    Este es un mensaje generado automáticamente por la plataforma.
+  </p>
+
+  <div style="margin-top: 40px; width: 100%;">
+    <img src="cid:pie_correo1" alt="Pie de correo" style="width: 100%; max-height: 200px; object-fit: cover; display: block;" />
+  </div>
+</body>
+</html>"""
+
+
+_NOT_LOADED = object()
+
+# Deliberately loose: the SMTP server has the final word
+EMAIL_SYNTAX = re.compile(r"^[^@\s,;]+@[^@\s,;]+\.[^@\s,;]+$")
+# Not whitespace: display names ("Ana Pérez <ana@x.cl>") contain spaces
+RECIPIENT_SEPARATORS = re.compile(r"[,;\r\n]+")
+
+
+def parse_recipient(entry: str) -> Optional[str]:
+    """Bare address of `ana@x.cl` or `Ana Pérez <ana@x.cl>`; None if it is not a valid address"""
+    _, address = parseaddr(entry)
+    # Without angle brackets the whole entry must be the address (parseaddr
+    # would silently keep only part of "a@x.cl b@x.cl")
+    if "<" not in entry and address != entry:
+        return None
+    return address if EMAIL_SYNTAX.match(address) else None
+
+
+def split_recipients(*raw_values: Optional[str]) -> tuple[list, list]:
+    """
+    Parse comma/semicolon/newline separated address lists; entries may carry
+    a display name.
+
+    Returns:
+        (addresses, invalid): bare addresses deduplicated case-insensitively in
+        first-seen order, and the entries that are not email addresses
+    """
+    addresses, invalid, seen = [], [], set()
+    for raw in raw_values:
+        for entry in RECIPIENT_SEPARATORS.split(raw or ""):
+            entry = entry.strip()
+            if not entry:
+                continue
+            address = parse_recipient(entry)
+            if address is None:
+                invalid.append(entry)
+                continue
+            key = address.lower()
+            if key not in seen:
+                seen.add(key)
+                addresses.append(address)
+    return addresses, invalid
+
+
+
+class InlineImage:
+    """
+    An inline image referenced from the HTML body by Content-ID.
+
+    `candidates` are tried in order; the first existing file is used. The
+    encoded MIMEImage part is kept and only rebuilt when the chosen file or
+    its mtime changes.
+    """
+
+    def __init__(self, content_id: str, filename: str, candidates: list):
+        self.content_id = content_id
+        self.filename = filename
+        self.candidates = [Path(path) for path in candidates]
+        self.part: Optional[MIMEImage] = None
+        self._source = _NOT_LOADED
+
+    @property
+    def path(self) -> Optional[Path]:
+        """File the current part was loaded from"""
+        return self._source[0] if isinstance(self._source, tuple) else None
+
+    def _locate(self) -> Optional[tuple]:
+        for path in self.candidates:
+            try:
+                return path, path.stat().st_mtime_ns
+            except OSError:
+                continue
+        return None
+
+    def refresh(self) -> bool:
+        """(Re)load the image if the file changed since the last load; True if reloaded"""
+        source = self._locate()
+        if source == self._source:
+            return False
+        self._source = source
+        if source is None:
+            self.part = None
+            print(f"[EMAIL] WARNING: {self.filename} not found at: {', '.join(map(str, self.candidates))}")
+            return True
+
+        path = source[0]
+        try:
+            data = path.read_bytes()
+            if not data:
+                print(f"[EMAIL] ERROR: {self.filename} image file is empty: {path}")
+                self.part = None
+                return True
+            part = MIMEImage(data)
+            part.add_header("Content-ID", f"<{self.content_id}>")
+            part.add_header("Content-Disposition", "inline", filename=self.filename)
+            self.part = part
+            print(f"[EMAIL] Loaded {self.filename} from {path} ({len(data)} bytes)")
+        except Exception as e:
+            print(f"[EMAIL] ERROR: Could not load {self.filename} from {path}: {e}")
+            self.part = None
+        return True
+
+
+class ReportEmailAssets:
+    """
+    Prebuilt MIME parts shared by every report email.
+
+    The inline images are read and base64-encoded once (at startup), and the
+    HTML body part is built once. Files are re-checked at most every
+    ASSET_RELOAD_CHECK_SECONDS, so replacing an image does not need a restart.
+    Building a message then only copies these parts and the PDF part.
+    """
+
+    def __init__(self, img_dir: Path, check_interval: float = ASSET_RELOAD_CHECK_SECONDS):
+        img_dir = Path(img_dir)
+        self.images = [
+            # Prefer logo_header.png if it exists, otherwise use the existing logo
+            InlineImage("logo_header", "logo_header.png", [
+                img_dir / "logo" / "logo_header.png",
+                img_dir / "logo" / "imalogotipo-blanco_sinfondo_2.png",
+            ]),
+            InlineImage("pie_correo1", "pie_correo1.png", [
+                img_dir / "pie_correo1.png",
+                img_dir / "formas" / "pie_correo1.png",
+            ]),
+        ]
+        self.html_part = MIMEText(REPORT_BODY_HTML, "html", "utf-8")
+        self.check_interval = check_interval
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def logo_path(self) -> Optional[Path]:
+        return self.images[0].path
+
+    def load(self):
+        """Load every asset now (called from the lifespan hook)"""
+        with self._lock:
+            for image in self.images:
+                image.refresh()
+            self._checked_at = time.monotonic()
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.check_interval:
+            return
+        with self._lock:
+            for image in self.images:
+                image.refresh()
+            self._checked_at = now
+
+    @staticmethod
+    def pdf_attachment(pdf_bytes: bytes, pdf_filename: Optional[str]) -> MIMEApplication:
+        """PDF part, encoded once and shared by every recipient's message"""
+        # Attach PDF file directly - NO generation, just attach what we received
+        pdf_part = MIMEApplication(pdf_bytes, _subtype="pdf")
+        pdf_part.add_header("Content-Disposition", "attachment", filename=pdf_filename or "Reporte.pdf")
+        return pdf_part
+
+    def build_message(self, subject: str, from_addr: str, to: str, pdf_part: MIMEApplication) -> MIMEMultipart:
+        """Report email: inline images, HTML body and the PDF attachment"""
+        self._maybe_reload()
+
+        message = MIMEMultipart("alternative")
+        message["Subject"] = subject
+        message["From"] = from_addr
+        message["To"] = to
+
+        # Shallow copies share the already-encoded payloads
+        for image in self.images:
+            if image.part is not None:
+                message.attach(copy.copy(image.part))
+        message.attach(copy.copy(self.html_part))
+        message.attach(copy.copy(pdf_part))
+        return message
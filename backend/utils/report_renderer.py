@@ -0,0 +1,284 @@
+import io
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from utils.cache import VersionedRangeCache
+
+
+REPORT_TYPES = ["actividades", "evaluaciones", "ambos"]
+SECTION_NAMES = {
+    "todas": "Todas las Secciones",
+    "Junior": "Junior School",
+    "Middle": "Middle School",
+    "Senior": "Senior School",
+}
+
+DAY_NAMES = ["Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado", "Domingo"]
+MONTH_NAMES = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto",
+               "Septiembre", "Octubre", "Noviembre", "Diciembre"]
+
+# Corporate colors (same as the browser-generated PDF)
+NAVY_BLUE = colors.HexColor("#1A2346")
+RED_CORPORATE = colors.HexColor("#C5203A")
+GRAY_LIGHT = colors.HexColor("#F7F7F7")
+GRAY_DARK = colors.HexColor("#646464")
+
+HEADER_HEIGHT = 39 * mm
+LOGO_HEIGHT = 14 * mm
+MARGIN = 10 * mm
+
+TITLE_STYLE = ParagraphStyle("title", fontName="Helvetica-Bold", fontSize=18, leading=22,
+                             textColor=RED_CORPORATE, alignment=1)
+SUBTITLE_STYLE = ParagraphStyle("subtitle", fontName="Helvetica", fontSize=11, leading=14,
+                                textColor=GRAY_DARK, alignment=1)
+HEADING_STYLE = ParagraphStyle("heading", fontName="Helvetica-Bold", fontSize=14, leading=18,
+                               textColor=RED_CORPORATE)
+CELL_STYLE = ParagraphStyle("cell", fontName="Helvetica", fontSize=8, leading=10)
+HEADER_CELL_STYLE = ParagraphStyle("header_cell", parent=CELL_STYLE, fontName="Helvetica-Bold",
+                                   textColor=colors.white)
+
+ACTIVITY_COLUMNS = [("Fecha", 25), ("Hora", 20), ("Actividad", 50), ("Responsable", 30),
+                    ("Lugar", 25), ("Sección", 20), ("Curso", 20)]
+EVALUATION_COLUMNS = [("Fecha", 25), ("Asignatura", 45), ("Tema/Criterio", 60),
+                      ("Curso", 35), ("Sección", 25)]
+
+
+@dataclass(frozen=True)
+class ReportParams:
+    report_type: str
+    section: str
+    nivel: str
+    date_from: str
+    date_to: str
+
+    def validate(self):
+        """Raises ValueError with a user-facing message"""
+        if self.report_type not in REPORT_TYPES:
+            raise ValueError(f"Invalid reportType. Must be one of: {', '.join(REPORT_TYPES)}")
+        if self.section not in SECTION_NAMES:
+            raise ValueError(f"Invalid section. Must be one of: {', '.join(SECTION_NAMES)}")
+        try:
+            start = date.fromisoformat(self.date_from)
+            end = date.fromisoformat(self.date_to)
+        except ValueError:
+            raise ValueError("dateFrom and dateTo must be dates in YYYY-MM-DD format")
+        if start > end:
+            raise ValueError("dateFrom must be before or equal to dateTo")
+
+    @property
+    def seccion(self) -> Optional[str]:
+        return None if self.section == "todas" else self.section
+
+    @property
+    def collections(self) -> list:
+        """Keys of the data the report is built from ("activities" / "evaluations")"""
+        if self.report_type == "ambos":
+            return ["activities", "evaluations"]
+        return ["activities"] if self.report_type == "actividades" else ["evaluations"]
+
+    @property
+    def filename(self) -> str:
+        kind = {"actividades": "Actividades", "evaluaciones": "Evaluaciones", "ambos": "Ambos"}[self.report_type]
+        return f"Reporte_{kind}_{self.date_from}_{self.date_to}.pdf"
+
+
+def format_date_long(fecha: str) -> str:
+    """"2025-03-10" -> "Lunes 10 de Marzo de 2025" """
+    try:
+        day = date.fromisoformat(fecha)
+    except (TypeError, ValueError):
+        return fecha or ""
+    return f"{DAY_NAMES[day.weekday()]} {day.day} de {MONTH_NAMES[day.month - 1]} de {day.year}"
+
+
+def item_cursos(item: dict) -> list:
+    cursos = item.get("cursos")
+    if isinstance(cursos, list) and cursos:
+        return cursos
+    curso = item.get("curso")
+    if isinstance(curso, str) and curso:
+        return [curso]
+    return curso if isinstance(curso, list) else []
+
+
+def nivel_query(nivel: str) -> Optional[dict]:
+    """
+    Filter for items with a curso of `nivel`, as extract_nivel reads it ("5° A",
+    "5 A" -> "5"; "I EM A" -> "I"). Items without cursos (nor a legacy curso)
+    always match. None when no nivel is selected.
+    """
+    if not nivel or nivel == "todos":
+        return None
+    separator = "[° ]" if nivel.isdigit() else " "
+    pattern = {"$regex": rf"^\s*{re.escape(nivel)}{separator}"}
+    return {"$or": [
+        {"cursos": pattern},
+        {"$and": [
+            {"cursos.0": {"$exists": False}},  # Missing, null or empty
+            {"$or": [{"curso": pattern}, {"curso": {"$in": [None, ""]}}, {"curso": {"$size": 0}}]},
+        ]},
+    ]}
+
+
+async def fetch_report_rows(repository, query: dict, sort: dict, projection: dict, nivel: str) -> list:
+    """Documents of one collection in calendar order, shaped like the API responses"""
+    nivel_filter = nivel_query(nivel)
+    if nivel_filter:
+        query = {"$and": [query, nivel_filter]} if query else nivel_filter
+    pipeline = [{"$match": query}, {"$sort": sort}, {"$project": projection}]
+    return await repository.aggregate(pipeline)
+
+
+def _cell(text) -> Paragraph:
+    value = "" if text is None else str(text)
+    value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return Paragraph(value.replace("\n", "<br/>"), CELL_STYLE)
+
+
+def _table(columns: list, rows: list) -> Table:
+    data = [[Paragraph(title, HEADER_CELL_STYLE) for title, _ in columns]]
+    data += [[_cell(value) for value in row] for row in rows]
+    table = Table(data, colWidths=[width * mm for _, width in columns], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), RED_CORPORATE),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, GRAY_LIGHT]),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#DDDDDD")),
+    ]))
+    return table
+
+
+def _activity_rows(activities: list) -> list:
+    rows = []
+    for activity in activities:
+        hora = activity.get("hora") or ""
+        rows.append([
+            activity.get("fecha"),
+            "TODO EL DÍA" if hora == "TODO EL DIA" else hora,
+            activity.get("actividad"),
+            activity.get("responsable") or "",
+            activity.get("lugar") or "",
+            activity.get("seccion"),
+            ", ".join(item_cursos(activity)) or "-",
+        ])
+    return rows
+
+
+def _evaluation_rows(evaluations: list) -> list:
+    return [
+        [
+            evaluation.get("fecha"),
+            evaluation.get("asignatura"),
+            evaluation.get("tema") or "",
+            ", ".join(item_cursos(evaluation)) or "-",
+            evaluation.get("seccion"),
+        ]
+        for evaluation in evaluations
+    ]
+
+
+def render_report_pdf(params: ReportParams, activities: list, evaluations: list,
+                      logo_path: Optional[Path] = None) -> bytes:
+    """
+    Render the activities/evaluations report as an A4 PDF, laid out like the
+    browser-generated one (navy header with logo on every page, red title and
+    table headers). Blocking: run it in a worker thread.
+    """
+    logo = None
+    if logo_path is not None and Path(logo_path).exists():
+        try:
+            logo = ImageReader(str(logo_path))
+        except Exception as e:
+            print(f"[REPORT] Warning: Could not load logo image: {e}")
+
+    def draw_header(canvas, doc):
+        width, height = A4
+        canvas.saveState()
+        canvas.setFillColor(NAVY_BLUE)
+        canvas.rect(0, height - HEADER_HEIGHT, width, HEADER_HEIGHT, stroke=0, fill=1)
+        if logo is not None:
+            logo_width, logo_height = logo.getSize()
+            canvas.drawImage(logo, MARGIN, height - (HEADER_HEIGHT + LOGO_HEIGHT) / 2,
+                             width=LOGO_HEIGHT * logo_width / logo_height, height=LOGO_HEIGHT, mask="auto")
+        canvas.setFillColor(colors.white)
+        canvas.setFont("Helvetica", 12)
+        canvas.drawCentredString(width / 2, height - HEADER_HEIGHT / 2, "Registro de Actividades y Evaluaciones")
+        canvas.restoreState()
+
+    kind = {
+        "ambos": "Reporte de Actividades y Evaluaciones",
+        "actividades": "Reporte de Actividades",
+        "evaluaciones": "Reporte de Evaluaciones",
+    }[params.report_type]
+    story = [
+        Paragraph(f"{kind} – Sección: {SECTION_NAMES[params.section]}", TITLE_STYLE),
+        Paragraph(f"Del {format_date_long(params.date_from)} al {format_date_long(params.date_to)}", SUBTITLE_STYLE),
+        Spacer(1, 6 * mm),
+    ]
+    if "activities" in params.collections:
+        story.append(Paragraph("ACTIVIDADES", HEADING_STYLE))
+        story.append(_table(ACTIVITY_COLUMNS, _activity_rows(activities)) if activities
+                     else Paragraph("No hay actividades en el período seleccionado.", CELL_STYLE))
+        story.append(Spacer(1, 8 * mm))
+    if "evaluations" in params.collections:
+        story.append(Paragraph("EVALUACIONES", HEADING_STYLE))
+        story.append(_table(EVALUATION_COLUMNS, _evaluation_rows(evaluations)) if evaluations
+                     else Paragraph("No hay evaluaciones en el período seleccionado.", CELL_STYLE))
+
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=MARGIN, rightMargin=MARGIN,
+        topMargin=HEADER_HEIGHT + 10 * mm, bottomMargin=20 * mm,
+        title=kind, author="Registro Escolar Web – Redland School",
+    )
+    doc.build(story, onFirstPage=draw_header, onLaterPages=draw_header)
+    return buffer.getvalue()
+
+
+@dataclass
+class RenderedReport:
+    pdf: bytes
+    params: ReportParams
+    # collection name -> version the report was rendered from
+    versions: dict = field(default_factory=dict)
+
+    def covers(self, fecha: str, seccion: str) -> bool:
+        """True if a document at (fecha, seccion) would appear in this report"""
+        if self.params.seccion and self.params.seccion != seccion:
+            return False
+        return self.params.date_from <= fecha <= self.params.date_to
+
+
+class ReportCache(VersionedRangeCache):
+    """
+    Rendered report PDFs keyed by their parameters.
+
+    Like CalendarResponseCache, every entry remembers the version of each
+    collection it was built from and is only served while those versions are
+    current; see VersionedRangeCache.invalidate().
+    """
+
+    def _version(self, key, entry, collection: str) -> Optional[int]:
+        return entry.versions.get(collection)
+
+    def _set_version(self, key, entry, collection: str, version: int):
+        entry.versions[collection] = version
+
+    def get(self, params: ReportParams, versions: dict) -> Optional[RenderedReport]:
+        return self._cache.get(params, is_valid=lambda entry: entry.versions == versions)
+
+    def set(self, params: ReportParams, versions: dict, pdf: bytes) -> RenderedReport:
+        entry = RenderedReport(pdf=pdf, params=params, versions=dict(versions))
+        self._cache.set(params, entry)
+        return entry
@@ -0,0 +1,72 @@
+import gzip
+import json
+from dataclasses import dataclass
+from typing import Optional
+
+from utils.cache import VersionedRangeCache
+
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    version: int
+    date_from: Optional[str]
+    date_to: Optional[str]
+    seccion: Optional[str]
+    gzipped: Optional[bytes] = None
+
+    def covers(self, fecha: str, seccion: str) -> bool:
+        """True if a document at (fecha, seccion) would appear in this response"""
+        if self.seccion and self.seccion != seccion:
+            return False
+        if self.date_from and fecha < self.date_from:
+            return False
+        if self.date_to and fecha > self.date_to:
+            return False
+        return True
+
+
+class CalendarResponseCache(VersionedRangeCache):
+    """
+    Fully serialized (and optionally pre-gzipped) grouped calendar responses,
+    keyed by (collection, date_from, date_to, seccion).
+
+    Every entry remembers the collection version it was built from and is only
+    served while that version is current, so writes made by other workers are
+    never hidden. Writes made by this worker go through `invalidate()`, which
+    drops only the entries whose range contains a changed (fecha, seccion) and
+    moves the rest to the new version.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, gzip_enabled: bool = True):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.gzip_enabled = gzip_enabled
+
+    def _version(self, key, entry, collection: str) -> Optional[int]:
+        return entry.version if key[0] == collection else None
+
+    def _set_version(self, key, entry, collection: str, version: int):
+        entry.version = version
+
+    def get(self, collection: str, version: int, date_from, date_to, seccion) -> Optional[CachedResponse]:
+        return self._cache.get(
+            (collection, date_from, date_to, seccion),
+            is_valid=lambda entry: entry.version == version,
+        )
+
+    def set(self, collection: str, version: int, date_from, date_to, seccion, content: dict) -> CachedResponse:
+        body = json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+        entry = CachedResponse(body=body, version=version, date_from=date_from, date_to=date_to, seccion=seccion)
+        if self.gzip_enabled and len(body) >= GZIP_MIN_BYTES:
+            entry.gzipped = gzip.compress(body, compresslevel=6)
+        self._cache.set((collection, date_from, date_to, seccion), entry)
+        return entry
+
+    def stats(self) -> dict:
+        stats = super().stats()
+        stats["gzip_enabled"] = self.gzip_enabled
+        return stats
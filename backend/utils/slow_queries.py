@@ -0,0 +1,248 @@
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Optional
+
+from pymongo import monitoring
+from pymongo.errors import CollectionInvalid, PyMongoError
+
+
+SLOW_QUERIES_COLLECTION = "slow_queries"
+
+# Commands that can be explained; the value is where their filter lives
+EXPLAINABLE_COMMANDS = {
+    "find": "filter",
+    "aggregate": "pipeline",
+    "count": "query",
+    "distinct": "query",
+    "findAndModify": "query",
+    "update": "updates",
+    "delete": "deletes",
+}
+
+# Session and cluster fields the driver adds to every command; not valid inside explain
+DRIVER_FIELDS = {"lsid", "$clusterTime", "$db", "$readPreference", "txnNumber", "autocommit", "startTransaction", "readConcern"}
+
+
+def query_shape(value):
+    """
+    A filter with every literal replaced by 1: the same shape for queries that
+    only differ in their values, so recurring slow queries group together
+    """
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    return 1
+
+
+def command_filter(command_name: str, command: dict):
+    field = EXPLAINABLE_COMMANDS[command_name]
+    value = command.get(field)
+    if command_name in ("update", "delete") and value:
+        return value[0].get("q")  # First statement of the batch
+    return value
+
+
+def returned_count(command_name: str, reply: dict) -> Optional[int]:
+    """Documents returned (reads) or affected (writes) according to the reply"""
+    if "cursor" in reply:
+        return len(reply["cursor"].get("firstBatch", []))
+    if command_name == "distinct":
+        return len(reply.get("values", []))
+    if command_name == "findAndModify":
+        return 1 if reply.get("value") is not None else 0
+    return reply.get("n")
+
+
+def _plan_stages(plan: dict) -> list:
+    """Stages of a winning plan, root first, with the index name for index scans"""
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        stages.append(f"{stage} {plan['indexName']}" if "indexName" in plan else stage)
+        inputs = plan.get("inputStages") or ([plan["inputStage"]] if "inputStage" in plan else [])
+        plan = inputs[0] if inputs else None
+    return stages
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Winning plan and execution counters from an explain("executionStats") result"""
+    # Aggregations that start with $match/$sort report the query plan in their first stage
+    if "queryPlanner" not in explain and explain.get("stages"):
+        explain = explain["stages"][0].get("$cursor", explain)
+    planner = explain.get("queryPlanner", {})
+    winning = planner.get("winningPlan", {})
+    winning = winning.get("queryPlan", winning)  # slot-based engine nests the plan
+    stats = explain.get("executionStats", {})
+    stages = _plan_stages(winning)
+    return {
+        "plan": stages,
+        "collection_scan": any(stage.startswith("COLLSCAN") for stage in stages),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "n_returned": stats.get("nReturned"),
+        "execution_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryProfiler(monitoring.CommandListener):
+    """
+    Records MongoDB commands slower than `threshold_ms` in the capped
+    `slow_queries` collection, with their filter shape, duration, documents
+    returned and an explain("executionStats") of the same command (docs and
+    keys examined, winning plan).
+
+    The listener runs in driver threads and only hands slow commands to the
+    event loop; a background task runs the explain and writes the record.
+    The same collection/command/shape is explained at most once per
+    `explain_interval` seconds (the explain re-runs the query), and records
+    are dropped, never queued without bound, when the writer falls behind.
+    """
+
+    def __init__(self, threshold_ms: float = 500.0, explain_interval: float = 60.0,
+                 max_queue_size: int = 100, capped_size_mb: int = 16):
+        self.threshold_ms = threshold_ms
+        self.explain_interval = explain_interval
+        self.max_queue_size = max_queue_size
+        self.capped_size_mb = capped_size_mb
+        self._commands: dict = {}  # (connection, request_id) -> command of in-flight explainable commands
+        self._last_explain: dict = {}  # (collection, command, shape) -> monotonic time
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._database = None
+        self.recorded = 0
+        self.dropped = 0
+        self.explain_errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    async def start(self, database):
+        """Create the capped collection and start the writer (called from the lifespan hook)"""
+        if not self.enabled:
+            return
+        self._database = database
+        try:
+            await database.db.create_collection(
+                SLOW_QUERIES_COLLECTION, capped=True, size=self.capped_size_mb * 1024 * 1024
+            )
+        except CollectionInvalid:
+            pass  # Already exists
+        except PyMongoError as e:
+            # Without the capped collection records would pile up in a regular one
+            # (also reached when the server is unreachable: startup goes on without the profiler)
+            print(f"[SLOW_QUERY] Could not create capped {SLOW_QUERIES_COLLECTION} collection, profiler disabled: {e}")
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+
+    # ---- CommandListener (driver threads) ----
+
+    @staticmethod
+    def _key(event) -> tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event):
+        if self._loop is None or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        if event.command.get(event.command_name) == SLOW_QUERIES_COLLECTION:
+            return
+        # dict operations are atomic under the GIL
+        self._commands[self._key(event)] = (event.database_name, event.command)
+
+    def succeeded(self, event):
+        pending = self._commands.pop(self._key(event), None)
+        if pending is None or event.duration_micros < self.threshold_ms * 1000:
+            return
+        database_name, command = pending
+        record = {
+            "timestamp": datetime.utcnow().isoformat(),
+            "database": database_name,
+            "collection": command.get(event.command_name),
+            "command": event.command_name,
+            "duration_ms": round(event.duration_micros / 1000, 3),
+            # As text: filters have $-prefixed keys, which stored documents should not
+            "filter_shape": json.dumps(query_shape(command_filter(event.command_name, command)), default=str),
+            "docs_returned": returned_count(event.command_name, event.reply),
+        }
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._enqueue, record, command)
+            except RuntimeError:
+                pass  # Loop closed during shutdown
+
+    def failed(self, event):
+        self._commands.pop(self._key(event), None)
+
+    # ---- Event loop ----
+
+    def _enqueue(self, record: dict, command: dict):
+        try:
+            self._queue.put_nowait((record, command))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _should_explain(self, record: dict) -> bool:
+        key = (record["collection"], record["command"], record["filter_shape"])
+        now = time.monotonic()
+        if len(self._last_explain) > 1000:
+            self._last_explain = {k: t for k, t in self._last_explain.items() if now - t < self.explain_interval}
+        last = self._last_explain.get(key)
+        if last is not None and now - last < self.explain_interval:
+            return False
+        self._last_explain[key] = now
+        return True
+
+    async def _explain(self, record: dict, command: dict) -> dict:
+        explainable = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+        try:
+            explain = await self._database.client[record["database"]].command(
+                {"explain": explainable, "verbosity": "executionStats"}
+            )
+            return summarize_explain(explain)
+        except PyMongoError as e:
+            self.explain_errors += 1
+            return {"error": str(e)}
+
+    async def _run(self):
+        repository = self._database.collection(SLOW_QUERIES_COLLECTION)
+        while True:
+            record, command = await self._queue.get()
+            try:
+                if self._should_explain(record):
+                    record["explain"] = await self._explain(record, command)
+                await repository.insert_one(record)
+                self.recorded += 1
+            except Exception as e:
+                print(f"[SLOW_QUERY] Error recording slow {record.get('command')} on {record.get('collection')}: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "threshold_ms": self.threshold_ms,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "recorded": self.recorded,
+            "dropped": self.dropped,
+            "explain_errors": self.explain_errors,
+        }
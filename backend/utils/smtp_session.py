@@ -0,0 +1,120 @@
+import os
+import smtplib
+import socket
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+
+# Seconds a connection may sit idle before it is checked with NOOP before reuse
+SMTP_KEEPALIVE_CHECK_SECONDS = 30
+SMTP_TIMEOUT_SECONDS = 30
+
+
+@dataclass(frozen=True)
+class SMTPSettings:
+    server: str
+    port: int
+    user: str
+    password: str
+    from_addr: str
+
+    @classmethod
+    def from_env(cls) -> "SMTPSettings":
+        user = os.environ.get("SMTP_USER", "")
+        return cls(
+            server=os.environ.get("SMTP_SERVER", "smtp.gmail.com"),
+            port=int(os.environ.get("SMTP_PORT", "587")),
+            user=user,
+            password=os.environ.get("SMTP_PASSWORD", ""),
+            from_addr=os.environ.get("SMTP_FROM", user),
+        )
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.user and self.password)
+
+
+def is_transient_smtp_error(error: Exception) -> bool:
+    """
+    Errors worth retrying: dropped/refused connections, timeouts and 4xx replies.
+    Authentication failures and other 5xx replies are permanent.
+    """
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, socket.timeout, ConnectionError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    return False
+
+
+class SMTPSession:
+    """
+    A persistent, authenticated SMTP connection.
+
+    The connection (connect + STARTTLS + login) is opened on first use and
+    reused for later messages. Before reusing a connection that has been idle
+    it is probed with NOOP; a dropped connection is re-opened and
+    re-authenticated transparently. Blocking: call from a worker thread, and
+    from one thread at a time.
+    """
+
+    def __init__(self, settings: SMTPSettings):
+        self.settings = settings
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self.connects = 0
+
+    def _connect(self):
+        self.close()
+        print(f"[SMTP] Connecting to {self.settings.server}:{self.settings.port}...")
+        smtp = smtplib.SMTP(self.settings.server, self.settings.port, timeout=SMTP_TIMEOUT_SECONDS)
+        try:
+            smtp.starttls()
+            smtp.login(self.settings.user, self.settings.password)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+        self.connects += 1
+        print(f"[SMTP] Authenticated as {self.settings.user}")
+
+    def _ensure_connected(self):
+        if self._smtp is None:
+            self._connect()
+            return
+        if time.monotonic() - self._last_used > SMTP_KEEPALIVE_CHECK_SECONDS:
+            try:
+                code, _ = self._smtp.noop()
+                if code != 250:
+                    self._connect()
+            except (smtplib.SMTPException, OSError):
+                self._connect()
+
+    def send(self, message, to_addrs: Optional[list] = None):
+        """Send a message, reconnecting once if the server dropped the session"""
+        self._ensure_connected()
+        try:
+            self._smtp.send_message(message, to_addrs=to_addrs)
+        except smtplib.SMTPServerDisconnected:
+            self._connect()
+            self._smtp.send_message(message, to_addrs=to_addrs)
+        except smtplib.SMTPException:
+            # sendmail already RSETs a refused transaction, and closes the socket
+            # on a 421 reply; drop a closed session so the next send reconnects
+            self._drop_if_closed()
+            raise
+        self._last_used = time.monotonic()
+
+    def _drop_if_closed(self):
+        if self._smtp is not None and self._smtp.sock is None:
+            self._smtp = None
+
+    def close(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                self._smtp.close()
+            self._smtp = None
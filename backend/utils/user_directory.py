@@ -0,0 +1,60 @@
+import base64
+import re
+from typing import Optional
+
+from utils.csv_export import stream_csv
+
+
+USER_SORT = [("email", 1)]  # Unique, so it doubles as the pagination key
+EXPORT_COLUMNS = ["email", "role"]  # Same columns as the CSV upload
+
+
+def user_directory_query(role: Optional[str] = None, active: Optional[bool] = None,
+                         email_prefix: Optional[str] = None) -> dict:
+    """
+    Filter for user listings. The email prefix becomes an anchored,
+    case-sensitive regex on the (lowercase) stored email, which MongoDB
+    answers with a range scan on the email index.
+    """
+    query = {}
+    if role:
+        query["role"] = role
+    if active is True:
+        query["is_active"] = {"$ne": False}  # Users created before is_active existed are active
+    elif active is False:
+        query["is_active"] = False
+    if email_prefix:
+        query["email"] = {"$regex": "^" + re.escape(email_prefix.strip().lower())}
+    return query
+
+
+def encode_email_cursor(email: str) -> str:
+    return base64.urlsafe_b64encode(email.encode("utf-8")).decode("ascii")
+
+
+def decode_email_cursor(cursor: str) -> str:
+    """
+    Inverse of encode_email_cursor.
+
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    try:
+        return base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+def after_email(query: dict, email: str) -> dict:
+    """Restrict a user query to emails after `email` (keeps an email prefix filter)"""
+    return {"$and": [query, {"email": {"$gt": email}}]} if query else {"email": {"$gt": email}}
+
+
+async def stream_users_csv(repository, query: dict):
+    """Every matching user as CSV, read from a cursor and yielded in chunks"""
+    async def rows():
+        async for user in repository.find_cursor(query, projection={"email": 1, "role": 1}, sort=USER_SORT):
+            yield [user.get("email", ""), user.get("role", "viewer")]
+
+    async for chunk in stream_csv(EXPORT_COLUMNS, rows()):
+        yield chunk
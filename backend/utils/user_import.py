@@ -0,0 +1,125 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+
+VALID_ROLES = ["editor", "viewer"]
+BULK_WRITE_BATCH_SIZE = 1000
+
+
+def validate_user_rows(df: pd.DataFrame, required_domain: str | None = None) -> tuple[pd.DataFrame, list]:
+    """
+    Validate the email/role columns of a users CSV as column operations.
+
+    Row numbers are taken from the DataFrame index (+2 for the header and
+    1-based numbering), so chunks read with pandas `chunksize` keep the
+    numbers of the original file.
+
+    Args:
+        df: DataFrame with normalized 'email' and 'role' columns
+        required_domain: e.g. "@redland.cl" to reject other domains, None to allow any
+
+    Returns:
+        (valid, errors) - valid has 'row', 'email' and 'role' columns;
+        errors is a list of (row, message) tuples
+    """
+    rows = pd.Series(df.index + 2, index=df.index)
+    missing = df["email"].isna() | df["role"].isna()
+    email = df["email"].astype(str).str.strip().str.lower()
+    role = df["role"].astype(str).str.strip().str.lower()
+
+    bad_email = email.eq("")
+    bad_format = ~email.str.contains("@", regex=False)
+    bad_domain = ~email.str.endswith(required_domain) if required_domain else pd.Series(False, index=df.index)
+    bad_role = ~role.isin(VALID_ROLES)
+
+    prefix = "Row " + rows.astype(str) + ": "
+    # First failing check wins, in the same order as the original per-row validation
+    messages = np.select(
+        [missing, bad_email, bad_format, bad_domain, bad_role],
+        [
+            prefix + "Missing email or role",
+            prefix + "Empty email",
+            prefix + email + " - Invalid email format",
+            prefix + email + " - Not a " + (required_domain or "") + " email",
+            prefix + email + " - Invalid role '" + role + "'. Must be 'editor' or 'viewer'",
+        ],
+        default="",
+    )
+    invalid = messages != ""
+
+    errors = list(zip(rows[invalid].tolist(), messages[invalid].tolist()))
+    valid = pd.DataFrame({
+        "row": rows[~invalid],
+        "email": email[~invalid],
+        "role": role[~invalid],
+    })
+    return valid, errors
+
+
+def _upsert_operation(email: str, role: str, now: str, update_existing: bool) -> UpdateOne:
+    if update_existing:
+        update = {
+            "$set": {"role": role, "updated_at": now},
+            "$setOnInsert": {"created_at": now, "is_active": True},
+        }
+    else:
+        # Only create missing users; existing ones are left untouched
+        update = {"$setOnInsert": {"role": role, "created_at": now, "is_active": True}}
+    return UpdateOne({"email": email}, update, upsert=True)
+
+
+async def upsert_users(repository, valid: pd.DataFrame, update_existing: bool = True) -> tuple[list, list, list]:
+    """
+    Write validated users with unordered bulk upserts.
+
+    Repeated emails are split into successive waves (first occurrences, then
+    second occurrences, ...) so the outcome matches processing the file row by
+    row: the first row adds the user and later rows update it.
+
+    Args:
+        repository: users MongoRepository
+        valid: output of validate_user_rows
+        update_existing: update the role of existing users (CSV upload) or
+            report them as errors (initial load)
+
+    Returns:
+        (added, errors, updated_emails) - added are "Added: ..." / "Updated: ..."
+        report lines in row order, errors are (row, message) tuples
+    """
+    results = []  # (row, message)
+    errors = []
+    updated_emails = []
+    now = datetime.utcnow().isoformat()
+
+    waves = valid.assign(wave=valid.groupby("email").cumcount())
+    for _, wave in waves.groupby("wave", sort=True):
+        records = list(wave[["row", "email", "role"]].itertuples(index=False, name=None))
+        for start in range(0, len(records), BULK_WRITE_BATCH_SIZE):
+            batch = records[start:start + BULK_WRITE_BATCH_SIZE]
+            operations = [_upsert_operation(email, role, now, update_existing) for _, email, role in batch]
+
+            failed = {}
+            try:
+                result = await repository.bulk_write(operations, ordered=False)
+                upserted = set(result.upserted_ids)
+            except BulkWriteError as e:
+                upserted = {item["index"] for item in e.details.get("upserted", [])}
+                failed = {item["index"]: item.get("errmsg", "write error") for item in e.details.get("writeErrors", [])}
+
+            for i, (row, email, role) in enumerate(batch):
+                if i in failed:
+                    errors.append((row, f"Row {row}: Error processing row - {failed[i]}"))
+                elif i in upserted:
+                    results.append((row, f"Added: {email} → {role}"))
+                elif update_existing:
+                    results.append((row, f"Updated: {email} → {role}"))
+                    updated_emails.append(email)
+                else:
+                    errors.append((row, f"Row {row}: {email} - User already exists"))
+
+    results.sort(key=lambda item: item[0])
+    return [message for _, message in results], errors, updated_emails
@@ -0,0 +1,87 @@
+import hashlib
+import json
+from datetime import datetime
+
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+
+class DataVersions:
+    """
+    Version counters for collections, stored in the `data_versions` collection
+    as {"_id": <collection name>, "version": <int>}.
+
+    Every mutating endpoint bumps the counter of the collection it changed, so
+    readers can tell whether data changed without touching the documents.
+    Counters live in MongoDB so all workers agree on them.
+    """
+
+    def __init__(self, repository):
+        self.repository = repository
+
+    async def bump(self, name: str) -> int:
+        document = await self.repository.find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return document["version"]
+
+    async def get(self, name: str) -> int:
+        document = await self.repository.find_one({"_id": name})
+        return document["version"] if document else 0
+
+    async def get_many(self, names: list) -> dict:
+        documents = await self.repository.find({"_id": {"$in": list(names)}})
+        versions = {name: 0 for name in names}
+        versions.update({document["_id"]: document["version"] for document in documents})
+        return versions
+
+    async def run_once(self, name: str, migration) -> bool:
+        """
+        Await migration() unless it already completed, as recorded in the same
+        collection ({"_id": "migration:<name>"}), so one-off backfills do not
+        rescan their collections on every startup. Migrations must be
+        idempotent: workers starting together may both run one.
+
+        A migration that fails (e.g. MongoDB unreachable at startup) is logged,
+        not recorded, and runs again on the next startup.
+
+        Returns:
+            True if the migration ran to completion
+        """
+        key = f"migration:{name}"
+        try:
+            if await self.repository.find_one({"_id": key}) is not None:
+                return False
+            await migration()
+            await self.repository.update_one(
+                {"_id": key}, {"$set": {"completed_at": datetime.utcnow().isoformat()}}, upsert=True
+            )
+        except PyMongoError as e:
+            print(f"[MIGRATION] {name} failed, will retry on next startup: {e}")
+            return False
+        return True
+
+
+def make_etag(name: str, version: int | str, params: dict) -> str:
+    """Weak ETag for a read of `name` at `version` with the given query parameters"""
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{name}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an If-None-Match header value matches etag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == wanted:
+            return True
+    return False
@@ -1,10 +1,12 @@
 import React, { useState } from 'react';
 import { BACKEND_URL } from './config';
+import { useAuth } from './AuthContext';
 import { parseJsonOnce } from '@/services/authService';
 import jsPDF from 'jspdf';
 import LogoRedland from '@/logo/imalogotipo-blanco_sinfondo_2.png';
 
 const PrintReportPanel = ({ onClose, activities, evaluations }) => {
+  const { token } = useAuth();
   const [reportType, setReportType] = useState('actividades');
   const [section, setSection] = useState('todas');
   const [nivel, setNivel] = useState('todos');
@@ -2148,6 +2150,9 @@ const PrintReportPanel = ({ onClose, activities, evaluations }) => {
       // BACKEND_URL should already include /api from REACT_APP_API_BASE_URL
       const response = await fetch(`${BACKEND_URL}/send-report-email`, {
         method: 'POST',
+        headers: {
+          Authorization: `Bearer ${token}`,
+        },
         body: formData // Send as FormData, not JSON
       });
 
@@ -15,28 +15,52 @@ const UserManagementPanel = ({ onClose }) => {
   const [editingRole, setEditingRole] = useState(null);
   const [tempRole, setTempRole] = useState(null);
 
-  // Load users
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // Load one page of users (the API returns at most 100 per page plus a next_cursor)
+  const fetchUsersPage = useCallback(async (cursor) => {
+    // BACKEND_URL should already include /api from REACT_APP_API_BASE_URL
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+    const response = await fetch(`${BACKEND_URL}/users${query}`, {
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    });
+
+    const data = await parseJsonOnce(response);
+    if (!response.ok) {
+      throw new Error(data.detail || 'Error al cargar usuarios');
+    }
+    return data;
+  }, [token]);
+
+  // Load users (first page)
   const loadUsers = useCallback(async () => {
     try {
-      // BACKEND_URL should already include /api from REACT_APP_API_BASE_URL
-      const response = await fetch(`${BACKEND_URL}/users`, {
-        headers: {
-          'Authorization': `Bearer ${token}`
-        }
-      });
-
-      const data = await parseJsonOnce(response);
-      if (response.ok) {
-        setUsers(data.users || []);
-      } else {
-        setMessage({ type: 'error', text: data.detail || 'Error al cargar usuarios' });
-      }
+      const data = await fetchUsersPage(null);
+      setUsers(data.users || []);
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
-      setMessage({ type: 'error', text: 'Error de conexión' });
+      setMessage({ type: 'error', text: error instanceof TypeError ? 'Error de conexión' : error.message });
     } finally {
       setLoading(false);
     }
-  }, [token]);
+  }, [fetchUsersPage]);
+
+  const loadMoreUsers = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await fetchUsersPage(nextCursor);
+      setUsers(prev => [...prev, ...(data.users || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (error) {
+      setMessage({ type: 'error', text: error instanceof TypeError ? 'Error de conexión' : error.message });
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   useEffect(() => {
     loadUsers();
@@ -484,6 +508,17 @@ const UserManagementPanel = ({ onClose }) => {
                     ))}
                   </tbody>
                 </table>
+                {nextCursor && (
+                  <div className="px-3 sm:px-4 py-2 sm:py-3 text-center border-t border-gray-200 dark:border-gray-700">
+                    <button
+                      onClick={loadMoreUsers}
+                      disabled={loadingMore}
+                      className="text-blue-600 dark:text-blue-400 hover:text-blue-900 dark:hover:text-blue-300 font-medium transition-colors text-xs sm:text-sm disabled:opacity-50"
+                    >
+                      {loadingMore ? 'Cargando...' : 'Cargar más usuarios'}
+                    </button>
+                  </div>
+                )}
               </div>
             )}
           </div>
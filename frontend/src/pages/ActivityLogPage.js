@@ -1,7 +1,7 @@
 import React, { useState, useEffect, useCallback } from 'react';
 import { useNavigate } from 'react-router-dom';
 import { useAuth } from '../AuthContext';
-import { getActivityLogs } from '../services/activityLogService';
+import { getActivityLogs, getActivityLogStates } from '../services/activityLogService';
 import jsPDF from 'jspdf';
 import LogoRedland from '../logo/imalogotipo-blanco_sinfondo_2.png';
 
@@ -10,6 +10,11 @@ const ActivityLogPage = () => {
   const { token, user, isEditor } = useAuth();
   const [logs, setLogs] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // Full states of update entries opened by the user (log id -> { before, after, complete })
+  const [openedStates, setOpenedStates] = useState({});
+  const [openingId, setOpeningId] = useState(null);
   const [filters, setFilters] = useState({
     user: '',
     action: '',
@@ -19,7 +24,7 @@ const ActivityLogPage = () => {
     seccion: ''
   });
 
-  // Load logs
+  // Load logs (first page; the API returns at most 1000 per page plus a next_cursor)
   const loadLogs = useCallback(async () => {
     if (!token || !isEditor) return;
     
@@ -27,6 +32,7 @@ const ActivityLogPage = () => {
     try {
       const data = await getActivityLogs(token, filters);
       setLogs(data.logs || []);
+      setNextCursor(data.next_cursor || null);
     } catch (error) {
       console.error('Error loading logs:', error);
       alert('Error al cargar logs: ' + error.message);
@@ -35,10 +41,59 @@ const ActivityLogPage = () => {
     }
   }, [token, isEditor, filters]);
 
+  const loadMoreLogs = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const data = await getActivityLogs(token, filters, nextCursor);
+      setLogs(prev => [...prev, ...(data.logs || [])]);
+      setNextCursor(data.next_cursor || null);
+    } catch (error) {
+      console.error('Error loading logs:', error);
+      alert('Error al cargar logs: ' + error.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   useEffect(() => {
     loadLogs();
   }, [loadLogs]);
 
+  // Update entries only carry the changed fields; full states are loaded per entry on demand
+  const openLogStates = async (logId) => {
+    setOpeningId(logId);
+    try {
+      const data = await getActivityLogStates(token, logId);
+      setOpenedStates(prev => ({ ...prev, [logId]: { before: data.before, after: data.after, complete: data.complete } }));
+    } catch (error) {
+      alert('Error al cargar el detalle: ' + error.message);
+    } finally {
+      setOpeningId(null);
+    }
+  };
+
+  // before/after to display: full states when stored or opened, otherwise only the changed fields
+  const logStates = (log) => {
+    if (openedStates[log.id]) return openedStates[log.id];
+    if (log.changes) {
+      const before = {};
+      const after = {};
+      Object.entries(log.changes).forEach(([field, change]) => {
+        if ('from' in change) before[field] = change.from;
+        if ('to' in change) after[field] = change.to;
+      });
+      return { before, after, partial: true };
+    }
+    return { before: log.before, after: log.after };
+  };
+
+  // "field: value" lines for the changed fields of an update entry
+  const formatChangedFields = (state) => Object.entries(state || {})
+    .filter(([field]) => field !== 'updated_at' && field !== 'updated_by')
+    .map(([field, value]) => `${field}: ${Array.isArray(value) ? value.join(', ') : String(value)}`)
+    .join('\n') || '-';
+
   // Format timestamp for display
   const formatTimestamp = (timestamp) => {
     if (!timestamp) return '';
@@ -362,12 +417,15 @@ const ActivityLogPage = () => {
       xPos += colWidths.entityId;
       
       // Format BEFORE text based on entity type
+      const states = logStates(log);
       let beforeText = '-';
       if (log.entity === 'user') {
-        const userState = formatUserState(log.before, log.action, log.entity);
+        const userState = formatUserState(states.before, log.action, log.entity);
         beforeText = userState || '-';
+      } else if (states.partial) {
+        beforeText = formatChangedFields(states.before).replace(/\n/g, '; ');
       } else {
-        beforeText = log.before?.seccion || (log.before?.actividad ? 'Act: ' + log.before.actividad.substring(0, 15) : '') || (log.before?.asignatura ? 'Asig: ' + log.before.asignatura : '') || '-';
+        beforeText = states.before?.seccion || (states.before?.actividad ? 'Act: ' + states.before.actividad.substring(0, 15) : '') || (states.before?.asignatura ? 'Asig: ' + states.before.asignatura : '') || '-';
       }
       pdf.text(String(beforeText).substring(0, 25), xPos + 1, yPosition + 4.5, { maxWidth: colWidths.before - 2 });
       xPos += colWidths.before;
@@ -375,10 +433,12 @@ const ActivityLogPage = () => {
       // Format AFTER text based on entity type
       let afterText = '-';
       if (log.entity === 'user') {
-        const userState = formatUserState(log.after, log.action, log.entity);
+        const userState = formatUserState(states.after, log.action, log.entity);
         afterText = userState || '-';
+      } else if (states.partial) {
+        afterText = formatChangedFields(states.after).replace(/\n/g, '; ');
       } else {
-        afterText = log.after?.seccion || (log.after?.actividad ? 'Act: ' + log.after.actividad.substring(0, 15) : '') || (log.after?.asignatura ? 'Asig: ' + log.after.asignatura : '') || '-';
+        afterText = states.after?.seccion || (states.after?.actividad ? 'Act: ' + states.after.actividad.substring(0, 15) : '') || (states.after?.asignatura ? 'Asig: ' + states.after.asignatura : '') || '-';
       }
       pdf.text(String(afterText).substring(0, 25), xPos + 1, yPosition + 4.5, { maxWidth: colWidths.after - 2 });
 
@@ -559,7 +619,7 @@ const ActivityLogPage = () => {
         {/* Logs Table */}
         <div className="bg-white dark:bg-[#121C39] rounded-lg shadow-md p-4 sm:p-6 border border-gray-200 dark:border-gray-700">
           <h2 className="text-lg font-semibold text-gray-800 dark:text-white mb-4">
-            Registros de Auditoría ({logs.length})
+            Registros de Auditoría ({logs.length}{nextCursor ? '+' : ''})
           </h2>
           
           {loading ? (
@@ -588,8 +648,7 @@ const ActivityLogPage = () => {
                 <tbody className="divide-y divide-gray-200 dark:divide-gray-700">
                   {logs.map((log) => {
                     const actionData = formatAction(log.action);
-                    const beforeSeccion = log.before?.seccion || '-';
-                    const afterSeccion = log.after?.seccion || '-';
+                    const states = logStates(log);
                     
                     return (
                       <tr key={log.id} className="hover:bg-gray-50 dark:hover:bg-[#0F1425] transition-colors">
@@ -610,37 +669,69 @@ const ActivityLogPage = () => {
                         <td className="px-3 sm:px-4 py-3 text-xs text-gray-600 dark:text-gray-400 font-mono">
                           {log.entity_id.substring(0, 8)}...
                         </td>
-                        <td className="px-3 sm:px-4 py-3 text-xs text-gray-600 dark:text-gray-400 max-w-[150px]" title={JSON.stringify(log.before, null, 2)}>
+                        <td className="px-3 sm:px-4 py-3 text-xs text-gray-600 dark:text-gray-400 max-w-[150px]" title={JSON.stringify(states.before, null, 2)}>
                           {log.entity === 'user' ? (
                             <div className="whitespace-pre-line space-y-0.5">
-                              {formatUserState(log.before, log.action, log.entity)}
+                              {formatUserState(states.before, log.action, log.entity)}
                             </div>
-                          ) : log.before ? (
+                          ) : states.partial ? (
+                            <div className="whitespace-pre-line">{formatChangedFields(states.before)}</div>
+                          ) : states.before ? (
                             <div className="space-y-0.5">
-                              {log.before.seccion && <div>Sección: {log.before.seccion}</div>}
-                              {log.before.actividad && <div>Act: {log.before.actividad.substring(0, 30)}...</div>}
-                              {log.before.asignatura && <div>Asig: {log.before.asignatura}</div>}
+                              {states.before.seccion && <div>Sección: {states.before.seccion}</div>}
+                              {states.before.actividad && <div>Act: {states.before.actividad.substring(0, 30)}...</div>}
+                              {states.before.asignatura && <div>Asig: {states.before.asignatura}</div>}
                             </div>
                           ) : '-'}
                         </td>
-                        <td className="px-3 sm:px-4 py-3 text-xs text-gray-600 dark:text-gray-400 max-w-[150px]" title={JSON.stringify(log.after, null, 2)}>
+                        <td className="px-3 sm:px-4 py-3 text-xs text-gray-600 dark:text-gray-400 max-w-[150px]" title={JSON.stringify(states.after, null, 2)}>
                           {log.entity === 'user' ? (
                             <div className="whitespace-pre-line space-y-0.5">
-                              {formatUserState(log.after, log.action, log.entity)}
+                              {formatUserState(states.after, log.action, log.entity)}
                             </div>
-                          ) : log.after ? (
+                          ) : states.partial ? (
+                            <div className="whitespace-pre-line">{formatChangedFields(states.after)}</div>
+                          ) : states.after ? (
                             <div className="space-y-0.5">
-                              {log.after.seccion && <div>Sección: {log.after.seccion}</div>}
-                              {log.after.actividad && <div>Act: {log.after.actividad.substring(0, 30)}...</div>}
-                              {log.after.asignatura && <div>Asig: {log.after.asignatura}</div>}
+                              {states.after.seccion && <div>Sección: {states.after.seccion}</div>}
+                              {states.after.actividad && <div>Act: {states.after.actividad.substring(0, 30)}...</div>}
+                              {states.after.asignatura && <div>Asig: {states.after.asignatura}</div>}
                             </div>
                           ) : '-'}
+                          {log.bulk && (
+                            <div className="mt-1" title={JSON.stringify(log.bulk.filter, null, 2)}>
+                              Masivo: {log.bulk.matched} elemento(s){log.bulk.days ? ` (${log.bulk.days > 0 ? '+' : ''}${log.bulk.days} días)` : ''}
+                            </div>
+                          )}
+                          {states.partial && (
+                            <button
+                              onClick={() => openLogStates(log.id)}
+                              disabled={openingId === log.id}
+                              className="mt-1 text-blue-600 dark:text-blue-400 hover:text-blue-900 dark:hover:text-blue-300 font-medium disabled:opacity-50"
+                            >
+                              {openingId === log.id ? 'Cargando...' : 'Ver estado completo'}
+                            </button>
+                          )}
+                          {openedStates[log.id] && !openedStates[log.id].complete && (
+                            <div className="mt-1 text-[10px] text-amber-600 dark:text-amber-400">Estado reconstruido, puede ser incompleto</div>
+                          )}
                         </td>
                       </tr>
                     );
                   })}
                 </tbody>
               </table>
+              {nextCursor && (
+                <div className="px-3 sm:px-4 py-2 sm:py-3 text-center border-t border-gray-200 dark:border-gray-700">
+                  <button
+                    onClick={loadMoreLogs}
+                    disabled={loadingMore}
+                    className="text-blue-600 dark:text-blue-400 hover:text-blue-900 dark:hover:text-blue-300 font-medium transition-colors text-xs sm:text-sm disabled:opacity-50"
+                  >
+                    {loadingMore ? 'Cargando...' : 'Cargar más registros'}
+                  </button>
+                </div>
+              )}
             </div>
           )}
         </div>
@@ -2,12 +2,13 @@ import { BACKEND_URL } from '../config';
 import { handleResponse } from './authService';
 
 /**
- * Get activity logs with optional filters
+ * Get one page of activity logs with optional filters
  * @param {string} token - JWT token
  * @param {Object} filters - Optional filters: { user, action, entity, dateFrom, dateTo, seccion }
- * @returns {Promise<Object>} Response with logs array
+ * @param {string|null} cursor - next_cursor of the previous page (null for the first page)
+ * @returns {Promise<Object>} Response with logs array and next_cursor (null on the last page)
  */
-export const getActivityLogs = async (token, filters = {}) => {
+export const getActivityLogs = async (token, filters = {}, cursor = null) => {
   try {
     const params = new URLSearchParams();
     
@@ -17,6 +18,7 @@ export const getActivityLogs = async (token, filters = {}) => {
     if (filters.dateFrom) params.append('date_from', filters.dateFrom);
     if (filters.dateTo) params.append('date_to', filters.dateTo);
     if (filters.seccion) params.append('seccion', filters.seccion);
+    if (cursor) params.append('cursor', cursor);
     
     if (!BACKEND_URL) {
       throw new Error("La URL del backend no está configurada");
@@ -47,3 +49,38 @@ export const getActivityLogs = async (token, filters = {}) => {
   }
 };
 
+
+/**
+ * Get the full before/after states of one log entry.
+ * Update entries only store the changed fields; the server rebuilds the full
+ * states from the item's history (complete=false when they may be inexact)
+ * @param {string} token - JWT token
+ * @param {string} logId - Log entry id
+ * @returns {Promise<Object>} { before, after, complete }
+ */
+export const getActivityLogStates = async (token, logId) => {
+  try {
+    if (!BACKEND_URL) {
+      throw new Error("La URL del backend no está configurada");
+    }
+
+    const response = await fetch(`${BACKEND_URL}/activity-logs/${encodeURIComponent(logId)}/states`, {
+      method: 'GET',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      }
+    });
+
+    const data = await handleResponse(response);
+
+    if (!response.ok) {
+      throw new Error(data.detail || 'Error al obtener el detalle del registro');
+    }
+
+    return data;
+  } catch (error) {
+    console.error('Error fetching activity log states:', error);
+    throw error;
+  }
+};
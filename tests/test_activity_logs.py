@@ -0,0 +1,59 @@
+from utils.activity_logs import compact_log_entry, field_changes, reconstruct_states
+
+
+def entry(_id, timestamp, action, before=None, after=None, entity_id="a1"):
+    return {"_id": _id, "timestamp": timestamp, "action": action, "entity": "activity",
+            "entity_id": entity_id, **compact_log_entry(action, entity_id, before, after)}
+
+
+V1 = {"seccion": "1A", "actividad": "Prueba", "fecha": "2024-03-04"}
+V2 = {**V1, "fecha": "2024-03-05"}
+V3 = {**V2, "actividad": "Prueba final"}
+
+CREATE = entry(1, "2024-03-01T10:00:00", "create", None, V1)
+UPDATE_1 = entry(2, "2024-03-02T10:00:00", "update", V1, V2)
+UPDATE_2 = entry(3, "2024-03-03T10:00:00", "update", V2, V3)
+HISTORY = [UPDATE_2, CREATE, UPDATE_1]
+
+
+def test_field_changes_round_trip_added_and_removed_fields():
+    before = {"a": 1, "b": 2}
+    after = {"a": 1, "c": 3}
+    changes = field_changes(before, after)
+    assert changes == {"b": {"from": 2}, "c": {"to": 3}}
+    assert reconstruct_states({"_id": 9, "timestamp": "x", "changes": changes}, [], after)["before"] == before
+
+
+def test_forward_from_create_snapshot():
+    states = reconstruct_states(UPDATE_2, HISTORY)
+    assert states == {"before": V2, "after": V3, "complete": True}
+
+
+def test_backward_from_current_without_snapshot():
+    # The create entry was archived or lost: undo later diffs from the current document
+    states = reconstruct_states(UPDATE_1, [UPDATE_1, UPDATE_2], current=V3)
+    assert states == {"before": V1, "after": V2, "complete": True}
+
+
+def test_bulk_entry_inside_forward_window_is_incomplete():
+    bulk = [entry(10, "2024-03-02T12:00:00", "update", {"count": 5}, {"count": 5}, entity_id="bulk")]
+    assert reconstruct_states(UPDATE_2, HISTORY, bulk=bulk)["complete"] is False
+    # Outside the window (before the snapshot or after the entry) it does not matter
+    early = [entry(11, "2024-02-01T00:00:00", "update", {}, {}, entity_id="bulk")]
+    late = [entry(12, "2024-04-01T00:00:00", "update", {}, {}, entity_id="bulk")]
+    assert reconstruct_states(UPDATE_2, HISTORY, bulk=early + late)["complete"] is True
+
+
+def test_bulk_entry_inside_backward_window_is_incomplete():
+    bulk = [entry(10, "2024-03-05T00:00:00", "update", {}, {}, entity_id="bulk")]
+    states = reconstruct_states(UPDATE_1, [UPDATE_1, UPDATE_2], current=V3, bulk=bulk)
+    assert states["complete"] is False
+
+
+def test_only_changed_fields_without_snapshot_or_current():
+    states = reconstruct_states(UPDATE_1, [UPDATE_1])
+    assert states == {"before": {"fecha": "2024-03-04"}, "after": {"fecha": "2024-03-05"}, "complete": False}
+
+
+def test_snapshot_entries_are_returned_as_stored():
+    assert reconstruct_states(CREATE, HISTORY) == {"before": None, "after": V1, "complete": True}
@@ -0,0 +1,24 @@
+from utils.bulk_edit import shift_date_string, shift_sunday_errors, shiftable_query
+from utils.dates import SUNDAY_START_MESSAGE
+
+
+def test_shift_date_string_only_moves_iso_dates():
+    assert shift_date_string("2025-03-10", 7) == "2025-03-17"
+    assert shift_date_string("2025-12-31", 1) == "2026-01-01"
+    # Left as they are by the update pipeline, so left as they are here too
+    for value in ["10/03/2025", "2025-3-10", "2025-W10-1", "2025-02-30", None, ""]:
+        assert shift_date_string(value, 7) == value
+
+
+def test_shiftable_query_keeps_range_and_adds_format():
+    query = shiftable_query({"fecha": {"$gte": "2025-03-01", "$lte": "2025-03-31"}, "seccion": "Middle"})
+    assert query["fecha"]["$gte"] == "2025-03-01" and query["fecha"]["$lte"] == "2025-03-31"
+    assert "$regex" in query["fecha"] and query["seccion"] == "Middle"
+
+
+def test_shift_sunday_errors_message_per_collection():
+    groups = [{"fecha": "2025-03-15", "fechaFin": None, "seccion": "Middle", "count": 2},  # Saturday
+              {"fecha": "10/03/2025", "fechaFin": None, "seccion": "Middle", "count": 1}]
+    assert shift_sunday_errors(groups, 1) == [f"2025-03-15 -> 2025-03-16: {SUNDAY_START_MESSAGE}"]
+    message = "No se permiten evaluaciones en Domingo"
+    assert shift_sunday_errors(groups, 1, message) == [f"2025-03-15 -> 2025-03-16: {message}"]
@@ -0,0 +1,13 @@
+from utils.report_email import split_recipients
+
+
+def test_split_recipients_accepts_display_names():
+    addresses, invalid = split_recipients('"Ana Pérez" <ana@x.cl>, Ana Pérez <ANA@x.cl>; b@x.cl\n<c@x.cl>')
+    assert addresses == ["ana@x.cl", "b@x.cl", "c@x.cl"]
+    assert invalid == []
+
+
+def test_split_recipients_reports_invalid_entries():
+    addresses, invalid = split_recipients("a@x.cl b@x.cl, nope", None, "d@x.cl")
+    assert addresses == ["d@x.cl"]
+    assert invalid == ["a@x.cl b@x.cl", "nope"]